@@ -1,3 +1,7 @@
+// Verdict cache: posting URL + content hash -> { etag, result, lastUsed }
+const VERDICT_CACHE_KEY = 'verdictCache';
+const VERDICT_CACHE_SIZE = 200;
+
 // Set up context menu
 chrome.runtime.onInstalled.addListener(() => {
   // Set default options
@@ -10,33 +14,149 @@ chrome.runtime.onInstalled.addListener(() => {
 // Listen for messages from content scripts
 chrome.runtime.onMessage.addListener((request, sender, sendResponse) => {
   if (request.action === 'analyzeFromBackground') {
-    // Get the API URL from storage
-    chrome.storage.local.get(['apiUrl'], function(data) {
-      const apiUrl = data.apiUrl || 'http://localhost:5000';
-      
-      fetch(`${apiUrl}/analyze`, {
-        method: 'POST',
-        headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify(request.jobData)
-      })
-      .then(response => response.json())
-      .then(result => {
-        sendResponse(result);
-      })
-      .catch(error => {
-        console.error('Error analyzing job:', error);
-        sendResponse({ success: false, error: 'Error analyzing job' });
-      });
-    });
-    
+    const tabId = sender.tab ? sender.tab.id : null;
+    analyzeWithCache(request.jobData, request.pageUrl, tabId).then(sendResponse);
+
     // Return true to indicate we will send a response asynchronously
     return true;
   }
 });
 
+// Analyze a job, revalidating a cached verdict with the server when we have one.
+// The analysis is streamed: partial scores are forwarded to the tab and the popup
+// as soon as each stage completes.
+async function analyzeWithCache(jobData, pageUrl, tabId) {
+  const apiUrl = await new Promise(resolve => getApiUrl(resolve));
+  const cacheKey = `${pageUrl}#${await contentHash(jobData)}`;
+  const cache = await loadVerdictCache();
+  const cached = cache[cacheKey];
+
+  const headers = { 'Content-Type': 'application/json' };
+  if (cached && cached.etag) {
+    headers['If-None-Match'] = cached.etag;
+  }
+
+  try {
+    const response = await fetch(`${apiUrl}/analyze/stream`, {
+      method: 'POST',
+      headers: headers,
+      body: JSON.stringify(jobData)
+    });
+
+    // Same content and model version: the cached verdict is still valid
+    if (response.status === 304 && cached) {
+      await storeVerdict(cache, cacheKey, cached.etag, cached.result);
+      return { success: true, result: cached.result, cached: true };
+    }
+
+    if (!response.ok) {
+      throw new Error(`Server returned ${response.status}: ${response.statusText}`);
+    }
+
+    const result = await readAnalysisStream(response.body, (stage, data) => {
+      notifyStage(tabId, stage, data);
+    });
+    await storeVerdict(cache, cacheKey, response.headers.get('ETag'), result);
+    return { success: true, result: result, cached: false };
+  } catch (error) {
+    console.error('Error analyzing job:', error);
+
+    // Server unreachable: a previous verdict for this exact posting beats a guess
+    if (cached) {
+      return { success: true, result: cached.result, cached: true, stale: true };
+    }
+    return { success: false, error: 'Error analyzing job' };
+  }
+}
+
+// Read Server-Sent Events from an analysis stream until the final result
+async function readAnalysisStream(body, onStage) {
+  const reader = body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+
+  while (true) {
+    const { done, value } = await reader.read();
+    if (done) {
+      throw new Error('The analysis ended before a result was received');
+    }
+    buffer += decoder.decode(value, { stream: true });
+
+    // Events are separated by a blank line
+    let boundary;
+    while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+      const block = buffer.slice(0, boundary);
+      buffer = buffer.slice(boundary + 2);
+
+      let event = 'message';
+      let data = '';
+      for (const line of block.split('\n')) {
+        if (line.startsWith('event: ')) {
+          event = line.slice(7);
+        } else if (line.startsWith('data: ')) {
+          data += line.slice(6);
+        }
+      }
+
+      const payload = data ? JSON.parse(data) : {};
+      if (event === 'error') {
+        reader.cancel();
+        throw new Error(payload.error || 'Error analyzing job');
+      }
+      if (event === 'result') {
+        reader.cancel();
+        return payload;
+      }
+      onStage(event, payload);
+    }
+  }
+}
+
+// Forward a partial result to the tab being analyzed and to the popup, if open
+function notifyStage(tabId, stage, data) {
+  const message = { action: 'analysisStage', tabId: tabId, stage: stage, data: data };
+  if (tabId !== null) {
+    chrome.tabs.sendMessage(tabId, message).catch(() => {});
+  }
+  chrome.runtime.sendMessage(message).catch(() => {});
+}
+
+// SHA-256 of the job fields sent to the server
+async function contentHash(jobData) {
+  const bytes = new TextEncoder().encode(JSON.stringify(jobData));
+  const digest = await crypto.subtle.digest('SHA-256', bytes);
+  return Array.from(new Uint8Array(digest))
+    .map(b => b.toString(16).padStart(2, '0'))
+    .join('');
+}
+
+function loadVerdictCache() {
+  return new Promise(resolve => {
+    chrome.storage.local.get([VERDICT_CACHE_KEY], function(data) {
+      resolve(data[VERDICT_CACHE_KEY] || {});
+    });
+  });
+}
+
+// Store a verdict, evicting the least recently used entries beyond the cache size
+function storeVerdict(cache, cacheKey, etag, result) {
+  cache[cacheKey] = { etag: etag, result: result, lastUsed: Date.now() };
+
+  const keys = Object.keys(cache);
+  if (keys.length > VERDICT_CACHE_SIZE) {
+    keys.sort((a, b) => cache[a].lastUsed - cache[b].lastUsed)
+      .slice(0, keys.length - VERDICT_CACHE_SIZE)
+      .forEach(key => delete cache[key]);
+  }
+
+  return new Promise(resolve => {
+    chrome.storage.local.set({ [VERDICT_CACHE_KEY]: cache }, resolve);
+  });
+}
+
 // Add a function to get the API URL
 function getApiUrl(callback) {
   chrome.storage.local.get(['apiUrl'], function(data) {
     callback(data.apiUrl || 'http://localhost:5000');
   });
-}
\ No newline at end of file
+}
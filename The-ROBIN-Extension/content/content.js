@@ -40,6 +40,9 @@ function init() {
       // Show badge with results
       showJobBadge(request.result);
       sendResponse({success: true});
+    } else if (request.action === "analysisStage" && request.data.confidence_score !== undefined) {
+      // Show the score of a completed stage while the analysis finishes
+      showJobBadge(request.data);
     }
   });
   
@@ -140,36 +143,26 @@ async function analyzeJob() {
   }
   
   try {
-    // Get the API URL from storage
-    const apiUrl = await new Promise(resolve => {
-      chrome.storage.local.get(['apiUrl'], function(data) {
-        resolve(data.apiUrl || 'http://localhost:5000');
-      });
+    // The background worker calls the server and keeps the verdict cache,
+    // so repeat visits to the same listing only cost a 304 revalidation
+    const pageUrl = window.location.origin + window.location.pathname + window.location.search;
+    const response = await new Promise(resolve => {
+      chrome.runtime.sendMessage(
+        { action: 'analyzeFromBackground', jobData: jobData, pageUrl: pageUrl },
+        resolve
+      );
     });
     
-    // In a real implementation, send the job data to our server for analysis
-    try {
-      const response = await fetch(`${apiUrl}/analyze`, {
-        method: 'POST',
-        headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify(jobData)
-      });
-      
-      if (!response.ok) {
-        throw new Error(`Server returned ${response.status}: ${response.statusText}`);
-      }
-      
-      const result = await response.json();
-      return { success: true, result: result };
-    } catch (apiError) {
-      console.error('API Error:', apiError);
-      console.log('Falling back to simulated analysis due to API error');
-      
-      // Fall back to local simulation if the API call fails
-      // This is helpful during development when the server might not be running
-      const result = simulateJobAnalysis(jobData);
-      return { success: true, result: result };
+    if (response && response.success) {
+      return { success: true, result: response.result };
     }
+    
+    console.log('Falling back to simulated analysis due to API error');
+    
+    // Fall back to local simulation if the server is unreachable and no verdict is cached
+    // This is helpful during development when the server might not be running
+    const result = simulateJobAnalysis(jobData);
+    return { success: true, result: result };
   } catch (error) {
     console.error('Error analyzing job:', error);
     return { success: false, error: 'Error analyzing job' };
@@ -234,12 +227,13 @@ function showJobBadge(result) {
     
     // Set badge content
     let badgeColor, badgeIcon, badgeText;
+    const fraudScore = result.fraudScore || result.confidence_score || 0;
     
-    if (result.fraudScore < 30) {
+    if (fraudScore < 30) {
       badgeColor = 'var(--safe-color)';
       badgeIcon = '✅';
       badgeText = 'Likely Legitimate';
-    } else if (result.fraudScore < 70) {
+    } else if (fraudScore < 70) {
       badgeColor = 'var(--warning-color)';
       badgeIcon = '⚠️';
       badgeText = 'Suspicious';
@@ -257,8 +251,8 @@ function showJobBadge(result) {
       </div>
       <div class="robin-badge-content">
         <div class="robin-badge-score">
-          <span class="robin-score-label">Fraud Score:</span>
-          <span class="robin-score-value">${Math.round(result.fraudScore)}%</span>
+          <span class="robin-score-label">${result.provisional ? 'Early Estimate:' : 'Fraud Score:'}</span>
+          <span class="robin-score-value">${Math.round(fraudScore)}%</span>
         </div>
         <div class="robin-badge-verdict">
           <span class="robin-verdict-icon">${badgeIcon}</span>
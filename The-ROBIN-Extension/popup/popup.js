@@ -150,6 +150,22 @@ document.addEventListener('DOMContentLoaded', function() {
     });
   });
 
+  // Partial scores streamed in while the current tab is being analyzed
+  chrome.runtime.onMessage.addListener(function(message) {
+    if (message.action !== 'analysisStage' || message.data.confidence_score === undefined) {
+      return;
+    }
+    chrome.tabs.query({active: true, currentWindow: true}, function(tabs) {
+      if (tabs[0].id === message.tabId && !analyzingPanel.classList.contains('hidden')) {
+        chrome.storage.local.get(['apiUrl'], function(data) {
+          displayResults(message.data, data.apiUrl || 'http://localhost:5000');
+          // Keep waiting for the final result
+          analyzingPanel.classList.remove('hidden');
+        });
+      }
+    });
+  });
+
   // Function to check if server is reachable
   function checkServerConnectivity(apiUrl) {
     unanalyzedPanel.querySelector('p').textContent = "Checking server connectivity...";
@@ -255,6 +271,11 @@ document.addEventListener('DOMContentLoaded', function() {
       document.getElementById('verdict').className = 'verdict danger';
     }
     
+    // A provisional score comes from the fastest models only
+    if (result.provisional) {
+      verdictTextEl.textContent += ' (early estimate)';
+    }
+    
     // Update "View Details" link with result ID if available
     if (result.resultId) {
       detailsBtn.href = `${apiUrl}/results/${result.resultId}`;
@@ -0,0 +1,86 @@
+"""
+Benchmark the categorical branch: dense vs sparse one-hot Random Forest
+and ordinal-coded histogram gradient boosting
+
+Usage:
+    python -m benchmarks.categorical_branch --data data/fake_job_postings.csv
+"""
+
+import argparse
+import time
+import tracemalloc
+import numpy as np
+from sklearn.model_selection import train_test_split
+
+from data.data_loader import DataLoader
+from data.preprocessor import Preprocessor
+from data.rebalancer import Rebalancer
+from models.random_forest_model import RandomForestModel
+from models.hist_gradient_boosting_model import HistGradientBoostingModel
+
+def run_variant(name, model, X_train, y_train, X_test, y_test, rebalance):
+    """
+    Rebalance (optionally), train and evaluate one variant
+
+    Returns:
+        Dictionary with training time, peak traced memory, F1 and the
+        median latency of a single-row predict_proba
+    """
+    tracemalloc.start()
+    start = time.perf_counter()
+
+    if rebalance:
+        X_train, y_train, _ = Rebalancer('smote').rebalance(X_train, y_train)
+        model.train(X_train, y_train, apply_smote=False)
+    else:
+        model.train(X_train, y_train)
+
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    latencies = []
+    for i in range(min(200, X_test.shape[0])):
+        row = X_test[i:i + 1]
+        row_start = time.perf_counter()
+        model.predict_proba(row)
+        latencies.append(time.perf_counter() - row_start)
+
+    return {
+        'variant': name,
+        'train_seconds': elapsed,
+        'peak_memory_mb': peak / 1024 / 1024,
+        'f1': model.evaluate(X_test, y_test)['f1'],
+        'predict_ms': float(np.median(latencies)) * 1000
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the categorical feature branch')
+    parser.add_argument('--data', type=str, default='data/fake_job_postings.csv',
+                      help='Path to the dataset CSV file')
+    args = parser.parse_args()
+
+    df = DataLoader().load_data(args.data)
+    features, y, _ = Preprocessor().preprocess_data(df)
+    train_idx, test_idx = train_test_split(np.arange(len(y)), test_size=0.2, random_state=42)
+    y_train, y_test = y[train_idx], y[test_idx]
+
+    X_onehot = features['onehot']
+    X_ordinal = features['ordinal']
+    variants = [
+        ('rf_dense_onehot_smote', RandomForestModel(),
+         X_onehot[train_idx].toarray(), X_onehot[test_idx].toarray(), True),
+        ('rf_sparse_onehot_smote', RandomForestModel(),
+         X_onehot[train_idx], X_onehot[test_idx], True),
+        ('hgb_ordinal_native', HistGradientBoostingModel(),
+         X_ordinal[train_idx], X_ordinal[test_idx], False)
+    ]
+
+    print(f"{'variant':<24} {'train s':>8} {'peak MB':>9} {'F1':>6} {'1-row ms':>9}")
+    for name, model, X_train, X_test, rebalance in variants:
+        result = run_variant(name, model, X_train, y_train, X_test, y_test, rebalance)
+        print(f"{name:<24} {result['train_seconds']:>8.2f} {result['peak_memory_mb']:>9.1f} "
+              f"{result['f1']:>6.3f} {result['predict_ms']:>9.2f}")
+
+if __name__ == '__main__':
+    main()
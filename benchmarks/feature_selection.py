@@ -0,0 +1,98 @@
+"""
+Sweep supervised TF-IDF feature selection: F1 against per-request latency
+and model size of the text models
+
+Usage:
+    python -m benchmarks.feature_selection --data data/fake_job_postings.csv \
+        --methods chi2 mutual_info --sizes 250 500 1000 2000
+"""
+
+import argparse
+import pickle
+import time
+import numpy as np
+from sklearn.model_selection import train_test_split
+
+from data.data_loader import DataLoader
+from data.preprocessor import Preprocessor
+from data.rebalancer import Rebalancer
+from models.ensemble_model import EnsembleModel
+
+def run_config(preprocessor, method, k, features, y, train_idx, test_idx, rebalance):
+    """
+    Select k TF-IDF columns with a method, then train and evaluate the text models
+
+    Returns:
+        Dictionary with the number of columns, F1 of each text model, the
+        median latency of one request through all of them and their pickled size
+    """
+    preprocessor.feature_selection = method
+    preprocessor.selected_features = k
+    preprocessor.feature_selector = None
+    y_train, y_test = y[train_idx], y[test_idx]
+
+    X_train = {'tfidf': preprocessor.fit_feature_selection(features['tfidf'][train_idx], y_train),
+               'signals': features['signals'][train_idx]}
+    X_test = {'tfidf': preprocessor.select_tfidf_features(features['tfidf'][test_idx]),
+              'signals': features['signals'][test_idx]}
+
+    ensemble = EnsembleModel()
+    ensemble.preprocessor = preprocessor
+    ensemble.rebalancer = Rebalancer(rebalance)
+    text_models = {name: model for name, model in ensemble.models.items()
+                   if 'tfidf' in ensemble.feature_sets[name]}
+
+    result = {'method': method or 'none', 'features': X_train['tfidf'].shape[1], 'f1': {}}
+    for name, model in text_models.items():
+        ensemble._train_model(name, model, ensemble._model_input(name, X_train), y_train,
+                              cache_key=(ensemble.feature_sets[name], 'full'))
+        result['f1'][name] = model.evaluate(ensemble._model_input(name, X_test), y_test)['f1']
+
+    # One request: select the columns of a full TF-IDF row, then run every text model
+    full_rows = features['tfidf'][test_idx]
+    latencies = []
+    for i in range(min(200, len(test_idx))):
+        start = time.perf_counter()
+        row = {'tfidf': preprocessor.select_tfidf_features(full_rows[i:i + 1]),
+               'signals': X_test['signals'][i:i + 1]}
+        for name, model in text_models.items():
+            model.predict_proba(ensemble._model_input(name, row))
+        latencies.append(time.perf_counter() - start)
+
+    result['request_ms'] = float(np.median(latencies)) * 1000
+    result['size_kb'] = sum(len(pickle.dumps(model.model)) for model in text_models.values()) / 1024
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description='Sweep supervised TF-IDF feature selection')
+    parser.add_argument('--data', type=str, default='data/fake_job_postings.csv',
+                      help='Path to the dataset CSV file')
+    parser.add_argument('--methods', nargs='+', default=['chi2', 'mutual_info'],
+                      choices=['chi2', 'mutual_info'], help='Selection scores to sweep')
+    parser.add_argument('--sizes', nargs='+', type=int, default=[250, 500, 1000, 2000],
+                      help='Numbers of TF-IDF columns to keep')
+    parser.add_argument('--rebalance', choices=['smote', 'random_oversample', 'class_weight', 'none'],
+                      default='smote', help='Class rebalancing strategy used for training')
+    args = parser.parse_args()
+
+    df = DataLoader().load_data(args.data)
+    preprocessor = Preprocessor()
+    features, y, _ = preprocessor.preprocess_data(df)
+    train_idx, test_idx = train_test_split(np.arange(len(y)), test_size=0.2, random_state=42)
+
+    # Baseline with every vocabulary column, then each method and size
+    configs = [(None, features['tfidf'].shape[1])]
+    configs += [(method, k) for method in args.methods for k in args.sizes
+                if k < features['tfidf'].shape[1]]
+
+    names = [name for name, sets in EnsembleModel().feature_sets.items() if 'tfidf' in sets]
+    header = ' '.join(f"{name[:12] + ' F1':>15}" for name in names)
+    print(f"{'method':<12} {'features':>8} {header} {'request ms':>11} {'size KB':>9}")
+    for method, k in configs:
+        result = run_config(preprocessor, method, k, features, y, train_idx, test_idx, args.rebalance)
+        scores = ' '.join(f"{result['f1'][name]:>15.3f}" for name in names)
+        print(f"{result['method']:<12} {result['features']:>8} {scores} "
+              f"{result['request_ms']:>11.2f} {result['size_kb']:>9.0f}")
+
+if __name__ == '__main__':
+    main()
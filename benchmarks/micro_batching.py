@@ -0,0 +1,95 @@
+"""
+Throughput and latency of the analysis pipeline under synthetic concurrency,
+with and without micro-batching
+
+Usage:
+    python -m benchmarks.micro_batching --model-dir models --data data/fake_job_postings.csv \
+        --concurrency 1 2 4 8 16 32 64 --inference-workers 0 4
+"""
+
+import argparse
+import time
+import threading
+import numpy as np
+
+from models.model_registry import ModelRegistry
+from ui.analysis_pipeline import AnalysisPipeline
+from utils.memory_report import load_workload
+
+def run_load(pipeline, model_version, workload, concurrency, duration):
+    """
+    Closed-loop load: each client sends its next request as soon as the previous one returns
+
+    Returns:
+        Dictionary with the throughput and the latency percentiles in milliseconds
+    """
+    latencies = [[] for _ in range(concurrency)]
+    deadline = time.perf_counter() + duration
+
+    def client(index):
+        i = index
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            pipeline.predict(workload[i % len(workload)], model_version)
+            latencies[index].append(time.perf_counter() - start)
+            i += concurrency
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    all_latencies = np.concatenate([np.array(client_latencies) for client_latencies in latencies])
+    return {
+        'requests_per_second': len(all_latencies) / elapsed,
+        'p50_ms': float(np.percentile(all_latencies, 50)) * 1000,
+        'p99_ms': float(np.percentile(all_latencies, 99)) * 1000
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark micro-batching under concurrency')
+    parser.add_argument('--model-dir', type=str, default='models',
+                      help='Directory with the trained models')
+    parser.add_argument('--data', type=str, default='data/fake_job_postings.csv',
+                      help='Dataset CSV the postings are sampled from')
+    parser.add_argument('--concurrency', nargs='+', type=int, default=[1, 2, 4, 8, 16, 32, 64],
+                      help='Numbers of concurrent clients')
+    parser.add_argument('--duration', type=float, default=5.0,
+                      help='Seconds of load per configuration')
+    parser.add_argument('--inference-workers', nargs='+', type=int, default=[0, 4],
+                      help='Numbers of inference processes (0 runs inference in this process)')
+    parser.add_argument('--max-batch-size', type=int, default=32,
+                      help='Maximum predictions per micro-batch')
+    parser.add_argument('--max-batch-wait-ms', type=float, default=5.0,
+                      help='Maximum milliseconds a prediction waits for a batch')
+    args = parser.parse_args()
+
+    registry = ModelRegistry(args.model_dir)
+    registry.load()
+    _, model_version = registry.current()
+    workload = load_workload(args.data, 500, seed=0)
+
+    print(f"{'workers':>7} {'batching':<10} {'clients':>7} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8} "
+          f"{'mean batch':>11}")
+    for inference_workers in args.inference_workers:
+        for max_batch_size in [1, args.max_batch_size]:
+            for concurrency in args.concurrency:
+                pipeline = AnalysisPipeline(registry, inference_workers=inference_workers,
+                                            max_batch_size=max_batch_size,
+                                            max_batch_wait=args.max_batch_wait_ms / 1000)
+                # Warm up the workers and the arrival rate estimate
+                run_load(pipeline, model_version, workload, concurrency, min(1.0, args.duration))
+                result = run_load(pipeline, model_version, workload, concurrency, args.duration)
+                batching = pipeline.metrics().get('batching', {})
+                pipeline.shutdown()
+
+                label = 'off' if max_batch_size == 1 else f"<= {max_batch_size}"
+                print(f"{inference_workers:>7} {label:<10} {concurrency:>7} {result['requests_per_second']:>8.1f} "
+                      f"{result['p50_ms']:>8.2f} {result['p99_ms']:>8.2f} "
+                      f"{batching.get('mean_batch_size', 1.0):>11.1f}")
+
+if __name__ == '__main__':
+    main()
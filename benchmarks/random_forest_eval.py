@@ -0,0 +1,85 @@
+"""
+Check the flat-array random forest against sklearn and compare their latency
+on single rows and batches
+
+Usage:
+    python -m benchmarks.random_forest_eval --data data/fake_job_postings.csv
+"""
+
+import argparse
+import time
+import numpy as np
+from sklearn.model_selection import train_test_split
+
+from data.data_loader import DataLoader
+from data.preprocessor import Preprocessor
+from data.rebalancer import Rebalancer
+from models.ensemble_model import EnsembleModel
+from models.random_forest_model import RandomForestModel
+
+def median_ms(predict, X, batch_size, repeats):
+    """
+    Median latency of predicting consecutive batches of X
+
+    Returns:
+        Median milliseconds per call
+    """
+    latencies = []
+    for i in range(repeats):
+        start_row = (i * batch_size) % max(1, X.shape[0] - batch_size)
+        batch = X[start_row:start_row + batch_size]
+        start = time.perf_counter()
+        predict(batch)
+        latencies.append(time.perf_counter() - start)
+    return float(np.median(latencies)) * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the flat-array random forest')
+    parser.add_argument('--data', type=str, default='data/fake_job_postings.csv',
+                      help='Path to the dataset CSV file')
+    parser.add_argument('--batch-sizes', nargs='+', type=int, default=[1, 16, 256],
+                      help='Rows per predict_proba call')
+    parser.add_argument('--repeats', type=int, default=200,
+                      help='Calls timed per batch size')
+    args = parser.parse_args()
+
+    df = DataLoader().load_data(args.data)
+    features, y, _ = Preprocessor().preprocess_data(df)
+    train_idx, test_idx = train_test_split(np.arange(len(y)), test_size=0.2, random_state=42)
+
+    # The random forest input of the ensemble: sparse one-hot plus signals
+    ensemble = EnsembleModel()
+    X = ensemble._model_input('random_forest', features)
+    X_train, y_train, _ = Rebalancer('smote').rebalance(X[train_idx], y[train_idx])
+    X_test = X[test_idx]
+
+    model = RandomForestModel()
+    model.train(X_train, y_train, apply_smote=False)
+    forest, flat_forest = model.model, model.flat_forest
+    if flat_forest is None:
+        raise SystemExit("The forest could not be compiled.")
+
+    # Exact equivalence on real rows (sparse and dense) and threshold probes
+    checks = {
+        'test rows (sparse)': X_test,
+        'test rows (dense)': X_test.toarray(),
+        'threshold probes': flat_forest.probe_rows(n_rows=512)
+    }
+    if flat_forest.missing_go_to_left is not None:
+        checks['probes with NaN'] = flat_forest.probe_rows(n_rows=512, missing_rate=0.25)
+    for name, rows in checks.items():
+        identical = flat_forest.check_equivalence(forest, rows)
+        print(f"{name:<20} {rows.shape[0]:>6} rows  {'identical' if identical else 'MISMATCH'}")
+        if not identical:
+            raise SystemExit(1)
+
+    nodes = len(flat_forest.threshold)
+    print(f"\n{len(flat_forest.roots)} trees, {nodes} nodes, max depth {flat_forest.max_depth}")
+    print(f"{'batch':>6} {'sklearn ms':>11} {'flat ms':>9} {'speedup':>8}")
+    for batch_size in args.batch_sizes:
+        sklearn_ms = median_ms(forest.predict_proba, X_test, batch_size, args.repeats)
+        flat_ms = median_ms(flat_forest.predict_proba, X_test, batch_size, args.repeats)
+        print(f"{batch_size:>6} {sklearn_ms:>11.2f} {flat_ms:>9.2f} {sklearn_ms / flat_ms:>7.1f}x")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""
+Benchmark class rebalancing strategies: training time, memory and F1
+
+Usage:
+    python -m benchmarks.rebalancing --data data/fake_job_postings.csv
+"""
+
+import argparse
+import time
+import numpy as np
+from sklearn.model_selection import train_test_split
+
+from data.data_loader import DataLoader
+from data.preprocessor import Preprocessor
+from data.rebalancer import Rebalancer
+from models.logistic_regression_model import LogisticRegressionModel
+from models.random_forest_model import RandomForestModel
+from models.svm_model import SVMModel
+
+# Models that are trained on rebalanced data, and their feature set
+REBALANCED_MODELS = {
+    'logistic_regression': (LogisticRegressionModel, 'tfidf'),
+    'random_forest': (RandomForestModel, 'onehot'),
+    'svm': (SVMModel, 'tfidf')
+}
+
+def benchmark_strategy(strategy, X_train, y_train, X_test, y_test):
+    """
+    Rebalance once per feature set and train every rebalanced model
+
+    Returns:
+        Dictionary with wall time, peak traced memory of rebalancing and per-model F1
+    """
+    rebalancer = Rebalancer(strategy, measure_memory=True)
+
+    start = time.perf_counter()
+
+    f1_scores = {}
+    for name, (model_class, feature_set) in REBALANCED_MODELS.items():
+        X_resampled, y_resampled, sample_weight = rebalancer.rebalance(
+            X_train[feature_set], y_train, key=feature_set
+        )
+        model = model_class()
+        model.train(X_resampled, y_resampled, apply_smote=False, sample_weight=sample_weight)
+        f1_scores[name] = model.evaluate(X_test[feature_set], y_test)['f1']
+
+    elapsed = time.perf_counter() - start
+
+    return {
+        'strategy': strategy,
+        'seconds': elapsed,
+        'rebalance_seconds': sum(stat['seconds'] for stat in rebalancer.stats),
+        'peak_memory_mb': max(stat['peak_memory_mb'] for stat in rebalancer.stats),
+        'f1': f1_scores
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark class rebalancing strategies')
+    parser.add_argument('--data', type=str, default='data/fake_job_postings.csv',
+                      help='Path to the dataset CSV file')
+    parser.add_argument('--strategies', nargs='+', default=list(Rebalancer.STRATEGIES),
+                      choices=Rebalancer.STRATEGIES, help='Strategies to benchmark')
+    args = parser.parse_args()
+
+    df = DataLoader().load_data(args.data)
+    features, y, _ = Preprocessor().preprocess_data(df)
+    train_idx, test_idx = train_test_split(np.arange(len(y)), test_size=0.2, random_state=42)
+    X_train = {key: features[key][train_idx] for key in ('tfidf', 'onehot')}
+    X_test = {key: features[key][test_idx] for key in ('tfidf', 'onehot')}
+    y_train, y_test = y[train_idx], y[test_idx]
+
+    print(f"{'strategy':<18} {'total s':>8} {'rebalance s':>12} {'rebalance MB':>13}  F1 (lr / rf / svm)")
+    for strategy in args.strategies:
+        result = benchmark_strategy(strategy, X_train, y_train, X_test, y_test)
+        f1 = result['f1']
+        print(f"{strategy:<18} {result['seconds']:>8.2f} {result['rebalance_seconds']:>12.2f} "
+              f"{result['peak_memory_mb']:>13.1f}  "
+              f"{f1['logistic_regression']:.3f} / {f1['random_forest']:.3f} / {f1['svm']:.3f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+"""
+Compare the lookup-table single-record preprocessing with the pandas and
+sklearn transform path it replaced: bit-identical output and cost per call
+
+Usage:
+    python -m benchmarks.record_preprocessing --model-dir models --data data/fake_job_postings.csv
+"""
+
+import argparse
+import time
+import numpy as np
+import pandas as pd
+
+from models.ensemble_model import EnsembleModel
+from utils.memory_report import load_workload
+
+def transform_path(preprocessor, text_features, categorical_values):
+    """
+    The previous encoding of one posting: a one-row DataFrame through the
+    fitted vectorizer, selector and encoders
+
+    Returns:
+        Tuple of (TF-IDF row, one-hot row, ordinal row)
+    """
+    tfidf = preprocessor.select_tfidf_features(
+        preprocessor.tfidf_vectorizer.transform([text_features['combined_text']])
+    )
+    categorical = pd.DataFrame([categorical_values])[preprocessor.categorical_columns]
+    onehot = preprocessor.onehot_encoder.transform(categorical.values)
+    ordinal = preprocessor.ordinal_encoder.transform(categorical.values)
+    return tfidf, onehot, ordinal
+
+def lookup_path(preprocessor, text_features, categorical_values):
+    """
+    The lookup-table encoding of one posting
+
+    Returns:
+        Tuple of (TF-IDF row, one-hot row, ordinal row)
+    """
+    encoder = preprocessor.record_encoder
+    onehot, ordinal = encoder.categorical_rows(categorical_values)
+    return encoder.tfidf_row(text_features['combined_text']), onehot, ordinal
+
+def identical(expected, actual):
+    """Whether two rows are bit-identical, including sparse structure and dtypes"""
+    if hasattr(expected, 'indptr'):
+        return (expected.shape == actual.shape and expected.dtype == actual.dtype
+                and np.array_equal(expected.indptr, actual.indptr)
+                and np.array_equal(expected.indices, actual.indices)
+                and np.array_equal(expected.data, actual.data))
+    return expected.dtype == actual.dtype and np.array_equal(expected, actual, equal_nan=True)
+
+def median_us(encode, preprocessor, inputs, repeats):
+    """Median microseconds per encoded posting over repeated passes"""
+    latencies = []
+    for _ in range(repeats):
+        for text_features, categorical_values in inputs:
+            start = time.perf_counter()
+            encode(preprocessor, text_features, categorical_values)
+            latencies.append(time.perf_counter() - start)
+    return float(np.median(latencies)) * 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark single-record preprocessing')
+    parser.add_argument('--model-dir', type=str, default='models',
+                      help='Directory with the trained models and preprocessor')
+    parser.add_argument('--data', type=str, default='data/fake_job_postings.csv',
+                      help='Dataset CSV the postings are sampled from')
+    parser.add_argument('--requests', type=int, default=500,
+                      help='Number of postings to encode')
+    parser.add_argument('--repeats', type=int, default=3,
+                      help='Timed passes over the postings')
+    args = parser.parse_args()
+
+    ensemble = EnsembleModel()
+    ensemble.load_preprocessor(f"{args.model_dir}/preprocessor.pkl")
+    preprocessor = ensemble.preprocessor
+    if getattr(preprocessor, 'record_encoder', None) is None:
+        preprocessor.record_encoder = preprocessor._build_record_encoder()
+
+    # Text cleaning is shared by both paths, so it is done once up front
+    workload = load_workload(args.data, args.requests, seed=0)
+    inputs = [(preprocessor._extract_text_from_job_data(job_data),
+               preprocessor._extract_categorical_from_job_data(job_data))
+              for job_data in workload]
+    # Unknown and empty categories take the fallback paths
+    inputs.append((preprocessor._extract_text_from_job_data({}),
+                   preprocessor._extract_categorical_from_job_data({'location': 'Atlantis'})))
+
+    mismatches = 0
+    for text_features, categorical_values in inputs:
+        expected = transform_path(preprocessor, text_features, categorical_values)
+        actual = lookup_path(preprocessor, text_features, categorical_values)
+        mismatches += not all(identical(e, a) for e, a in zip(expected, actual))
+    print(f"{len(inputs)} postings, {mismatches} with differing output")
+    if mismatches:
+        raise SystemExit(1)
+
+    transform_us = median_us(transform_path, preprocessor, inputs, args.repeats)
+    lookup_us = median_us(lookup_path, preprocessor, inputs, args.repeats)
+    print(f"{'path':<22} {'us/call':>9}")
+    print(f"{'pandas + transform':<22} {transform_us:>9.1f}")
+    print(f"{'lookup tables':<22} {lookup_us:>9.1f}")
+    print(f"speedup {transform_us / lookup_us:.1f}x")
+
+if __name__ == '__main__':
+    main()
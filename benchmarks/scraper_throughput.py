@@ -0,0 +1,70 @@
+"""
+Extraction throughput of BeautifulSoup parser backends on a recorded page corpus
+
+Usage:
+    python main.py --mode record-pages --input urls.txt --corpus data/page_corpus.jsonl.gz
+    python -m benchmarks.scraper_throughput --corpus data/page_corpus.jsonl.gz \
+        --parsers html.parser lxml html5lib --repeat 3
+"""
+
+import argparse
+import time
+import numpy as np
+from bs4 import BeautifulSoup, FeatureNotFound
+
+from utils.job_scraper import JobScraper
+from utils.page_corpus import PageCorpus, EXTRACTED_FIELDS
+
+def run_parser(parser_name, pages, repeat):
+    """
+    Extract every page with one parser backend
+
+    Returns:
+        Tuple of (per-page latencies in milliseconds, extracted job data of the last pass)
+    """
+    scraper = JobScraper(parser=parser_name)
+    latencies = []
+    for _ in range(repeat):
+        extracted = []
+        for page in pages:
+            start = time.perf_counter()
+            extracted.append(scraper.parse_job_posting(page['html'], page['url']))
+            latencies.append((time.perf_counter() - start) * 1000)
+    return np.array(latencies), extracted
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark parser backends on a recorded page corpus')
+    parser.add_argument('--corpus', type=str, default='data/page_corpus.jsonl.gz',
+                      help='Page corpus written by --mode record-pages')
+    parser.add_argument('--parsers', nargs='+', default=['html.parser', 'lxml', 'html5lib'],
+                      help='BeautifulSoup parser backends (the first one is the reference)')
+    parser.add_argument('--repeat', type=int, default=3,
+                      help='Passes over the corpus per parser')
+    args = parser.parse_args()
+
+    pages = PageCorpus(args.corpus).pages()
+    megabytes = sum(len(page['html'].encode('utf-8')) for page in pages) / 1e6
+    print(f"{len(pages)} pages, {megabytes:.1f} MB of markup")
+
+    print(f"{'parser':<12} {'pages/s':>8} {'MB/s':>7} {'p50 ms':>8} {'p95 ms':>8} {'fields = ref':>13}")
+    reference = None
+    for parser_name in args.parsers:
+        try:
+            BeautifulSoup('', parser_name)
+        except FeatureNotFound:
+            print(f"{parser_name:<12} not installed")
+            continue
+
+        latencies, extracted = run_parser(parser_name, pages, args.repeat)
+        if reference is None:
+            reference = extracted
+        # Parsers repair broken markup differently, which can change what the selectors find
+        agreement = np.mean([ref.get(field) == job.get(field)
+                             for ref, job in zip(reference, extracted) for field in EXTRACTED_FIELDS])
+
+        seconds = latencies.sum() / 1000
+        print(f"{parser_name:<12} {len(latencies) / seconds:>8.1f} {megabytes * args.repeat / seconds:>7.2f} "
+              f"{np.percentile(latencies, 50):>8.2f} {np.percentile(latencies, 95):>8.2f} {agreement:>13.1%}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+"""
+Benchmark the vectorized signal feature stage against the per-row extractors
+
+Usage:
+    python -m benchmarks.signal_features --data data/fake_job_postings.csv
+"""
+
+import argparse
+import time
+
+from data.data_loader import DataLoader
+from data.preprocessor import Preprocessor
+from utils.feature_extraction import FeatureExtractor
+from utils.signal_features import SignalFeatureExtractor
+
+def time_per_posting(fn, n_postings, repeat=3):
+    """Best-of-repeat wall time of fn, in microseconds per posting"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best / n_postings * 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the signal feature stage')
+    parser.add_argument('--data', type=str, default='data/fake_job_postings.csv',
+                      help='Path to the dataset CSV file')
+    parser.add_argument('--rows', type=int, default=5000,
+                      help='Number of postings to benchmark on')
+    args = parser.parse_args()
+
+    df = DataLoader().load_data(args.data).head(args.rows)
+    n_postings = len(df)
+    records = df.to_dict('records')
+
+    preprocessor = Preprocessor()
+    preprocessor.preprocess_data(df)
+    signal_extractor = preprocessor.signal_extractor
+    feature_extractor = FeatureExtractor()
+
+    def clean_and_vectorize():
+        combined_text = preprocessor._extract_text_features(df)['combined_text']
+        preprocessor.tfidf_vectorizer.transform(combined_text)
+
+    reference = time_per_posting(clean_and_vectorize, n_postings, repeat=1)
+    results = {
+        'signals (vectorized, batch)': time_per_posting(lambda: signal_extractor.transform(df), n_postings),
+        'signals (single record)': time_per_posting(
+            lambda: [signal_extractor.transform_record(record) for record in records], n_postings
+        ),
+        'FeatureExtractor (per-row loop)': time_per_posting(
+            lambda: [feature_extractor.extract_features(record) for record in records], n_postings
+        )
+    }
+
+    print(f"{n_postings} postings")
+    print(f"{'text cleaning + TF-IDF transform':<36} {reference:>10.1f} us/posting")
+    for name, micros in results.items():
+        print(f"{name:<36} {micros:>10.1f} us/posting ({micros / reference:.1%} of TF-IDF path)")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""
+Measure serving startup time and check it against a budget
+
+Each measurement runs in a fresh interpreter so nothing is cached between runs.
+The check fails (exit code 1) if the median time is over budget or if a
+training-only module is imported on the serving path.
+
+Usage:
+    python -m benchmarks.startup_time --model-dir models --budget 4.0
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+# Modules that only training needs; none of them may be imported when serving
+TRAINING_ONLY_MODULES = ['imblearn', 'data.data_loader', 'data.rebalancer', 'models.weight_optimizer']
+
+STARTUP_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+from ui.app import create_app
+imported = time.perf_counter()
+app = create_app(model_dir={model_dir!r}, watch_models=False, inference_workers=0)
+ready = time.perf_counter()
+print(json.dumps({{
+    'import_seconds': imported - start,
+    'startup_seconds': ready - start,
+    'model_loaded': app.config['MODEL_REGISTRY'].is_loaded(),
+    'training_modules': [name for name in {training_modules!r} if name in sys.modules]
+}}))
+"""
+
+def measure(model_dir):
+    """Run one cold start in a fresh interpreter"""
+    script = STARTUP_SCRIPT.format(model_dir=model_dir, training_modules=TRAINING_ONLY_MODULES)
+    output = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark serving startup time')
+    parser.add_argument('--model-dir', type=str, default='models',
+                      help='Model directory loaded at startup')
+    parser.add_argument('--repeat', type=int, default=5,
+                      help='Number of cold starts to measure')
+    parser.add_argument('--budget', type=float, default=4.0,
+                      help='Maximum median seconds from import to a loaded, ready app')
+    args = parser.parse_args()
+
+    runs = [measure(args.model_dir) for _ in range(args.repeat)]
+    import_seconds = statistics.median(run['import_seconds'] for run in runs)
+    startup_seconds = statistics.median(run['startup_seconds'] for run in runs)
+    training_modules = sorted({name for run in runs for name in run['training_modules']})
+
+    print(f"{args.repeat} cold starts")
+    print(f"{'import ui.app':<28} {import_seconds:>8.3f}s (median)")
+    print(f"{'app ready (models loaded)':<28} {startup_seconds:>8.3f}s (median), budget {args.budget:.3f}s")
+    if not all(run['model_loaded'] for run in runs):
+        print("Warning: models were not loaded; startup time excludes model loading")
+
+    failures = []
+    if startup_seconds > args.budget:
+        failures.append(f"startup time {startup_seconds:.3f}s is over the {args.budget:.3f}s budget")
+    if training_modules:
+        failures.append(f"training-only modules imported when serving: {', '.join(training_modules)}")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if failures:
+        sys.exit(1)
+    print("OK")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+"""
+Supervised scores for selecting TF-IDF features
+"""
+
+import numpy as np
+import scipy.sparse as sp
+from sklearn.feature_selection import chi2
+
+def presence_mutual_info(X, y):
+    """
+    Mutual information between the presence of each term and the label
+
+    sklearn's mutual_info_classif only treats sparse matrices as discrete, and
+    TF-IDF values are effectively unique per document, so the information is
+    computed on term presence instead, in closed form from per-class
+    document counts.
+
+    Args:
+        X: Sparse matrix of TF-IDF features
+        y: Class labels
+
+    Returns:
+        Tuple of (scores, p-values) as SelectKBest expects; p-values are None
+    """
+    y = np.asarray(y)
+    present = sp.csr_matrix(X, copy=True)
+    present.data = np.ones_like(present.data)
+
+    n = len(y)
+    classes = np.unique(y)
+    doc_freq = np.asarray(present.sum(axis=0)).ravel()
+
+    scores = np.zeros(X.shape[1])
+    for label in classes:
+        in_class = y == label
+        class_size = in_class.sum()
+        with_term = np.asarray(present[in_class].sum(axis=0)).ravel()
+        # Cells of the term-presence x class contingency table
+        for joint, marginal, class_count in [
+            (with_term, doc_freq, class_size),
+            (class_size - with_term, n - doc_freq, class_size)
+        ]:
+            mask = joint > 0
+            scores[mask] += joint[mask] / n * np.log(joint[mask] * n / (marginal[mask] * class_count))
+
+    return scores, None
+
+# Score functions available for Preprocessor feature selection
+FEATURE_SCORERS = {
+    'chi2': chi2,
+    'mutual_info': presence_mutual_info
+}
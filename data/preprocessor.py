@@ -3,27 +3,35 @@ Data preprocessor for fake job detection
 """
 
 import re
-import pandas as pd
 import numpy as np
+import scipy.sparse as sp
 from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.preprocessing import OneHotEncoder
+from sklearn.preprocessing import OneHotEncoder, OrdinalEncoder
+from sklearn.feature_selection import SelectKBest
 import nltk
 from nltk.corpus import stopwords
 from nltk.stem import WordNetLemmatizer
 
-# Download NLTK resources if needed
-try:
-    nltk.data.find('corpora/stopwords')
-    nltk.data.find('corpora/wordnet')
-except LookupError:
-    nltk.download('stopwords')
-    nltk.download('wordnet')
-    nltk.download('punkt')
+from utils.signal_features import SignalFeatureExtractor
+from utils.lemma_table import LemmaTable
+from utils.record_encoder import RecordEncoder
+from data.feature_selection import FEATURE_SCORERS
+from utils.nltk_resources import require_nltk_resources
 
 class Preprocessor:
     """Preprocessor for text and categorical features"""
     
-    def __init__(self):
+    def __init__(self, feature_selection=None, selected_features=1000):
+        """
+        Args:
+            feature_selection: Supervised score used to keep only the most
+                informative TF-IDF columns ('chi2' or 'mutual_info'; None keeps all)
+            selected_features: Number of TF-IDF columns kept by feature selection
+        """
+        if feature_selection is not None and feature_selection not in FEATURE_SCORERS:
+            raise ValueError(f"Unknown feature selection: {feature_selection}. "
+                             f"Choose from {sorted(FEATURE_SCORERS)}.")
+        
         # TF-IDF Vectorizer
         self.tfidf_vectorizer = TfidfVectorizer(
             ngram_range=(1, 2),
@@ -33,18 +41,46 @@ class Preprocessor:
             max_features=5000
         )
         
-        # One-Hot Encoder
+        # One-Hot Encoder (sparse, so thousands of locations stay cheap)
         self.onehot_encoder = OneHotEncoder(
-            sparse_output=False,
+            sparse_output=True,
             handle_unknown='ignore'
         )
         
+        # Ordinal Encoder for tree engines with native categorical support.
+        # Rare categories are grouped so every column fits in 255 histogram bins.
+        self.ordinal_encoder = OrdinalEncoder(
+            handle_unknown='use_encoded_value',
+            unknown_value=np.nan,
+            max_categories=255
+        )
+        
+        # Supervised selection of TF-IDF columns (fitted on training rows only)
+        self.feature_selection = feature_selection
+        self.selected_features = selected_features
+        self.feature_selector = None
+        
+        # Hand-crafted signal features (dense block)
+        self.signal_extractor = SignalFeatureExtractor()
+        
+        # NLTK resources are resolved locally; nothing is downloaded here
+        require_nltk_resources()
+        
         # Lemmatizer
         self.lemmatizer = WordNetLemmatizer()
         
         # Stopwords
         self.stop_words = set(stopwords.words('english'))
         
+        # Frozen lemmatizer used for serving (built after fitting TF-IDF)
+        self.lemma_table = None
+        
+        # Lookup tables encoding single postings (built after fitting)
+        self.record_encoder = None
+        
+        # Training out-of-vocabulary rate and category shares (the drift baseline)
+        self.drift_reference = None
+        
         # Flags to track if encoders have been fitted
         self.tfidf_fitted = False
         self.onehot_fitted = False
@@ -62,7 +98,8 @@ class Preprocessor:
             df: pandas DataFrame with the dataset
             
         Returns:
-            TF-IDF features, one-hot encoded features, target labels, and feature names
+            Dictionary of feature matrices ('tfidf', 'onehot', 'ordinal' and
+            'signals'), target labels, and feature names
         """
         # Extract text features
         text_features = self._extract_text_features(df)
@@ -80,70 +117,164 @@ class Preprocessor:
         X_tfidf = self.tfidf_vectorizer.fit_transform(combined_text)
         self.tfidf_fitted = True
         self.tfidf_feature_names = self.tfidf_vectorizer.get_feature_names_out()
+        # The table covers the full vocabulary even if columns are selected
+        # later: TF-IDF rows are normalized over every vocabulary column
+        self.lemma_table = self._build_lemma_table()
         
         # Fit and transform categorical features
         if categorical_features is not None:
-            X_onehot = self.onehot_encoder.fit_transform(categorical_features)
+            X_onehot = self.onehot_encoder.fit_transform(categorical_features).tocsr()
+            X_ordinal = self.ordinal_encoder.fit_transform(categorical_features)
             self.onehot_fitted = True
             self.onehot_feature_names = self.onehot_encoder.get_feature_names_out()
             self.categorical_columns = categorical_features.columns.tolist()
         else:
             X_onehot = None
+            X_ordinal = None
             self.onehot_feature_names = []
             self.categorical_columns = []
         
+        # Compute signal features
+        X_signals = self.signal_extractor.fit_transform(df)
+        
+        self.record_encoder = self._build_record_encoder()
+        self.drift_reference = self._build_drift_reference(combined_text, categorical_features)
+        
         # Combine feature names
         feature_names = {
             'tfidf': self.tfidf_feature_names,
             'onehot': self.onehot_feature_names,
-            'categorical': self.categorical_columns
+            'categorical': self.categorical_columns,
+            'signals': self.signal_extractor.feature_names
+        }
+        
+        features = {
+            'tfidf': X_tfidf,
+            'onehot': X_onehot,
+            'ordinal': X_ordinal,
+            'signals': X_signals
         }
         
-        return X_tfidf, X_onehot, y, feature_names
+        return features, y, feature_names
+    
+    def fit_feature_selection(self, X_tfidf, y):
+        """
+        Choose the TF-IDF columns to keep from labelled training rows
+        
+        Args:
+            X_tfidf: TF-IDF matrix of the training rows (all vocabulary columns)
+            y: Target labels of the training rows
+            
+        Returns:
+            TF-IDF matrix restricted to the selected columns (unchanged if
+            feature selection is disabled)
+        """
+        if self.feature_selection is None:
+            return X_tfidf
+        
+        k = min(self.selected_features, X_tfidf.shape[1])
+        self.feature_selector = SelectKBest(FEATURE_SCORERS[self.feature_selection], k=k)
+        X_selected = self.feature_selector.fit_transform(X_tfidf, y)
+        self.tfidf_feature_names = self.tfidf_vectorizer.get_feature_names_out()[
+            self.feature_selector.get_support()
+        ]
+        self.record_encoder = self._build_record_encoder()
+        return X_selected
+    
+    def select_tfidf_features(self, X_tfidf):
+        """
+        Restrict a full TF-IDF matrix to the selected columns
+        
+        Args:
+            X_tfidf: TF-IDF matrix with all vocabulary columns
+            
+        Returns:
+            TF-IDF matrix with the selected columns (unchanged if no selection was fitted)
+        """
+        if getattr(self, 'feature_selector', None) is None:
+            return X_tfidf
+        return self.feature_selector.transform(X_tfidf)
+    
+    def transform_data(self, df, combined_text=None):
+        """
+        Preprocess a batch of job postings for prediction
+        
+        Args:
+            df: pandas DataFrame with job postings (same columns as the dataset)
+            combined_text: Cleaned combined text of the rows (from
+                _combine_text), if already computed
+            
+        Returns:
+            Dictionary of feature matrices ('tfidf', 'onehot', 'ordinal' and
+            'signals'), one row per posting
+        """
+        if not self.tfidf_fitted or not self.onehot_fitted:
+            raise ValueError("Preprocessor has not been fitted yet.")
+        
+        # Transform TF-IDF features
+        if combined_text is None:
+            combined_text = self._combine_text(df)
+        tfidf_features = self.select_tfidf_features(self.tfidf_vectorizer.transform(combined_text))
+        
+        # Transform categorical features, with missing columns and values as 'Unknown'
+        if self.categorical_columns:
+            categorical_features = df.reindex(columns=self.categorical_columns).astype(object)
+            categorical_features = categorical_features.fillna('Unknown').replace('', 'Unknown')
+            onehot_features = self.onehot_encoder.transform(categorical_features).tocsr()
+            ordinal_features = self.ordinal_encoder.transform(categorical_features)
+        else:
+            onehot_features = sp.csr_matrix((len(df), len(self.onehot_feature_names)))
+            ordinal_features = np.zeros((len(df), 0))
+        
+        return {
+            'tfidf': tfidf_features,
+            'onehot': onehot_features,
+            'ordinal': ordinal_features,
+            'signals': self.signal_extractor.transform(df)
+        }
     
-    def preprocess_job_data(self, job_data):
+    def preprocess_job_data(self, job_data, text_features=None):
         """
         Preprocess a job posting for prediction
         
         Args:
             job_data: Dictionary with job posting details
+            text_features: Cleaned text fields already computed for this
+                posting (from _extract_text_from_job_data), if any
             
         Returns:
-            Dictionary with processed features
+            Dictionary with processed features, the cleaned text, the
+            categorical values and the single-word term counts ('terms')
         """
         if not self.tfidf_fitted or not self.onehot_fitted:
             raise ValueError("Preprocessor has not been fitted yet.")
         
         # Extract text features
-        text_features = self._extract_text_from_job_data(job_data)
+        if text_features is None:
+            text_features = self._extract_text_from_job_data(job_data)
         
         # Extract categorical features
         categorical_features = self._extract_categorical_from_job_data(job_data)
         
-        # Transform TF-IDF features
-        tfidf_features = self.tfidf_vectorizer.transform([text_features['combined_text']])
-        
-        # Transform categorical features
-        if self.categorical_columns and categorical_features is not None:
-            # Ensure all expected columns are present
-            for col in self.categorical_columns:
-                if col not in categorical_features:
-                    categorical_features[col] = 'Unknown'
-            
-            # Make sure the DataFrame has the exact column order expected by the encoder
-            categorical_features = categorical_features[self.categorical_columns]
-            
-            # Transform to one-hot encoding
-            onehot_features = self.onehot_encoder.transform(categorical_features.values)
-        else:
-            # Create an empty array with the correct shape if no categorical features
-            onehot_features = np.zeros((1, len(self.onehot_feature_names)))
+        # Encode through the lookup tables (preprocessors saved before they
+        # existed build them on first use)
+        if getattr(self, 'record_encoder', None) is None:
+            self.record_encoder = self._build_record_encoder()
+        term_stats = {}
+        tfidf_features = self.record_encoder.tfidf_row(text_features['combined_text'], term_stats)
+        onehot_features, ordinal_features = self.record_encoder.categorical_rows(categorical_features)
+        
+        # Compute signal features
+        signal_features = self.signal_extractor.transform_record(job_data)
         
         return {
             'tfidf': tfidf_features,
             'onehot': onehot_features,
+            'ordinal': ordinal_features,
+            'signals': signal_features,
             'text': text_features,
-            'categorical': categorical_features
+            'categorical': categorical_features,
+            'terms': term_stats
         }
     
     def _extract_text_features(self, df):
@@ -166,15 +297,92 @@ class Preprocessor:
             processed_columns[col] = df[col].apply(self._clean_text)
         
         # Combine all text columns
-        combined_text = df[text_columns].fillna('').apply(
+        processed_columns['combined_text'] = self._combine_text(df)
+        
+        return processed_columns
+    
+    def _combine_text(self, df):
+        """
+        Clean the text columns of each row and join them
+        
+        Args:
+            df: pandas DataFrame
+            
+        Returns:
+            pandas Series with the cleaned combined text of each row
+        """
+        text_columns = ['title', 'company_profile', 'description', 'requirements', 'benefits']
+        text_columns = [col for col in text_columns if col in df.columns]
+        
+        return df[text_columns].fillna('').apply(
             lambda row: ' '.join([self._clean_text(str(row[col])) for col in text_columns]),
             axis=1
         )
+    
+    def _build_lemma_table(self):
+        """
+        Freeze the lemmatizer for the fitted TF-IDF vocabulary
         
-        # Add combined text to processed columns
-        processed_columns['combined_text'] = combined_text
+        Returns:
+            LemmaTable
+        """
+        from nltk.corpus import wordnet
+        
+        # Irregular noun plurals (e.g. 'children'), which morphy looks up
+        # instead of applying its suffix rules
+        with wordnet.open('noun.exc') as f:
+            exceptions = [line.split()[0] for line in f if line.strip()]
+        
+        return LemmaTable.build(
+            self.tfidf_feature_names,
+            self.lemmatizer.lemmatize,
+            self.stop_words,
+            nltk.word_tokenize,
+            removed_words=self.tfidf_vectorizer.get_stop_words() or (),
+            exceptions=exceptions
+        )
+    
+    def _build_drift_reference(self, combined_text, categorical_features):
+        """
+        Statistics of the training postings that served postings are compared with
         
-        return processed_columns
+        Args:
+            combined_text: Cleaned combined text of the training rows
+            categorical_features: Categorical columns of the training rows, if any
+            
+        Returns:
+            Dictionary with the share of single-word terms outside the
+            vocabulary ('oov_rate') and the share of each value of each
+            categorical field ('categories')
+        """
+        words = oov = 0
+        for text in combined_text:
+            stats = self.record_encoder.term_stats(text)
+            words += stats['words']
+            oov += len(stats['oov'])
+        
+        categories = {}
+        if categorical_features is not None:
+            for column in categorical_features.columns:
+                shares = categorical_features[column].value_counts(normalize=True)
+                categories[column] = {value: float(share) for value, share in shares.items()}
+        
+        return {'oov_rate': oov / words if words else None, 'categories': categories}
+    
+    def _build_record_encoder(self):
+        """
+        Freeze the fitted vectorizer, selector and encoders into lookup tables
+        
+        Returns:
+            RecordEncoder
+        """
+        return RecordEncoder(
+            self.tfidf_vectorizer,
+            self.onehot_encoder,
+            self.ordinal_encoder,
+            self.categorical_columns,
+            feature_selector=getattr(self, 'feature_selector', None)
+        )
     
     def _extract_categorical_features(self, df):
         """
@@ -236,20 +444,17 @@ class Preprocessor:
             job_data: Dictionary with job posting details
             
         Returns:
-            pandas DataFrame with categorical features
+            Dictionary of categorical field -> value
         """
-        # Define categorical fields to use
-        categorical_fields = ['employment_type', 'required_experience', 'industry', 'function']
+        # Define categorical fields to use (the same columns as in training)
+        categorical_fields = ['employment_type', 'required_experience', 'industry', 'function', 'location']
         
-        # Extract categorical fields
+        # Extract categorical fields; missing or empty values are 'Unknown' as in training
         categorical_data = {}
         for field in categorical_fields:
-            categorical_data[field] = job_data.get(field, 'Unknown')
-        
-        # Convert to DataFrame
-        categorical_features = pd.DataFrame([categorical_data])
+            categorical_data[field] = job_data.get(field) or 'Unknown'
         
-        return categorical_features
+        return categorical_data
     
     def _clean_text(self, text):
         """
@@ -282,6 +487,10 @@ class Preprocessor:
         # Normalize white spaces
         text = re.sub(r'\s+', ' ', text).strip()
         
+        # Served models normalize with the frozen table instead of WordNet
+        if getattr(self, 'lemma_table', None) is not None:
+            return self.lemma_table.normalize(text)
+        
         # Lemmatize words
         words = nltk.word_tokenize(text)
         lemmatized_words = [self.lemmatizer.lemmatize(word) for word in words if word not in self.stop_words]
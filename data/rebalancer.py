@@ -0,0 +1,126 @@
+"""
+Class rebalancing stage for fake job detection
+"""
+
+import time
+import tracemalloc
+import numpy as np
+import scipy.sparse as sp
+from sklearn.utils.class_weight import compute_sample_weight
+from imblearn.over_sampling import SMOTE
+
+class Rebalancer:
+    """Rebalance training data once per feature set and cache the result"""
+
+    STRATEGIES = ('smote', 'random_oversample', 'class_weight', 'none')
+
+    def __init__(self, strategy='smote', random_state=42, measure_memory=False):
+        """
+        Args:
+            strategy: One of 'smote' (k-NN synthesis), 'random_oversample'
+                (duplicates minority rows, stays sparse), 'class_weight'
+                (no resampling, balanced sample weights) or 'none'
+            random_state: Seed for the resampling
+            measure_memory: Trace the peak memory of each run with tracemalloc
+                (slows resampling down considerably; for benchmarks)
+        """
+        if strategy not in self.STRATEGIES:
+            raise ValueError(f"Unknown rebalancing strategy: {strategy}")
+
+        self.strategy = strategy
+        self.random_state = random_state
+        self.measure_memory = measure_memory
+
+        # Rebalanced data keyed by feature set (and fold)
+        self.cache = {}
+
+        # Time and memory spent on each rebalancing run
+        self.stats = []
+
+    def rebalance(self, X, y, key=None):
+        """
+        Rebalance a training set, reusing the cached result for the same key
+
+        Args:
+            X: Feature matrix (dense or sparse)
+            y: Target labels
+            key: Cache key identifying the feature set, e.g. ('tfidf', fold)
+
+        Returns:
+            Tuple of (X_resampled, y_resampled, sample_weight); sample_weight is
+            None unless the strategy is 'class_weight'
+        """
+        if key is not None and key in self.cache:
+            return self.cache[key]
+
+        # Leave an outer tracemalloc session undisturbed
+        trace_memory = self.measure_memory and not tracemalloc.is_tracing()
+        if trace_memory:
+            tracemalloc.start()
+        start = time.perf_counter()
+
+        if self.strategy == 'smote':
+            smote = SMOTE(random_state=self.random_state)
+            X_resampled, y_resampled = smote.fit_resample(X, y)
+            result = (X_resampled, y_resampled, None)
+        elif self.strategy == 'random_oversample':
+            result = self._random_oversample(X, y) + (None,)
+        elif self.strategy == 'class_weight':
+            result = (X, y, compute_sample_weight('balanced', y))
+        else:
+            result = (X, y, None)
+
+        elapsed = time.perf_counter() - start
+        peak = None
+        if trace_memory:
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+        self.stats.append({
+            'key': key,
+            'strategy': self.strategy,
+            'seconds': elapsed,
+            'peak_memory_mb': peak / 1024 / 1024 if peak is not None else None,
+            'rows_in': X.shape[0],
+            'rows_out': result[0].shape[0]
+        })
+
+        if key is not None:
+            self.cache[key] = result
+
+        return result
+
+    def clear(self):
+        """Drop all cached rebalanced data"""
+        self.cache = {}
+
+    def print_report(self):
+        """Print time and memory spent on each rebalancing run"""
+        print(f"\nRebalancing report (strategy: {self.strategy}):")
+        for stat in self.stats:
+            memory = 'n/a' if stat['peak_memory_mb'] is None else f"{stat['peak_memory_mb']:.1f} MB"
+            print(f"{stat['key']}: {stat['seconds']:.2f}s, peak {memory}, "
+                  f"{stat['rows_in']} -> {stat['rows_out']} rows")
+
+    def _random_oversample(self, X, y):
+        """
+        Duplicate minority class rows until all classes are balanced
+
+        Rows are selected by index, so sparse input stays sparse.
+        """
+        rng = np.random.RandomState(self.random_state)
+        classes, counts = np.unique(y, return_counts=True)
+        target = counts.max()
+
+        indices = [np.arange(len(y))]
+        for cls, count in zip(classes, counts):
+            if count < target:
+                class_indices = np.flatnonzero(y == cls)
+                indices.append(rng.choice(class_indices, size=target - count, replace=True))
+        indices = np.concatenate(indices)
+
+        X_resampled = X[indices]
+        if sp.issparse(X_resampled):
+            X_resampled = X_resampled.tocsr()
+
+        return X_resampled, y[indices]
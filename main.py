@@ -6,7 +6,6 @@ Main module to run the application
 import argparse
 import sys
 import logging
-from ui.app import create_app
 
 # Set up logging
 logging.basicConfig(
@@ -23,10 +22,69 @@ logger = logging.getLogger(__name__)
 def parse_arguments():
     """Parse command line arguments"""
     parser = argparse.ArgumentParser(description='The-ROBIN: Fake Job Detection System')
-    parser.add_argument('--mode', choices=['train', 'serve'], default='serve',
-                      help='Mode to run: train (train models) or serve (run web app)')
+    parser.add_argument('--mode', choices=['setup', 'train', 'serve', 'score', 'reweight', 'index-scams',
+                                           'build-reputation', 'shadow-report', 'profile', 'record-pages',
+                                           'replay-pages'],
+                      default='serve',
+                      help='Mode to run: setup (download NLTK resources into the bundled directory), '
+                           'train (train models), serve (run web app), '
+                           'score (score a CSV of postings from --input into --output), '
+                           'reweight (refit ensemble weights from cached out-of-fold probabilities), '
+                           'index-scams (add confirmed fraudulent postings from --data to the near-duplicate index) or '
+                           'build-reputation (build the contact reputation index from list files) or '
+                           'shadow-report (summarize the shadow evaluation log) or '
+                           'profile (report the memory of the serving stack per import, artifact and request) or '
+                           'record-pages (fetch the URLs listed in --input into the --corpus page corpus) or '
+                           'replay-pages (re-extract the --corpus pages offline and report latency, fields and regressions)')
     parser.add_argument('--data', type=str, default='data/fake_job_postings.csv',
                       help='Path to the dataset CSV file')
+    parser.add_argument('--input', type=str,
+                      help='CSV file of job postings to score (score mode), or a file with one URL '
+                           'per line (record-pages mode)')
+    parser.add_argument('--output', type=str,
+                      help='CSV file the verdicts are written to (score mode; an interrupted run '
+                           'resumes when rerun with the same input and output), or the JSON report '
+                           '(profile mode, default memory_profile.json; replay-pages mode, optional)')
+    parser.add_argument('--corpus', type=str, default='data/page_corpus.jsonl.gz',
+                      help='Recorded job page corpus (record-pages and replay-pages modes)')
+    parser.add_argument('--chunk-size', type=int, default=5000,
+                      help='Postings per chunk in score mode')
+    parser.add_argument('--requests', type=int, default=200,
+                      help='Postings from --data replayed in profile mode')
+    parser.add_argument('--oof-folds', type=int, default=5,
+                      help='Folds used for out-of-fold ensemble weight optimization (0 to disable)')
+    parser.add_argument('--rebalance', choices=['smote', 'random_oversample', 'class_weight', 'none'],
+                      default='smote', help='Class rebalancing strategy used for training')
+    parser.add_argument('--categorical-engine', choices=['random_forest', 'hist_gradient_boosting'],
+                      default='random_forest', help='Model used for the categorical feature branch')
+    parser.add_argument('--feature-selection', choices=['none', 'chi2', 'mutual_info'], default='none',
+                      help='Supervised selection of TF-IDF features after vectorization (train mode)')
+    parser.add_argument('--selected-features', type=int, default=1000,
+                      help='Number of TF-IDF features kept by --feature-selection')
+    parser.add_argument('--model-dir', type=str, default='models',
+                      help='Model directory written by training, served and watched for retrained models '
+                           '(or a versioned bundle root)')
+    parser.add_argument('--blocklist', nargs='*', default=[],
+                      help='Files of known scam emails, domains and phone numbers, one per line')
+    parser.add_argument('--allowlist', nargs='*', default=[],
+                      help='Files of verified employer emails, domains and phone numbers, one per line')
+    parser.add_argument('--personal-domains', nargs='*', default=[],
+                      help='Files of additional free email provider domains, one per line')
+    parser.add_argument('--inference-workers', type=int, default=None,
+                      help='Processes used for model inference when serving or scoring '
+                           '(default: one per CPU; 0 runs inference in the main process)')
+    parser.add_argument('--shadow-model-dir', type=str, default=None,
+                      help='Candidate model directory scored on a sample of served traffic (serve mode)')
+    parser.add_argument('--shadow-sample-rate', type=float, default=0.05,
+                      help='Fraction of analyses also scored by the shadow models')
+    parser.add_argument('--shadow-cpu-share', type=float, default=0.1,
+                      help='Maximum fraction of one core spent on shadow scoring')
+    parser.add_argument('--shadow-log', type=str, default='logs/shadow.jsonl',
+                      help='JSON lines log of shadow evaluations')
+    parser.add_argument('--max-batch-size', type=int, default=32,
+                      help='Maximum concurrent predictions run as one batch when serving (1 disables batching)')
+    parser.add_argument('--max-batch-wait-ms', type=float, default=5.0,
+                      help='Maximum milliseconds a prediction waits for others to join its batch')
     parser.add_argument('--port', type=int, default=5000,
                       help='Port for the web application')
     parser.add_argument('--debug', action='store_true',
@@ -38,15 +96,83 @@ def main():
     """Main entry point for the application"""
     args = parse_arguments()
     
-    if args.mode == 'train':
+    if args.mode == 'setup':
+        from utils.nltk_resources import NLTK_DATA_DIR, download_nltk_resources
+        logger.info(f"Downloading NLTK resources into {NLTK_DATA_DIR}...")
+        failed = download_nltk_resources()
+        if failed:
+            logger.error(f"Could not download: {', '.join(failed)}")
+            sys.exit(1)
+        logger.info("NLTK resources installed.")
+    
+    elif args.mode == 'train':
         logger.info("Starting model training...")
         from models.ensemble_model import train_ensemble_model
-        train_ensemble_model(args.data)
+        train_ensemble_model(args.data, oof_folds=args.oof_folds, rebalance_strategy=args.rebalance,
+                             categorical_engine=args.categorical_engine,
+                             feature_selection=None if args.feature_selection == 'none' else args.feature_selection,
+                             selected_features=args.selected_features, base_path=args.model_dir)
         logger.info("Model training completed.")
     
+    elif args.mode == 'score':
+        if not args.input or not args.output:
+            logger.error("Score mode requires --input and --output.")
+            sys.exit(1)
+        logger.info(f"Scoring {args.input}...")
+        from models.batch_scorer import score_csv_file
+        score_csv_file(args.input, args.output, model_dir=args.model_dir,
+                       chunk_size=args.chunk_size, workers=args.inference_workers)
+        logger.info("Scoring completed.")
+    
+    elif args.mode == 'reweight':
+        logger.info("Refitting ensemble weights...")
+        from models.ensemble_model import reweight_ensemble_model
+        reweight_ensemble_model(args.model_dir)
+        logger.info("Ensemble weights updated.")
+    
+    elif args.mode == 'index-scams':
+        logger.info("Indexing known scam postings...")
+        from models.ensemble_model import index_known_scams
+        index_known_scams(args.data, base_path=args.model_dir)
+        logger.info("Near-duplicate index updated.")
+    
+    elif args.mode == 'build-reputation':
+        logger.info("Building contact reputation index...")
+        from models.ensemble_model import build_reputation_index
+        build_reputation_index({
+            'block': args.blocklist,
+            'allow': args.allowlist,
+            'personal': args.personal_domains
+        }, base_path=args.model_dir)
+        logger.info("Reputation index built.")
+    
+    elif args.mode == 'shadow-report':
+        from models.shadow_evaluator import shadow_report
+        shadow_report(args.shadow_log)
+    
+    elif args.mode == 'profile':
+        from utils.memory_report import profile_memory
+        profile_memory(args.model_dir, data_path=args.data, requests=args.requests,
+                       output_path=args.output or 'memory_profile.json')
+    
+    elif args.mode == 'record-pages':
+        if not args.input:
+            logger.error("Record-pages mode requires --input (a file with one URL per line).")
+            sys.exit(1)
+        from utils.page_corpus import record_pages
+        record_pages(args.input, args.corpus)
+    
+    elif args.mode == 'replay-pages':
+        from utils.page_corpus import replay_pages
+        replay_pages(args.corpus, output_path=args.output)
+    
     elif args.mode == 'serve':
         logger.info("Starting web application...")
-        app = create_app()
+        from ui.app import create_app
+        app = create_app(model_dir=args.model_dir, inference_workers=args.inference_workers,
+                         shadow_model_dir=args.shadow_model_dir, shadow_sample_rate=args.shadow_sample_rate,
+                         shadow_cpu_share=args.shadow_cpu_share, shadow_log=args.shadow_log,
+                         max_batch_size=args.max_batch_size, max_batch_wait=args.max_batch_wait_ms / 1000)
         app.run(host='0.0.0.0', port=args.port, debug=args.debug)
 
 if __name__ == "__main__":
@@ -0,0 +1,208 @@
+"""
+Bulk scoring of job posting CSV files with the trained ensemble
+"""
+
+import os
+import json
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from models.ensemble_model import EnsembleModel
+
+# Ensemble loaded in a scoring worker process
+_worker_model = None
+
+def _load_ensemble(model_dir):
+    """Load the trained ensemble from a model directory"""
+    ensemble = EnsembleModel()
+    ensemble.load_models(model_dir)
+    ensemble.load_preprocessor(os.path.join(model_dir, 'preprocessor.pkl'))
+    return ensemble
+
+def _init_worker(model_dir):
+    """Process pool initializer: load the models once per worker"""
+    global _worker_model
+    _worker_model = _load_ensemble(model_dir)
+
+def _score_chunk_in_worker(chunk):
+    """Score a chunk in a worker process"""
+    return score_chunk(_worker_model, chunk)
+
+def score_chunk(ensemble, chunk):
+    """
+    Score a chunk of postings
+
+    Args:
+        ensemble: Trained EnsembleModel
+        chunk: pandas DataFrame of postings; its index holds the input row numbers
+
+    Returns:
+        pandas DataFrame with one verdict row per posting
+    """
+    results = ensemble.predict_batch(chunk)
+
+    output = pd.DataFrame({'row': chunk.index})
+    if 'job_id' in chunk.columns:
+        output['job_id'] = chunk['job_id'].to_numpy()
+    output['is_fake'] = [result['is_fake'] for result in results]
+    output['confidence_score'] = [round(result['confidence_score'], 4) for result in results]
+    for name in ensemble.models:
+        output[f'{name}_probability'] = [result['model_probabilities'].get(name) for result in results]
+    output['matched_cluster'] = [result.get('matched_cluster') for result in results]
+    output['reasons'] = [' | '.join(result['reasons']) for result in results]
+    return output
+
+class BatchScorer:
+    """
+    Stream a CSV of job postings through the ensemble and write verdicts
+
+    The input is read in chunks and each chunk is scored with one batched call
+    per model, on a pool of worker processes that keep the models loaded. At
+    most a few chunks are in flight at a time, and results are appended to the
+    output in input order as soon as they are ready, so memory stays bounded
+    regardless of the input size.
+
+    After every written chunk a small progress file (<output>.progress) records
+    how many chunks are done and the output size at that point. A rerun with
+    the same input and output resumes from there; the progress file is removed
+    once the whole input has been scored.
+    """
+
+    def __init__(self, model_dir='models', chunk_size=5000, workers=None):
+        """
+        Args:
+            model_dir: Directory with the trained model artifacts
+            chunk_size: Number of postings per chunk
+            workers: Number of scoring processes (default: one per CPU; 0
+                scores in the current process)
+        """
+        self.model_dir = model_dir
+        self.chunk_size = chunk_size
+        self.workers = os.cpu_count() if workers is None else workers
+
+    def score_csv(self, input_path, output_path):
+        """
+        Score every posting in a CSV file
+
+        Args:
+            input_path: CSV file with job postings (same columns as the dataset)
+            output_path: CSV file the verdicts are written to
+
+        Returns:
+            Number of postings scored in this run
+        """
+        if not os.path.exists(input_path):
+            raise FileNotFoundError(f"Input file not found: {input_path}")
+
+        progress_path = output_path + '.progress'
+        progress = self._load_progress(progress_path, input_path, output_path)
+        chunk_size = progress['chunk_size']
+        chunks_done = progress['chunks_done']
+
+        if chunks_done:
+            print(f"Resuming after {chunks_done} chunks ({chunks_done * chunk_size} rows)")
+            # Drop anything written after the last checkpoint
+            with open(output_path, 'r+b') as f:
+                f.truncate(progress['output_bytes'])
+        elif os.path.exists(output_path):
+            os.remove(output_path)
+
+        # Read everything as text; missing values become '' like empty form fields
+        chunks = pd.read_csv(input_path, chunksize=chunk_size, dtype=str, keep_default_na=False)
+
+        executor = None
+        if self.workers > 0:
+            executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                           initargs=(self.model_dir,))
+        else:
+            ensemble = _load_ensemble(self.model_dir)
+
+        rows_scored = 0
+        start = time.perf_counter()
+        pending = deque()
+        max_pending = max(self.workers, 1) * 2
+
+        try:
+            with open(output_path, 'a', newline='', encoding='utf-8') as output_file:
+                for chunk_index, chunk in enumerate(chunks):
+                    # A header-only input yields a single empty chunk
+                    if chunk_index < chunks_done or chunk.empty:
+                        continue
+
+                    if executor is not None:
+                        pending.append(executor.submit(_score_chunk_in_worker, chunk))
+                    else:
+                        pending.append(score_chunk(ensemble, chunk))
+
+                    # Write finished chunks in order once enough are in flight
+                    while len(pending) >= max_pending:
+                        rows_scored += self._write_chunk(pending.popleft(), output_file, progress, progress_path)
+                        self._report(rows_scored, start)
+
+                while pending:
+                    rows_scored += self._write_chunk(pending.popleft(), output_file, progress, progress_path)
+                    self._report(rows_scored, start)
+        finally:
+            if executor is not None:
+                executor.shutdown(cancel_futures=True)
+
+        # No checkpoint is written when there was nothing to score
+        if os.path.exists(progress_path):
+            os.remove(progress_path)
+        elapsed = time.perf_counter() - start
+        print(f"Scored {rows_scored} postings in {elapsed:.1f}s "
+              f"({rows_scored / elapsed if elapsed else 0:.1f} rows/s) -> {output_path}")
+        return rows_scored
+
+    def _write_chunk(self, scored, output_file, progress, progress_path):
+        """Append a scored chunk to the output and checkpoint the progress"""
+        output = scored.result() if hasattr(scored, 'result') else scored
+        output.to_csv(output_file, header=output_file.tell() == 0, index=False)
+        output_file.flush()
+        os.fsync(output_file.fileno())
+
+        progress['chunks_done'] += 1
+        progress['output_bytes'] = output_file.tell()
+        tmp_path = progress_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(progress, f)
+        os.replace(tmp_path, progress_path)
+
+        return len(output)
+
+    def _load_progress(self, progress_path, input_path, output_path):
+        """Load the progress of an interrupted run, or start a new one"""
+        stat = os.stat(input_path)
+        fingerprint = {
+            'input': os.path.abspath(input_path),
+            'input_size': stat.st_size,
+            'input_mtime_ns': stat.st_mtime_ns
+        }
+
+        if os.path.exists(progress_path):
+            with open(progress_path) as f:
+                progress = json.load(f)
+            if any(progress.get(key) != value for key, value in fingerprint.items()):
+                raise ValueError(f"{progress_path} belongs to a different input file; "
+                                 f"remove it to start over.")
+            # The checkpointed rows must still be in the output to resume after them
+            if not os.path.exists(output_path) or os.path.getsize(output_path) < progress['output_bytes']:
+                print(f"{output_path} is missing or shorter than its checkpoint; starting over")
+                os.remove(progress_path)
+            else:
+                return progress
+
+        return {**fingerprint, 'chunk_size': self.chunk_size, 'chunks_done': 0, 'output_bytes': 0}
+
+    def _report(self, rows_scored, start):
+        """Print throughput so far"""
+        elapsed = time.perf_counter() - start
+        print(f"{rows_scored} postings scored ({rows_scored / elapsed if elapsed else 0:.1f} rows/s)")
+
+def score_csv_file(input_path, output_path, model_dir='models', chunk_size=5000, workers=None):
+    """Score a CSV file of job postings"""
+    scorer = BatchScorer(model_dir=model_dir, chunk_size=chunk_size, workers=workers)
+    return scorer.score_csv(input_path, output_path)
@@ -3,21 +3,38 @@ Ensemble model for fake job detection combining multiple models
 """
 
 import os
+import time
 import pickle
-from sklearn.model_selection import train_test_split
+import numpy as np
+import scipy.sparse as sp
 
 from models.logistic_regression_model import LogisticRegressionModel
 from models.mlp_model import MLPModel
 from models.random_forest_model import RandomForestModel
 from models.svm_model import SVMModel
-from data.data_loader import DataLoader
-from data.preprocessor import Preprocessor
+from models.hist_gradient_boosting_model import HistGradientBoostingModel
 from utils.reason_generator import ReasonGenerator
+from utils.near_duplicate_index import NearDuplicateIndex
+from utils.coefficient_explainer import CoefficientExplainer
+from utils.drift_sketch import DriftMonitor
+from utils.reputation import ReputationIndex, load_reputation_index, adjust_probability
+from utils.nltk_resources import require_nltk_resources
+
+# Training-only modules (data loading, resampling, splitting, weight
+# optimization) are imported inside the methods that use them, so serving
+# does not pay for them at startup.
+
+# Engines for the categorical branch: model class, feature sets, and whether
+# the model is trained on class-rebalanced data
+CATEGORICAL_ENGINES = {
+    'random_forest': (RandomForestModel, ('onehot', 'signals'), True),
+    'hist_gradient_boosting': (HistGradientBoostingModel, ('ordinal', 'signals'), False)
+}
 
 class EnsembleModel:
     """Ensemble model combining predictions from multiple models"""
     
-    def __init__(self):
+    def __init__(self, categorical_engine='random_forest'):
         self.models = {
             'logistic_regression': LogisticRegressionModel(),
             'mlp': MLPModel(),
@@ -33,9 +50,65 @@ class EnsembleModel:
             'svm': 0.25
         }
         
+        # Feature sets each model is trained on, stacked side by side
+        self.feature_sets = {
+            'logistic_regression': ('tfidf', 'signals'),
+            'mlp': ('tfidf', 'signals'),
+            'random_forest': ('onehot', 'signals'),
+            'svm': ('tfidf', 'signals')
+        }
+        
+        # Whether each model is trained on class-rebalanced data
+        self.rebalance = {
+            'logistic_regression': True,
+            'mlp': False,  # MLP works best without SMOTE
+            'random_forest': True,
+            'svm': True
+        }
+        
+        # Models cheap enough to give a provisional score while the rest run
+        self.fast_models = ('logistic_regression', 'random_forest')
+        
+        self.categorical_engine = 'random_forest'
+        self.set_categorical_engine(categorical_engine)
+        
         self.preprocessor = None
+        self.rebalancer = None
+        self.duplicate_index = None
+        self.reputation = None
+        self.explainer = None
+        self.drift = None
         self.reason_generator = ReasonGenerator()
         self.is_trained = False
+    
+    def set_categorical_engine(self, engine):
+        """
+        Choose the model used for the categorical branch
+        
+        Args:
+            engine: 'random_forest' (sparse one-hot features) or
+                'hist_gradient_boosting' (ordinal codes, native categorical splits)
+        """
+        if engine not in CATEGORICAL_ENGINES:
+            raise ValueError(f"Unknown categorical engine: {engine}")
+        
+        current = self.categorical_engine
+        if engine == current:
+            return
+        
+        model_class, feature_sets, rebalance = CATEGORICAL_ENGINES[engine]
+        
+        def replace(mapping, value):
+            return {
+                (engine if name == current else name): (value if name == current else item)
+                for name, item in mapping.items()
+            }
+        
+        self.models = replace(self.models, model_class())
+        self.weights = replace(self.weights, self.weights[current])
+        self.feature_sets = replace(self.feature_sets, feature_sets)
+        self.rebalance = replace(self.rebalance, rebalance)
+        self.categorical_engine = engine
         
     def set_weights(self, weights):
         """
@@ -53,66 +126,253 @@ class EnsembleModel:
                 for model in self.weights:
                     self.weights[model] /= total
     
-    def train(self, data_path):
+    def train(self, data_path, oof_folds=5, rebalance_strategy='smote', feature_selection=None,
+              selected_features=1000, base_path='models'):
         """
         Train all models in the ensemble
         
         Args:
             data_path: Path to the dataset CSV file
+            oof_folds: Number of folds used to produce out-of-fold probabilities
+                for weight optimization (0 keeps the current weights)
+            rebalance_strategy: Class rebalancing strategy (see Rebalancer)
+            feature_selection: Supervised TF-IDF column selection ('chi2',
+                'mutual_info' or None to keep every column)
+            selected_features: Number of TF-IDF columns kept by feature selection
+            base_path: Directory the models, preprocessor and out-of-fold
+                probabilities are written to
         """
+        from sklearn.model_selection import train_test_split
+        from data.data_loader import DataLoader
+        from data.preprocessor import Preprocessor
+        from data.rebalancer import Rebalancer
+        from models.weight_optimizer import EnsembleWeightOptimizer, print_weight_report
+        
+        self.rebalancer = Rebalancer(rebalance_strategy)
+        
         # Load and preprocess the data
         data_loader = DataLoader()
         df = data_loader.load_data(data_path)
         
         # Initialize the preprocessor
-        self.preprocessor = Preprocessor()
+        self.preprocessor = Preprocessor(feature_selection=feature_selection,
+                                         selected_features=selected_features)
         
         # Preprocess the data
-        X_tfidf, X_onehot, y, feature_names = self.preprocessor.preprocess_data(df)
+        features, y, feature_names = self.preprocessor.preprocess_data(df)
         
         # Split the data
-        X_tfidf_train, X_tfidf_test, X_onehot_train, X_onehot_test, y_train, y_test = train_test_split(
-            X_tfidf, X_onehot, y, test_size=0.2, random_state=42
-        )
+        train_idx, test_idx = train_test_split(np.arange(len(y)), test_size=0.2, random_state=42)
+        X_train = {key: X[train_idx] for key, X in features.items() if X is not None}
+        X_test = {key: X[test_idx] for key, X in features.items() if X is not None}
+        y_train, y_test = y[train_idx], y[test_idx]
         
-        # Train each model with its optimal preprocessing
-        print("Training Logistic Regression model...")
-        self.models['logistic_regression'].train(X_tfidf_train, y_train, apply_smote=True)
-        
-        print("Training MLP model...")
-        self.models['mlp'].train(X_tfidf_train, y_train)  # No SMOTE for MLP
+        # Keep the most informative TF-IDF columns, chosen on the training rows only
+        X_train['tfidf'] = self.preprocessor.fit_feature_selection(X_train['tfidf'], y_train)
+        X_test['tfidf'] = self.preprocessor.select_tfidf_features(X_test['tfidf'])
+        if self.preprocessor.feature_selector is not None:
+            print(f"Selected {X_train['tfidf'].shape[1]} of {features['tfidf'].shape[1]} "
+                  f"TF-IDF features ({feature_selection})")
         
-        print("Training Random Forest model...")
-        self.models['random_forest'].train(X_onehot_train, y_train, apply_smote=True)
+        # Train each model with its optimal preprocessing
+        for name, model in self.models.items():
+            print(f"Training {name} model...")
+            start = time.perf_counter()
+            self._train_model(name, model, self._model_input(name, X_train), y_train,
+                              cache_key=(self.feature_sets[name], 'full'))
+            print(f"Trained in {time.perf_counter() - start:.2f}s")
+        self.rebalancer.clear()
         
-        print("Training SVM model...")
-        self.models['svm'].train(X_tfidf_train, y_train, apply_smote=True)
+        # Extract the text model's phrase contributions for explanations
+        self.explainer = self._build_explainer(X_train)
         
         # Evaluate each model
         print("\nEvaluating individual models:")
         for name, model in self.models.items():
-            X_test = X_tfidf_test if name != 'random_forest' else X_onehot_test
-            evaluation = model.evaluate(X_test, y_test)
+            evaluation = model.evaluate(self._model_input(name, X_test), y_test)
             print(f"\n{name.upper()} Model:")
             print(f"Accuracy: {evaluation['accuracy']:.4f}")
             print(f"Precision: {evaluation['precision']:.4f}")
             print(f"Recall: {evaluation['recall']:.4f}")
             print(f"F1 Score: {evaluation['f1']:.4f}")
         
+        # Learn the ensemble weights from out-of-fold probabilities
+        if oof_folds and oof_folds > 1:
+            print(f"\nComputing {oof_folds}-fold out-of-fold probabilities...")
+            oof_probabilities = self._compute_oof_probabilities(X_train, y_train, oof_folds)
+            optimizer = EnsembleWeightOptimizer(oof_probabilities, y_train)
+            optimizer.save(os.path.join(base_path, 'oof_probabilities.pkl'))
+            self.weights = optimizer.fit()
+            print_weight_report(optimizer, self.weights)
+        
+        self.rebalancer.print_report()
+        
+        # Index the confirmed fraudulent postings for near-duplicate lookups
+        self.duplicate_index = NearDuplicateIndex()
+        self.add_known_scams(df)
+        
         # Save the models
-        self.save_models()
+        self.save_models(base_path)
         
         # Save the preprocessor
-        self.save_preprocessor()
+        self.save_preprocessor(os.path.join(base_path, 'preprocessor.pkl'))
         
         self.is_trained = True
+    
+    def add_known_scams(self, df):
+        """
+        Add confirmed fraudulent postings to the near-duplicate index
+        
+        Args:
+            df: pandas DataFrame of postings; if it has a 'fraudulent' column
+                only the rows labelled 1 are added
+            
+        Returns:
+            Number of postings added
+        """
+        if 'fraudulent' in df.columns:
+            df = df[df['fraudulent'] == 1]
+        if df.empty:
+            return 0
+        
+        doc_ids = df['job_id'] if 'job_id' in df.columns else df.index
+        combined_text = self.preprocessor._extract_text_features(df)['combined_text']
+        
+        added = 0
+        for doc_id, text in zip(doc_ids, combined_text):
+            if self.duplicate_index.add(doc_id, text) is not None:
+                added += 1
+        
+        print(f"Indexed {added} known scam postings "
+              f"({len(set(self.duplicate_index.clusters.values()))} clusters)")
+        return added
+    
+    def _train_model(self, name, model, X_train, y_train, cache_key=None):
+        """
+        Train a single model with its preferred class rebalancing
+        
+        Models sharing a feature set share the cache key, so the rebalanced
+        data is computed once and reused (e.g. SMOTE on TF-IDF for LR and SVM).
+        """
+        if self.rebalance[name]:
+            X_resampled, y_resampled, sample_weight = self.rebalancer.rebalance(X_train, y_train, key=cache_key)
+            model.train(X_resampled, y_resampled, apply_smote=False, sample_weight=sample_weight)
+        elif isinstance(model, HistGradientBoostingModel):
+            # Ordinal codes come first, followed by the numeric signal block
+            n_categorical = len(self.preprocessor.categorical_columns)
+            model.train(X_train, y_train, categorical_features=list(range(n_categorical)))
+        else:
+            model.train(X_train, y_train)
+    
+    def _build_explainer(self, features):
+        """
+        Build the phrase explainer from the trained logistic regression
+        
+        Args:
+            features: Dictionary of feature matrices keyed by feature set (used
+                for the widths of the blocks stacked before the TF-IDF block)
+            
+        Returns:
+            CoefficientExplainer, or None if no model uses TF-IDF linearly
+        """
+        model = self.models.get('logistic_regression')
+        feature_sets = self.feature_sets.get('logistic_regression', ())
+        if model is None or 'tfidf' not in feature_sets:
+            return None
+        
+        offset = sum(features[key].shape[1] for key in feature_sets[:feature_sets.index('tfidf')])
+        return CoefficientExplainer.from_model(model, self.preprocessor.tfidf_feature_names, offset)
+    
+    def _model_input(self, name, features):
+        """
+        Stack the feature sets a model uses into a single matrix
+        
+        Args:
+            name: Model name
+            features: Dictionary of feature matrices keyed by feature set
+            
+        Returns:
+            Sparse CSR matrix if any block is sparse, dense array otherwise
+        """
+        blocks = [features[key] for key in self.feature_sets[name]]
+        if len(blocks) == 1:
+            return blocks[0]
+        if any(sp.issparse(block) for block in blocks):
+            return sp.hstack(blocks, format='csr')
+        return np.hstack(blocks)
+    
+    def _compute_oof_probabilities(self, X_train, y_train, n_folds):
+        """
+        Compute out-of-fold probabilities for every model
+        
+        Each fold trains a fresh copy of every model on the remaining folds, so
+        every training row gets a probability from models that never saw it.
+        
+        Args:
+            X_train: Dictionary of training feature matrices keyed by feature set
+            y_train: Training labels
+            n_folds: Number of folds
+            
+        Returns:
+            Dictionary mapping model name to out-of-fold probabilities
+        """
+        from sklearn.model_selection import StratifiedKFold
+        
+        oof_probabilities = {name: np.zeros(len(y_train)) for name in self.models}
+        folds = StratifiedKFold(n_splits=n_folds, shuffle=True, random_state=42)
+        
+        for fold, (fit_idx, holdout_idx) in enumerate(folds.split(np.zeros(len(y_train)), y_train), start=1):
+            print(f"Fold {fold}/{n_folds}...")
+            for name, model in self.models.items():
+                X = self._model_input(name, X_train)
+                fold_model = model.__class__()
+                self._train_model(name, fold_model, X[fit_idx], y_train[fit_idx],
+                                  cache_key=(self.feature_sets[name], fold))
+                oof_probabilities[name][holdout_idx] = fold_model.predict_proba(X[holdout_idx])[:, 1]
+            self.rebalancer.clear()
+        
+        return oof_probabilities
+    
+    def reweight(self, oof_path=None, base_path='models'):
+        """
+        Refit the ensemble weights from cached out-of-fold probabilities
+        
+        Models are not retrained; only the weights file is rewritten.
+        
+        Args:
+            oof_path: Path to the cached out-of-fold probabilities (default:
+                oof_probabilities.pkl in base_path)
+            base_path: Directory holding the models and the ensemble weights
+            
+        Returns:
+            Dictionary with the new weights
+        """
+        from models.weight_optimizer import EnsembleWeightOptimizer, print_weight_report
+        
+        if oof_path is None:
+            oof_path = os.path.join(base_path, 'oof_probabilities.pkl')
+        optimizer = EnsembleWeightOptimizer.load(oof_path)
+        self.weights = optimizer.fit()
+        print_weight_report(optimizer, self.weights)
+        
+        os.makedirs(base_path, exist_ok=True)
+        with open(os.path.join(base_path, "ensemble_weights.pkl"), 'wb') as f:
+            pickle.dump(self.weights, f)
+        
+        return self.weights
         
-    def predict(self, job_data):
+    def predict(self, job_data, timings=None, on_stage=None):
         """
         Predict if a job posting is fake
         
         Args:
             job_data: Dictionary with job posting details
+            timings: Optional dictionary filled with the seconds spent on
+                preprocessing ('preprocess') and in each model (by model name)
+            on_stage: Optional function called with (stage, partial result) as
+                scores become available: 'fast' once the fast models have run
+                (provisional score), 'ensemble' once every model has run
+                (final score, before reasons are generated)
             
         Returns:
             Dictionary with prediction results
@@ -121,22 +381,144 @@ class EnsembleModel:
             self.load_models()
             self.load_preprocessor()
             
+        # Check the contacts against the reputation lists
+        reputation_hits = None
+        if self.reputation is not None:
+            reputation_hits = self.reputation.check_contacts(job_data.get('contact_info'))
+        
+        # Clean the text once; it is shared by the duplicate lookup and the models
+        start = time.perf_counter()
+        text_features = self.preprocessor._extract_text_from_job_data(job_data)
+        
+        # Reposted scam templates are answered from the index without inference
+        if self.duplicate_index is not None:
+            match = self.duplicate_index.query(text_features['combined_text'])
+            if match is not None:
+                result = self._known_scam_result(job_data, match, reputation_hits)
+                self._track_known_scam(text_features['combined_text'], job_data, result)
+                return result
+        
         # Preprocess the job data
-        features = self.preprocessor.preprocess_job_data(job_data)
-        
-        # Get predictions from each model
-        lr_prob = self.models['logistic_regression'].predict_proba(features['tfidf'])[0][1]
-        mlp_prob = self.models['mlp'].predict_proba(features['tfidf'])[0][1]
-        rf_prob = self.models['random_forest'].predict_proba(features['onehot'])[0][1]
-        svm_prob = self.models['svm'].predict_proba(features['tfidf'])[0][1]
-        
-        # Calculate weighted ensemble probability
-        ensemble_prob = (
-            self.weights['logistic_regression'] * lr_prob +
-            self.weights['mlp'] * mlp_prob +
-            self.weights['random_forest'] * rf_prob +
-            self.weights['svm'] * svm_prob
-        )
+        features = self.preprocessor.preprocess_job_data(job_data, text_features=text_features)
+        if timings is not None:
+            timings['preprocess'] = time.perf_counter() - start
+        
+        # Get predictions from each model, fast models first
+        model_probabilities = {}
+        fast_models = [name for name in self.models if name in self.fast_models]
+        last_fast = fast_models[-1] if 0 < len(fast_models) < len(self.models) else None
+        for name in fast_models + [name for name in self.models if name not in fast_models]:
+            start = time.perf_counter()
+            model_probabilities[name] = self.models[name].predict_proba(self._model_input(name, features))[0][1]
+            if timings is not None:
+                timings[name] = time.perf_counter() - start
+            if on_stage is not None and name == last_fast:
+                on_stage('fast', self._score_result(model_probabilities, reputation_hits, provisional=True))
+        model_probabilities = {name: model_probabilities[name] for name in self.models}
+        if on_stage is not None:
+            on_stage('ensemble', self._score_result(model_probabilities, reputation_hits))
+        
+        # Phrases that pushed the text model toward fraud
+        top_phrases = self.explainer.explain(features['tfidf']) if self.explainer is not None else None
+        
+        result = self._build_result(job_data, model_probabilities, reputation_hits, top_phrases)
+        self.drift_monitor().update(features['terms'], features['categorical'], model_probabilities,
+                                    result['confidence_score'])
+        return result
+    
+    def predict_batch(self, df, records=None):
+        """
+        Predict a batch of job postings with one model call per model
+        
+        Args:
+            df: pandas DataFrame with job postings (same columns as the dataset)
+            records: Job posting dictionaries the rows were built from, if any;
+                reasons and contact checks then see the postings as given
+                rather than with missing fields filled in as NaN
+            
+        Returns:
+            List of prediction result dictionaries (as returned by predict), in row order
+        """
+        if not self.is_trained:
+            self.load_models()
+            self.load_preprocessor()
+        
+        if records is None:
+            records = df.to_dict('records')
+        reputation_hits = [
+            self.reputation.check_contacts(record.get('contact_info')) if self.reputation is not None else None
+            for record in records
+        ]
+        combined_text = self.preprocessor._combine_text(df)
+        
+        # Reposted scam templates are answered from the index without inference
+        results = [None] * len(records)
+        if self.duplicate_index is not None:
+            for i, text in enumerate(combined_text):
+                match = self.duplicate_index.query(text)
+                if match is not None:
+                    results[i] = self._known_scam_result(records[i], match, reputation_hits[i])
+                    self._track_known_scam(text, records[i], results[i])
+        
+        remaining = [i for i, result in enumerate(results) if result is None]
+        if not remaining:
+            return results
+        
+        # Run every model once over the remaining rows
+        features = self.preprocessor.transform_data(df.iloc[remaining], combined_text.iloc[remaining])
+        batch_probabilities = {
+            name: model.predict_proba(self._model_input(name, features))[:, 1]
+            for name, model in self.models.items()
+        }
+        
+        drift = self.drift_monitor()
+        for row, i in enumerate(remaining):
+            model_probabilities = {name: probs[row] for name, probs in batch_probabilities.items()}
+            top_phrases = self.explainer.explain(features['tfidf'], row) if self.explainer is not None else None
+            results[i] = self._build_result(records[i], model_probabilities, reputation_hits[i], top_phrases)
+            drift.update(self.preprocessor.record_encoder.term_stats(combined_text.iloc[i]),
+                         self.preprocessor._extract_categorical_from_job_data(records[i]),
+                         model_probabilities, results[i]['confidence_score'])
+        
+        return results
+    
+    def drift_monitor(self):
+        """
+        Streaming sketches of the postings and scores this model has served
+        
+        Returns:
+            DriftMonitor (built on first use from the preprocessor's
+            categories and training reference)
+        """
+        if self.drift is None:
+            if getattr(self.preprocessor, 'record_encoder', None) is None:
+                self.preprocessor.record_encoder = self.preprocessor._build_record_encoder()
+            encoder = self.preprocessor.record_encoder
+            categories = {column: list(values) for column, values in zip(encoder.categorical_columns,
+                                                                         encoder.onehot_columns)}
+            self.drift = DriftMonitor(self.models, categories, getattr(self.preprocessor, 'drift_reference', None))
+        return self.drift
+    
+    def _track_known_scam(self, combined_text, job_data, result):
+        """Add a posting answered from the near-duplicate index to the drift sketches"""
+        self.drift_monitor().update(self.preprocessor.record_encoder.term_stats(combined_text),
+                                    self.preprocessor._extract_categorical_from_job_data(job_data),
+                                    {}, result['confidence_score'], known_scam=True)
+    
+    def _build_result(self, job_data, model_probabilities, reputation_hits=None, top_phrases=None):
+        """
+        Combine model probabilities into the prediction for one posting
+        
+        Args:
+            job_data: Dictionary with job posting details
+            model_probabilities: Dictionary mapping model name to fraud probability
+            reputation_hits: Contacts found on reputation lists, if checked
+            top_phrases: (phrase, contribution) pairs from the explainer, if available
+            
+        Returns:
+            Dictionary with prediction results
+        """
+        ensemble_prob = self._ensemble_probability(model_probabilities, reputation_hits)
         
         # Calculate confidence score (0-100)
         confidence_score = ensemble_prob * 100
@@ -145,26 +527,91 @@ class EnsembleModel:
         reasons = self.reason_generator.generate_reasons(
             job_data,
             confidence_score,
-            {
-                'logistic_regression': lr_prob,
-                'mlp': mlp_prob,
-                'random_forest': rf_prob,
-                'svm': svm_prob
-            }
+            model_probabilities,
+            reputation_hits,
+            top_phrases
         )
         
         # Return the prediction results
-        return {
+        result = {
             'is_fake': bool(ensemble_prob > 0.5),  # Convert to native Python bool
             'confidence_score': float(confidence_score),  # Convert to native Python float
             'reasons': reasons,
             'model_probabilities': {
-                'logistic_regression': float(lr_prob),  # Convert to native Python float
-                'mlp': float(mlp_prob),
-                'random_forest': float(rf_prob),
-                'svm': float(svm_prob)
+                name: float(prob)  # Convert to native Python float
+                for name, prob in model_probabilities.items()
             }
         }
+        if reputation_hits is not None:
+            result['reputation_hits'] = reputation_hits
+        if top_phrases is not None:
+            result['top_phrases'] = [phrase for phrase, _ in top_phrases]
+        return result
+    
+    def _ensemble_probability(self, model_probabilities, reputation_hits=None):
+        """Weighted ensemble probability, adjusted for contact reputation"""
+        ensemble_prob = sum(
+            self.weights.get(name, 0) * prob for name, prob in model_probabilities.items()
+        )
+        
+        # Blocklisted contacts raise the probability, allowlisted employers lower it
+        return adjust_probability(ensemble_prob, reputation_hits)
+    
+    def _score_result(self, model_probabilities, reputation_hits=None, provisional=False):
+        """
+        Score of a posting without reasons, for progressive results
+        
+        Args:
+            model_probabilities: Fraud probability of each model run so far
+            reputation_hits: Contacts found on reputation lists, if checked
+            provisional: Whether only some models have run; their weights are
+                then rescaled to sum to one
+            
+        Returns:
+            Dictionary with is_fake, confidence_score, model_probabilities and provisional
+        """
+        if provisional:
+            weighted = sum(self.weights.get(name, 0) * prob for name, prob in model_probabilities.items())
+            total = sum(self.weights.get(name, 0) for name in model_probabilities)
+            ensemble_prob = adjust_probability(weighted / total if total > 0 else weighted, reputation_hits)
+        else:
+            ensemble_prob = self._ensemble_probability(model_probabilities, reputation_hits)
+        
+        return {
+            'is_fake': bool(ensemble_prob > 0.5),
+            'confidence_score': float(ensemble_prob * 100),
+            'model_probabilities': {name: float(prob) for name, prob in model_probabilities.items()},
+            'provisional': provisional
+        }
+    
+    def _known_scam_result(self, job_data, match, reputation_hits=None):
+        """
+        Build the prediction for a near-duplicate of a known scam posting
+        
+        Args:
+            job_data: Dictionary with job posting details
+            match: Match returned by NearDuplicateIndex.query
+            reputation_hits: Contacts found on reputation lists, if checked
+            
+        Returns:
+            Dictionary with prediction results
+        """
+        confidence_score = match['similarity'] * 100
+        reasons = [
+            f"Nearly identical ({confidence_score:.0f}% similar) to a known fraudulent posting."
+        ] + self.reason_generator.generate_reasons(job_data, confidence_score, None, reputation_hits)
+        
+        result = {
+            'is_fake': True,
+            'confidence_score': float(confidence_score),
+            'reasons': reasons[:10],
+            'model_probabilities': {},
+            'matched_cluster': match['cluster_id'],
+            'similarity': float(match['similarity'])
+        }
+        if reputation_hits is not None:
+            result['reputation_hits'] = reputation_hits
+        return result
     
     def save_models(self, base_path='models'):
         """Save all models to disk"""
@@ -178,9 +625,30 @@ class EnsembleModel:
         weights_path = os.path.join(base_path, "ensemble_weights.pkl")
         with open(weights_path, 'wb') as f:
             pickle.dump(self.weights, f)
+        
+        # Save ensemble configuration
+        config_path = os.path.join(base_path, "ensemble_config.pkl")
+        with open(config_path, 'wb') as f:
+            pickle.dump({'categorical_engine': self.categorical_engine}, f)
+        
+        # Save the phrase explainer
+        if self.explainer is not None:
+            with open(os.path.join(base_path, "coefficient_explainer.pkl"), 'wb') as f:
+                pickle.dump(self.explainer, f)
+        
+        # Save the near-duplicate index of known scams
+        if self.duplicate_index is not None:
+            self.duplicate_index.save(os.path.join(base_path, "near_duplicate_index.pkl"))
     
     def load_models(self, base_path='models'):
         """Load all models from disk"""
+        # Load ensemble configuration if available
+        config_path = os.path.join(base_path, "ensemble_config.pkl")
+        if os.path.exists(config_path):
+            with open(config_path, 'rb') as f:
+                config = pickle.load(f)
+            self.set_categorical_engine(config.get('categorical_engine', 'random_forest'))
+        
         for name, model in self.models.items():
             model_path = os.path.join(base_path, f"{name}_model.pkl")
             try:
@@ -194,6 +662,20 @@ class EnsembleModel:
         if os.path.exists(weights_path):
             with open(weights_path, 'rb') as f:
                 self.weights = pickle.load(f)
+        
+        # Load the phrase explainer if available
+        explainer_path = os.path.join(base_path, "coefficient_explainer.pkl")
+        if os.path.exists(explainer_path):
+            with open(explainer_path, 'rb') as f:
+                self.explainer = pickle.load(f)
+        
+        # Load the near-duplicate index if available
+        index_path = os.path.join(base_path, "near_duplicate_index.pkl")
+        if os.path.exists(index_path):
+            self.duplicate_index = NearDuplicateIndex.load(index_path)
+        
+        # Load the contact reputation index if it has been built
+        self.reputation = load_reputation_index(os.path.join(base_path, "reputation"))
                 
         self.is_trained = True
     
@@ -210,12 +692,48 @@ class EnsembleModel:
         """Load preprocessor from disk"""
         if not os.path.exists(path):
             raise FileNotFoundError(f"Preprocessor file not found: {path}")
-            
+        
         with open(path, 'rb') as f:
             self.preprocessor = pickle.load(f)
+        
+        # Preprocessors saved without a lemma table clean text with NLTK;
+        # fail early with the setup command if its resources are missing
+        if getattr(self.preprocessor, 'lemma_table', None) is None:
+            require_nltk_resources()
+
+def train_ensemble_model(data_path, oof_folds=5, rebalance_strategy='smote',
+                         categorical_engine='random_forest', feature_selection=None,
+                         selected_features=1000, base_path='models'):
+    """Train the ensemble model and save it to base_path"""
+    ensemble = EnsembleModel(categorical_engine=categorical_engine)
+    ensemble.train(data_path, oof_folds=oof_folds, rebalance_strategy=rebalance_strategy,
+                   feature_selection=feature_selection, selected_features=selected_features,
+                   base_path=base_path)
+    return ensemble
+
+def index_known_scams(data_path, base_path='models'):
+    """Add confirmed fraudulent postings from a CSV file to the near-duplicate index"""
+    from data.data_loader import DataLoader
+    
+    ensemble = EnsembleModel()
+    ensemble.load_models(base_path)
+    ensemble.load_preprocessor(os.path.join(base_path, 'preprocessor.pkl'))
+    if ensemble.duplicate_index is None:
+        ensemble.duplicate_index = NearDuplicateIndex()
+    
+    df = DataLoader().load_data(data_path)
+    added = ensemble.add_known_scams(df)
+    ensemble.duplicate_index.save(os.path.join(base_path, "near_duplicate_index.pkl"))
+    return added
+
+def build_reputation_index(list_files, base_path='models'):
+    """Build the contact reputation index from block/allow/personal list files"""
+    index = ReputationIndex(os.path.join(base_path, "reputation"))
+    count = index.build(list_files)
+    print(f"Reputation index built with {count} entries")
+    return index
 
-def train_ensemble_model(data_path):
-    """Train the ensemble model"""
+def reweight_ensemble_model(base_path='models', oof_path=None):
+    """Refit the ensemble weights of a model directory from its cached out-of-fold probabilities"""
     ensemble = EnsembleModel()
-    ensemble.train(data_path)
-    return ensemble
\ No newline at end of file
+    return ensemble.reweight(oof_path, base_path=base_path)
\ No newline at end of file
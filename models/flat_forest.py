@@ -0,0 +1,243 @@
+"""
+Flat-array evaluator for trained random forests
+"""
+
+import numpy as np
+import scipy.sparse as sp
+
+class FlatForest:
+    """
+    Random forest compiled into flat node arrays and evaluated with numpy
+
+    sklearn's predict_proba dispatches every tree separately (validation,
+    joblib scheduling, one Cython call per tree), which dominates the cost of
+    scoring a single posting. Here the nodes of all trees are concatenated
+    into a handful of arrays (feature, threshold, left and right child, leaf
+    probabilities) and every (row, tree) pair descends one level per
+    iteration, so a prediction is a few dozen vectorized steps regardless of
+    the number of trees.
+
+    Results are bit-identical to sklearn: rows are compared as float32 against
+    the same float64 thresholds, leaf probabilities are the trees' own values,
+    and tree outputs are summed in tree order before dividing by the number
+    of trees, exactly as RandomForestClassifier does with a single job. A NaN
+    input follows each node's missing_go_to_left flag, as in sklearn trees
+    that support missing values (dense input only, like sklearn).
+    """
+
+    # Largest sparse batch (rows x features) looked up through a dense copy
+    DENSE_LOOKUP_CELLS = 4_000_000
+
+    def __init__(self, feature, threshold, left, right, leaf_values, roots, max_depth,
+                 n_features, classes, missing_go_to_left=None):
+        """
+        Args:
+            feature: Split feature of each node (0 for leaves)
+            threshold: Split threshold of each node
+            left: Global index of the left child (leaves point to themselves)
+            right: Global index of the right child (leaves point to themselves)
+            leaf_values: Class probabilities of each node, shape (n_nodes, n_classes)
+            roots: Global index of the root of each tree
+            max_depth: Depth of the deepest tree (for reporting)
+            n_features: Number of input features
+            classes: Class labels, in probability column order
+            missing_go_to_left: Whether a NaN input goes to the left child of
+                each node (None if the trees predate missing value support,
+                in which case NaN goes right)
+        """
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.leaf_values = leaf_values
+        self.roots = roots
+        self.max_depth = max_depth
+        self.n_features = n_features
+        self.classes = classes
+        self.missing_go_to_left = missing_go_to_left
+
+    @classmethod
+    def from_sklearn(cls, forest):
+        """
+        Compile a fitted RandomForestClassifier
+
+        Args:
+            forest: Fitted sklearn RandomForestClassifier (single output)
+
+        Returns:
+            FlatForest
+        """
+        if forest.n_outputs_ != 1:
+            raise ValueError("Only single-output forests can be compiled.")
+
+        n_classes = forest.n_classes_
+        features, thresholds, lefts, rights, values, roots, missing_left = [], [], [], [], [], [], []
+        # sklearn >= 1.3 routes NaN by a per-node flag; older trees reject NaN input
+        supports_missing = all(hasattr(estimator.tree_, 'missing_go_to_left') for estimator in forest.estimators_)
+        offset = 0
+        max_depth = 0
+
+        for estimator in forest.estimators_:
+            tree = estimator.tree_
+            n_nodes = tree.node_count
+            node_ids = np.arange(n_nodes)
+            is_leaf = tree.children_left == -1
+
+            features.append(np.where(is_leaf, 0, tree.feature).astype(np.intp))
+            thresholds.append(tree.threshold.astype(np.float64))
+            lefts.append(np.where(is_leaf, node_ids, tree.children_left) + offset)
+            rights.append(np.where(is_leaf, node_ids, tree.children_right) + offset)
+            if supports_missing:
+                missing_left.append(np.asarray(tree.missing_go_to_left, dtype=bool))
+
+            value = tree.value[:, 0, :n_classes].astype(np.float64)
+            # Older sklearn stores class counts and normalizes in predict_proba
+            totals = value.sum(axis=1, keepdims=True)
+            if not np.allclose(totals, 1.0):
+                totals[totals == 0.0] = 1.0
+                value = value / totals
+            values.append(value)
+
+            roots.append(offset)
+            offset += n_nodes
+            max_depth = max(max_depth, tree.max_depth)
+
+        return cls(
+            feature=np.concatenate(features),
+            threshold=np.concatenate(thresholds),
+            left=np.concatenate(lefts).astype(np.intp),
+            right=np.concatenate(rights).astype(np.intp),
+            leaf_values=np.concatenate(values),
+            roots=np.asarray(roots, dtype=np.intp),
+            max_depth=max_depth,
+            n_features=forest.n_features_in_,
+            classes=forest.classes_,
+            missing_go_to_left=np.concatenate(missing_left) if supports_missing else None
+        )
+
+    def apply(self, X):
+        """
+        Find the leaf each row reaches in each tree
+
+        Args:
+            X: Dense array or sparse matrix of shape (n_rows, n_features)
+
+        Returns:
+            Global leaf indices, shape (n_rows, n_trees)
+        """
+        lookup = self._value_lookup(X)
+        n_rows = X.shape[0]
+        rows = np.repeat(np.arange(n_rows), len(self.roots))
+        nodes = np.tile(self.roots, n_rows)
+        is_leaf = self.left == np.arange(len(self.left))
+
+        # Descend one level per step, dropping (row, tree) pairs that reached a leaf
+        active = np.arange(len(nodes))
+        while active.size:
+            current = nodes[active]
+            internal = ~is_leaf[current]
+            active, current = active[internal], current[internal]
+            values = lookup(rows[active], self.feature[current])
+            go_left = values <= self.threshold[current]
+            if self.missing_go_to_left is not None:
+                missing = np.isnan(values)
+                go_left[missing] = self.missing_go_to_left[current[missing]]
+            nodes[active] = np.where(go_left, self.left[current], self.right[current])
+
+        return nodes.reshape(n_rows, len(self.roots))
+
+    def predict_proba(self, X):
+        """
+        Predict class probabilities
+
+        Args:
+            X: Dense array or sparse matrix of shape (n_rows, n_features)
+
+        Returns:
+            Array of shape (n_rows, n_classes), as RandomForestClassifier.predict_proba
+        """
+        leaves = self.apply(X)
+        proba = np.zeros((leaves.shape[0], self.leaf_values.shape[1]), dtype=np.float64)
+        # Sum in tree order to reproduce sklearn's floating point result
+        for tree in range(leaves.shape[1]):
+            proba += self.leaf_values[leaves[:, tree]]
+        proba /= leaves.shape[1]
+        return proba
+
+    def predict(self, X):
+        """Predict class labels"""
+        return self.classes[np.argmax(self.predict_proba(X), axis=1)]
+
+    def check_equivalence(self, forest, X):
+        """
+        Compare with sklearn on the given rows
+
+        Args:
+            forest: The RandomForestClassifier this forest was compiled from
+            X: Rows to compare on
+
+        Returns:
+            True if the probabilities are bit-identical
+        """
+        return np.array_equal(self.predict_proba(X), forest.predict_proba(X))
+
+    def probe_rows(self, n_rows=64, splits_per_row=32, missing_rate=0.0, seed=0):
+        """
+        Synthetic rows that sit exactly on (and just past) split thresholds
+
+        Args:
+            n_rows: Number of rows
+            splits_per_row: Split features set per row
+            missing_rate: Fraction of the set split features that are NaN instead
+            seed: Random seed
+
+        Returns:
+            Dense float32 array of shape (n_rows, n_features)
+        """
+        rng = np.random.default_rng(seed)
+        # Splits that only separate NaN from everything else have an infinite threshold
+        internal = np.flatnonzero((self.left != np.arange(len(self.left))) & np.isfinite(self.threshold))
+        X = np.zeros((n_rows, self.n_features), dtype=np.float32)
+        if len(internal) == 0:
+            return X
+
+        for row in range(n_rows):
+            nodes = rng.choice(internal, size=min(splits_per_row, len(internal)), replace=False)
+            values = self.threshold[nodes].astype(np.float32)
+            past = rng.random(len(nodes)) < 0.5
+            values[past] = np.nextafter(values[past], np.float32(np.inf))
+            values[rng.random(len(nodes)) < missing_rate] = np.nan
+            X[row, self.feature[nodes]] = values
+        return X
+
+    def _value_lookup(self, X):
+        """
+        Build a function returning X[rows, columns] as float32 (as sklearn sees X)
+
+        Small sparse batches are densified, which makes every lookup a plain
+        gather; larger ones are searched with one searchsorted over
+        (row, column) keys so they are never densified.
+        """
+        if sp.issparse(X) and X.shape[0] * X.shape[1] <= self.DENSE_LOOKUP_CELLS:
+            X = X.toarray()
+
+        if not sp.issparse(X):
+            X = np.asarray(X, dtype=np.float32)
+            return lambda rows, columns: X[rows, columns]
+
+        X = sp.csr_matrix(X, dtype=np.float32)
+        X.sum_duplicates()
+        X.sort_indices()
+        row_of_entry = np.repeat(np.arange(X.shape[0], dtype=np.int64), np.diff(X.indptr))
+        keys = row_of_entry * self.n_features + X.indices
+        data = np.append(X.data, np.float32(0.0))
+
+        def lookup(rows, columns):
+            query = rows.astype(np.int64) * self.n_features + columns
+            position = np.searchsorted(keys, query)
+            found = position < len(keys)
+            found[found] = keys[position[found]] == query[found]
+            # Missing entries read the trailing zero
+            return data[np.where(found, position, len(keys))]
+
+        return lookup
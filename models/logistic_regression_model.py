@@ -6,7 +6,6 @@ import os
 import pickle
 from sklearn.linear_model import LogisticRegression
 from sklearn.metrics import classification_report, accuracy_score, precision_recall_fscore_support
-from imblearn.over_sampling import SMOTE
 
 class LogisticRegressionModel:
     """Logistic Regression model with SMOTE and TF-IDF"""
@@ -15,7 +14,7 @@ class LogisticRegressionModel:
         self.model = LogisticRegression(C=100, class_weight=None, penalty='l2', solver='liblinear')
         self.is_trained = False
         
-    def train(self, X_train, y_train, apply_smote=True):
+    def train(self, X_train, y_train, apply_smote=True, sample_weight=None):
         """
         Train the logistic regression model
         
@@ -23,13 +22,16 @@ class LogisticRegressionModel:
             X_train: TF-IDF features for training
             y_train: Target labels
             apply_smote: Whether to apply SMOTE for handling class imbalance
+            sample_weight: Optional per-sample weights (used when the data is
+                rebalanced by class weights instead of resampling)
         """
         if apply_smote:
+            from imblearn.over_sampling import SMOTE  # training only
             smote = SMOTE(random_state=42)
             X_resampled, y_resampled = smote.fit_resample(X_train, y_train)
             self.model.fit(X_resampled, y_resampled)
         else:
-            self.model.fit(X_train, y_train)
+            self.model.fit(X_train, y_train, sample_weight=sample_weight)
             
         self.is_trained = True
         
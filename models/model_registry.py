@@ -0,0 +1,320 @@
+"""
+Model registry for serving: hot reload of ensemble artifacts with atomic swap
+"""
+
+import os
+import glob
+import time
+import shutil
+import hashlib
+import logging
+import threading
+
+from models.ensemble_model import EnsembleModel
+
+logger = logging.getLogger(__name__)
+
+# Posting used to validate a freshly loaded ensemble before it goes live
+SMOKE_TEST_JOB = {
+    'title': 'Software Engineer',
+    'company': 'Example Corp',
+    'description': 'We are hiring a software engineer to build and maintain web services. '
+                   'Competitive salary and health benefits.',
+    'requirements': '3+ years of Python experience.',
+    'benefits': 'Health insurance, paid vacation.',
+    'company_profile': 'Example Corp builds tools for small businesses.',
+    'employment_type': 'Full-time',
+    'contact_info': {'emails': [], 'phones': []}
+}
+
+# Subdirectory of a flat model directory holding the pinned copies of served versions
+PINNED_DIR = '.versions'
+
+# Pinned versions kept on disk: the served one and the one before it
+KEEP_PINNED_VERSIONS = 2
+
+# Seconds before a version that failed validation is tried again, doubled after
+# each further failure of the same version up to the maximum
+FAILED_VERSION_RETRY_SECONDS = 30.0
+MAX_FAILED_VERSION_RETRY_SECONDS = 900.0
+
+class ModelRegistry:
+    """
+    Hold the active EnsembleModel and swap in retrained artifacts without downtime
+
+    The registry watches a model directory. A directory containing a CURRENT
+    file is treated as a versioned bundle: CURRENT names the subdirectory with
+    the live artifacts, and that name is the model version. Otherwise the
+    artifacts are read from the directory itself and the version is a
+    fingerprint of the artifact files; before such a version is loaded, its
+    files are copied to .versions/<version>, so that the artifacts of a
+    version stay readable after the directory is overwritten by retraining.
+
+    New artifacts are loaded on a background thread and validated with a smoke
+    prediction, then handed to the activation hooks (e.g. to warm inference
+    workers); only then is the active (model, version) pair replaced, in a
+    single assignment. Requests take a snapshot with current(), so in-flight
+    requests finish on the model they started with.
+    """
+
+    def __init__(self, base_path='models', poll_interval=5.0):
+        """
+        Args:
+            base_path: Model directory (or versioned bundle root) to watch
+            poll_interval: Seconds between checks for new artifacts
+        """
+        self.base_path = base_path
+        self.poll_interval = poll_interval
+
+        self._active = (None, None)
+        self._load_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._watcher = None
+
+        # Last observed version, and the last version that failed to load, its
+        # consecutive failures and when it may be tried again (time.monotonic)
+        self._pending_version = None
+        self._failed_version = None
+        self._failures = 0
+        self._retry_at = 0.0
+
+        self._activation_hooks = []
+        # Pinned flat versions, oldest first
+        self._pinned_versions = []
+
+    def current(self):
+        """
+        Get a consistent snapshot of the active model
+
+        Returns:
+            Tuple of (EnsembleModel or None, version string or None)
+        """
+        return self._active
+
+    def is_loaded(self):
+        """Check whether a model is being served"""
+        return self._active[0] is not None
+
+    def artifact_path(self, version):
+        """
+        Directory holding the artifacts of a model version
+        
+        Args:
+            version: Version string from current()
+            
+        Returns:
+            Bundle subdirectory for versioned bundles, the pinned copy for flat
+            model directories, else (if the version could not be pinned) the
+            model directory
+        """
+        if version is None:
+            return self.base_path
+        if os.path.exists(os.path.join(self.base_path, 'CURRENT')):
+            return os.path.join(self.base_path, version)
+        pinned_path = os.path.join(self.base_path, PINNED_DIR, version)
+        if os.path.isdir(pinned_path):
+            return pinned_path
+        return self.base_path
+
+    def add_activation_hook(self, hook):
+        """
+        Register a function called before a validated version is served
+
+        Args:
+            hook: Function taking (artifact directory, version); an exception
+                rejects the version like a failed smoke test
+        """
+        self._activation_hooks.append(hook)
+
+    def remove_activation_hook(self, hook):
+        """Unregister a function added with add_activation_hook (if it was)"""
+        if hook in self._activation_hooks:
+            self._activation_hooks.remove(hook)
+
+    def load(self):
+        """
+        Load the current artifacts synchronously (used at startup)
+
+        Returns:
+            True if a model was loaded and passed the smoke test
+        """
+        artifact_path, version = self._resolve_version()
+        if version is None:
+            logger.error(f"No model artifacts found in {self.base_path}")
+            return False
+        return self._load_and_swap(artifact_path, version)
+
+    def start_watching(self):
+        """Start the background thread that picks up new artifacts"""
+        if self._watcher is not None:
+            return
+
+        self._watcher = threading.Thread(target=self._watch, name='model-registry-watcher', daemon=True)
+        self._watcher.start()
+
+    def stop_watching(self):
+        """Stop the background watcher"""
+        self._stop_event.set()
+        if self._watcher is not None:
+            self._watcher.join(timeout=self.poll_interval + 1)
+            self._watcher = None
+
+    def check_for_update(self):
+        """
+        Reload if the artifacts changed and have settled
+
+        A version must be observed on two consecutive checks before it is
+        loaded, so artifacts that are still being written are not picked up.
+        A version that failed validation is retried with exponential backoff,
+        since the failure may be transient (e.g. a bundle still being copied).
+
+        Returns:
+            True if a new model was swapped in
+        """
+        artifact_path, version = self._resolve_version()
+        backing_off = version == self._failed_version and time.monotonic() < self._retry_at
+        if version is None or version == self._active[1] or backing_off:
+            self._pending_version = None
+            return False
+
+        if version != self._pending_version:
+            self._pending_version = version
+            return False
+
+        self._pending_version = None
+        return self._load_and_swap(artifact_path, version)
+
+    def _watch(self):
+        """Poll for new artifacts until stopped"""
+        while not self._stop_event.wait(self.poll_interval):
+            try:
+                self.check_for_update()
+            except Exception as e:
+                logger.error(f"Error checking for model updates: {str(e)}")
+
+    def _load_and_swap(self, artifact_path, version):
+        """Load, validate and activate a model version"""
+        with self._load_lock:
+            if version == self._active[1]:
+                return False
+
+            if artifact_path == self.base_path:
+                artifact_path = self._pin_version(version)
+                if artifact_path is None:
+                    # Artifacts are still being written; retry on a later check
+                    return False
+
+            try:
+                candidate = EnsembleModel()
+                candidate.load_models(artifact_path)
+                candidate.load_preprocessor(os.path.join(artifact_path, 'preprocessor.pkl'))
+                self._smoke_test(candidate)
+                for hook in self._activation_hooks:
+                    hook(artifact_path, version)
+            except Exception as e:
+                self._failures = self._failures + 1 if version == self._failed_version else 1
+                self._failed_version = version
+                delay = min(FAILED_VERSION_RETRY_SECONDS * 2 ** (self._failures - 1),
+                            MAX_FAILED_VERSION_RETRY_SECONDS)
+                self._retry_at = time.monotonic() + delay
+                logger.error(f"Model version {version} failed validation (retrying in {delay:.0f}s): {str(e)}")
+                return False
+
+            previous_version = self._active[1]
+            self._active = (candidate, version)
+            self._failed_version = None
+            self._failures = 0
+            logger.info(f"Serving model version {version} (previous: {previous_version})")
+            self._prune_pinned_versions()
+            return True
+
+    def _pin_version(self, version):
+        """
+        Copy the artifacts of a flat model directory to .versions/<version>
+
+        Returns:
+            The pinned directory, the model directory itself if it cannot be
+            written, or None if the artifacts changed during the copy
+        """
+        pinned_root = os.path.join(self.base_path, PINNED_DIR)
+        pinned_path = os.path.join(pinned_root, version)
+        if not os.path.isdir(pinned_path):
+            tmp_path = pinned_path + '.tmp'
+            try:
+                shutil.rmtree(tmp_path, ignore_errors=True)
+                for path in self._artifact_files():
+                    target = os.path.join(tmp_path, os.path.relpath(path, self.base_path))
+                    os.makedirs(os.path.dirname(target), exist_ok=True)
+                    shutil.copy2(path, target)
+                if self._fingerprint(self._artifact_files()) != version:
+                    shutil.rmtree(tmp_path, ignore_errors=True)
+                    return None
+                os.replace(tmp_path, pinned_path)
+            except OSError as e:
+                logger.warning(f"Could not pin model version {version}, serving it unpinned: {str(e)}")
+                return self.base_path
+
+        if version in self._pinned_versions:
+            self._pinned_versions.remove(version)
+        self._pinned_versions.append(version)
+        return pinned_path
+
+    def _prune_pinned_versions(self):
+        """Delete pinned copies other than the latest KEEP_PINNED_VERSIONS"""
+        pinned_root = os.path.join(self.base_path, PINNED_DIR)
+        if not os.path.isdir(pinned_root):
+            return
+        keep = set(self._pinned_versions[-KEEP_PINNED_VERSIONS:])
+        self._pinned_versions = [version for version in self._pinned_versions if version in keep]
+        for name in os.listdir(pinned_root):
+            if name not in keep:
+                shutil.rmtree(os.path.join(pinned_root, name), ignore_errors=True)
+
+    def _smoke_test(self, ensemble):
+        """Raise if the ensemble cannot produce a sane prediction"""
+        result = ensemble.predict(SMOKE_TEST_JOB)
+        if not 0 <= result['confidence_score'] <= 100:
+            raise ValueError(f"Confidence score out of range: {result['confidence_score']}")
+        for name, prob in result['model_probabilities'].items():
+            if not 0 <= prob <= 1:
+                raise ValueError(f"Probability out of range for {name}: {prob}")
+        # The smoke posting is not traffic
+        ensemble.drift_monitor().take()
+
+    def _resolve_version(self):
+        """
+        Find the live artifact directory and its version
+
+        Returns:
+            Tuple of (artifact directory, version string or None)
+        """
+        current_file = os.path.join(self.base_path, 'CURRENT')
+        if os.path.exists(current_file):
+            with open(current_file) as f:
+                version = f.read().strip()
+            if not version:
+                return self.base_path, None
+            return os.path.join(self.base_path, version), version
+
+        artifacts = self._artifact_files()
+        if not artifacts:
+            return self.base_path, None
+        return self.base_path, self._fingerprint(artifacts)
+
+    def _artifact_files(self):
+        """Artifact files of a flat model directory (none if it holds no pickles)"""
+        artifacts = sorted(glob.glob(os.path.join(self.base_path, '*.pkl')))
+        if not artifacts:
+            return []
+        # The reputation index is loaded with the ensemble, so rebuilding it is a new version too
+        return artifacts + sorted(path for path in glob.glob(os.path.join(self.base_path, 'reputation', '*'))
+                                  if os.path.isfile(path))
+
+    def _fingerprint(self, artifacts):
+        """Version string derived from the names, sizes and modification times of artifact files"""
+        fingerprint = hashlib.sha1()
+        for path in artifacts:
+            stat = os.stat(path)
+            name = os.path.relpath(path, self.base_path)
+            fingerprint.update(f"{name}:{stat.st_size}:{stat.st_mtime_ns};".encode())
+        return fingerprint.hexdigest()[:12]
@@ -7,16 +7,18 @@ import pickle
 import numpy as np
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.metrics import classification_report, accuracy_score, precision_recall_fscore_support
-from imblearn.over_sampling import SMOTE
+
+from models.flat_forest import FlatForest
 
 class RandomForestModel:
     """Random Forest model with one-hot encoding and SMOTE"""
     
     def __init__(self):
         self.model = RandomForestClassifier()
+        self.flat_forest = None
         self.is_trained = False
         
-    def train(self, X_train, y_train, apply_smote=True):
+    def train(self, X_train, y_train, apply_smote=True, sample_weight=None):
         """
         Train the Random Forest model
         
@@ -24,26 +26,61 @@ class RandomForestModel:
             X_train: One-hot encoded features for training
             y_train: Target labels
             apply_smote: Whether to apply SMOTE for handling class imbalance
+            sample_weight: Optional per-sample weights (used when the data is
+                rebalanced by class weights instead of resampling)
         """
         if apply_smote:
+            from imblearn.over_sampling import SMOTE  # training only
             smote = SMOTE(random_state=42)
             X_resampled, y_resampled = smote.fit_resample(X_train, y_train)
             self.model.fit(X_resampled, y_resampled)
         else:
-            self.model.fit(X_train, y_train)
+            self.model.fit(X_train, y_train, sample_weight=sample_weight)
             
         self.is_trained = True
+        self.compile()
+        
+    def compile(self):
+        """
+        Export the trained forest to flat arrays for fast prediction
+        
+        The compiled forest is checked for bit-identical probabilities against
+        sklearn on rows probing the split thresholds (some with NaN values);
+        if the check fails, predictions keep going through sklearn.
+        
+        Returns:
+            True if the compiled forest is used for prediction
+        """
+        self.flat_forest = None
+        try:
+            flat_forest = FlatForest.from_sklearn(self.model)
+        except ValueError as e:
+            print(f"Warning: Random forest not compiled: {e}")
+            return False
+            
+        # NaN probes check the missing value routing where sklearn supports it
+        missing_rate = 0.1 if flat_forest.missing_go_to_left is not None else 0.0
+        if not flat_forest.check_equivalence(self.model, flat_forest.probe_rows(missing_rate=missing_rate)):
+            print("Warning: Compiled random forest differs from sklearn; using sklearn for prediction")
+            return False
+            
+        self.flat_forest = flat_forest
+        return True
         
     def predict(self, X):
         """Predict class labels"""
         if not self.is_trained:
             raise ValueError("Model has not been trained yet.")
+        if self.flat_forest is not None:
+            return self.flat_forest.predict(X)
         return self.model.predict(X)
     
     def predict_proba(self, X):
         """Predict class probabilities"""
         if not self.is_trained:
             raise ValueError("Model has not been trained yet.")
+        if self.flat_forest is not None:
+            return self.flat_forest.predict_proba(X)
         return self.model.predict_proba(X)
     
     def get_feature_importance(self):
@@ -92,6 +129,7 @@ class RandomForestModel:
             self.model = pickle.load(f)
             
         self.is_trained = True
+        self.compile()
 
 def train_and_save_model(X_train, y_train, X_test, y_test, feature_names=None, model_path='models/rf_model.pkl'):
     """Train and save a Random Forest model"""
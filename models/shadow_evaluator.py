@@ -0,0 +1,191 @@
+"""
+Shadow evaluation of a candidate ensemble on live traffic
+"""
+
+import os
+import json
+import time
+import queue
+import random
+import logging
+import threading
+
+import numpy as np
+
+from models.ensemble_model import EnsembleModel
+
+logger = logging.getLogger(__name__)
+
+class ShadowEvaluator:
+    """
+    Score a sample of served requests with a candidate ensemble, off the request path
+
+    The web server hands every analyzed posting and its served verdict to
+    submit() once the response has been sent. A sampled fraction is queued
+    (the queue is bounded, so excess samples are dropped rather than building
+    a backlog) and scored by a single daemon thread with the shadow models.
+    Each evaluation appends one JSON line with the per-model latency of the
+    shadow models and how its verdict differs from the served one.
+
+    The thread measures the process CPU time of every evaluation (which counts
+    the BLAS and joblib threads the models fan out to, and errs towards
+    throttling harder while requests are served concurrently) and then sleeps
+    long enough that shadow work stays within cpu_share of one core, however
+    much traffic is sampled.
+    """
+
+    def __init__(self, model_dir, log_path='logs/shadow.jsonl', sample_rate=0.05,
+                 cpu_share=0.1, queue_size=100):
+        """
+        Args:
+            model_dir: Directory with the candidate model artifacts
+            log_path: JSON lines file the evaluations are appended to
+            sample_rate: Fraction of requests scored by the shadow models
+            cpu_share: Maximum fraction of one core spent on shadow scoring
+            queue_size: Maximum number of sampled requests waiting to be scored
+        """
+        if not 0 < cpu_share <= 1:
+            raise ValueError("cpu_share must be in (0, 1]")
+
+        self.model_dir = model_dir
+        self.log_path = log_path
+        self.sample_rate = sample_rate
+        self.cpu_share = cpu_share
+
+        self.shadow_model = None
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._thread = threading.Thread(target=self._run, name='shadow-evaluator', daemon=True)
+
+    def start(self):
+        """Load the shadow models and start scoring in the background"""
+        self._thread.start()
+
+    def submit(self, job_data, primary_result, primary_version=None):
+        """
+        Offer a served request for shadow scoring (never blocks)
+
+        Args:
+            job_data: Dictionary with job posting details
+            primary_result: Verdict returned to the client
+            primary_version: Version of the served models
+
+        Returns:
+            True if the request was queued
+        """
+        if random.random() >= self.sample_rate:
+            return False
+        try:
+            self._queue.put_nowait((job_data, primary_result, primary_version))
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    def _run(self):
+        """Score queued requests, throttled to the configured CPU share"""
+        try:
+            model = EnsembleModel()
+            model.load_models(self.model_dir)
+            model.load_preprocessor(os.path.join(self.model_dir, 'preprocessor.pkl'))
+            self.shadow_model = model
+        except Exception as e:
+            logger.error(f"Shadow models could not be loaded from {self.model_dir}: {str(e)}")
+            return
+
+        log_dir = os.path.dirname(self.log_path)
+        if log_dir:
+            os.makedirs(log_dir, exist_ok=True)
+
+        while True:
+            job_data, primary_result, primary_version = self._queue.get()
+            cpu_start = time.process_time()
+            try:
+                record = self._evaluate(job_data, primary_result, primary_version)
+                with open(self.log_path, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(record) + '\n')
+            except Exception as e:
+                logger.error(f"Shadow evaluation failed: {str(e)}")
+
+            # Idle for the rest of the duty cycle
+            cpu_used = time.process_time() - cpu_start
+            time.sleep(cpu_used * (1 - self.cpu_share) / self.cpu_share)
+
+    def _evaluate(self, job_data, primary_result, primary_version):
+        """Score one request with the shadow models and compare with the served verdict"""
+        timings = {}
+        start = time.perf_counter()
+        shadow_result = self.shadow_model.predict(job_data, timings=timings)
+        total = time.perf_counter() - start
+
+        primary_probabilities = primary_result.get('model_probabilities') or {}
+        shadow_probabilities = shadow_result.get('model_probabilities') or {}
+
+        return {
+            'timestamp': time.time(),
+            'primary_version': primary_version,
+            'primary_is_fake': bool(primary_result['is_fake']),
+            'shadow_is_fake': bool(shadow_result['is_fake']),
+            'disagree': bool(primary_result['is_fake']) != bool(shadow_result['is_fake']),
+            'primary_confidence': float(primary_result['confidence_score']),
+            'shadow_confidence': float(shadow_result['confidence_score']),
+            'model_probability_deltas': {
+                name: float(shadow_probabilities[name]) - float(primary_probabilities[name])
+                for name in shadow_probabilities if name in primary_probabilities
+            },
+            'latency_ms': {
+                'total': total * 1000,
+                **{name: seconds * 1000 for name, seconds in timings.items()}
+            }
+        }
+
+def shadow_report(log_path='logs/shadow.jsonl'):
+    """
+    Summarize a shadow evaluation log
+
+    Args:
+        log_path: JSON lines file written by ShadowEvaluator
+
+    Returns:
+        Dictionary with the disagreement rate, confidence shift and latency
+        percentiles per model
+    """
+    if not os.path.exists(log_path):
+        raise FileNotFoundError(f"Shadow log not found: {log_path}")
+
+    with open(log_path, encoding='utf-8') as f:
+        records = [json.loads(line) for line in f if line.strip()]
+    if not records:
+        print(f"No shadow evaluations in {log_path}")
+        return {'evaluations': 0}
+
+    confidence_deltas = np.array([r['shadow_confidence'] - r['primary_confidence'] for r in records])
+    report = {
+        'evaluations': len(records),
+        'disagreement_rate': float(np.mean([r['disagree'] for r in records])),
+        'flipped_to_fake': sum(r['shadow_is_fake'] and not r['primary_is_fake'] for r in records),
+        'flipped_to_real': sum(r['primary_is_fake'] and not r['shadow_is_fake'] for r in records),
+        'mean_confidence_delta': float(confidence_deltas.mean()),
+        'mean_abs_confidence_delta': float(np.abs(confidence_deltas).mean()),
+        'latency_ms': {}
+    }
+
+    names = sorted({name for r in records for name in r['latency_ms']})
+    for name in names:
+        latencies = np.array([r['latency_ms'][name] for r in records if name in r['latency_ms']])
+        report['latency_ms'][name] = {
+            'p50': float(np.percentile(latencies, 50)),
+            'p95': float(np.percentile(latencies, 95)),
+            'max': float(latencies.max())
+        }
+
+    print(f"Shadow evaluations: {report['evaluations']}")
+    print(f"Verdict disagreement: {report['disagreement_rate']:.2%} "
+          f"({report['flipped_to_fake']} flipped to fake, {report['flipped_to_real']} flipped to real)")
+    print(f"Confidence shift: {report['mean_confidence_delta']:+.2f} "
+          f"(mean absolute {report['mean_abs_confidence_delta']:.2f})")
+    print("Shadow latency (ms):")
+    for name, stats in report['latency_ms'].items():
+        print(f"  {name}: p50 {stats['p50']:.2f}, p95 {stats['p95']:.2f}, max {stats['max']:.2f}")
+
+    return report
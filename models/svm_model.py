@@ -6,7 +6,6 @@ import os
 import pickle
 from sklearn.svm import SVC
 from sklearn.metrics import classification_report, accuracy_score, precision_recall_fscore_support
-from imblearn.over_sampling import SMOTE
 
 class SVMModel:
     """SVM model with SMOTE and TF-IDF"""
@@ -19,7 +18,7 @@ class SVMModel:
         )
         self.is_trained = False
         
-    def train(self, X_train, y_train, apply_smote=True):
+    def train(self, X_train, y_train, apply_smote=True, sample_weight=None):
         """
         Train the SVM model
         
@@ -27,13 +26,16 @@ class SVMModel:
             X_train: TF-IDF features for training
             y_train: Target labels
             apply_smote: Whether to apply SMOTE for handling class imbalance
+            sample_weight: Optional per-sample weights (used when the data is
+                rebalanced by class weights instead of resampling)
         """
         if apply_smote:
+            from imblearn.over_sampling import SMOTE  # training only
             smote = SMOTE(random_state=42)
             X_resampled, y_resampled = smote.fit_resample(X_train, y_train)
             self.model.fit(X_resampled, y_resampled)
         else:
-            self.model.fit(X_train, y_train)
+            self.model.fit(X_train, y_train, sample_weight=sample_weight)
             
         self.is_trained = True
         
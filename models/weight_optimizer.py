@@ -0,0 +1,135 @@
+"""
+Ensemble weight optimization from cached out-of-fold probabilities
+"""
+
+import os
+import pickle
+import numpy as np
+from scipy.optimize import minimize
+from sklearn.metrics import accuracy_score, f1_score, log_loss
+
+class EnsembleWeightOptimizer:
+    """Fit ensemble weights on out-of-fold probabilities of the individual models"""
+
+    def __init__(self, oof_probabilities, y):
+        """
+        Args:
+            oof_probabilities: Dictionary mapping model name to an array of
+                out-of-fold probabilities for the positive class
+            y: Target labels aligned with the probabilities
+        """
+        self.model_names = list(oof_probabilities.keys())
+        self.oof_probabilities = {
+            name: np.asarray(probs, dtype=np.float64) for name, probs in oof_probabilities.items()
+        }
+        self.y = np.asarray(y)
+
+    def fit(self, model_names=None):
+        """
+        Find the convex combination of model probabilities that minimizes log loss
+
+        Args:
+            model_names: Optional subset of models to weight (defaults to all)
+
+        Returns:
+            Dictionary of model weights summing to 1
+        """
+        model_names = list(model_names or self.model_names)
+        P = np.column_stack([self.oof_probabilities[name] for name in model_names])
+
+        def objective(w):
+            return log_loss(self.y, np.clip(P @ w, 1e-15, 1 - 1e-15), labels=[0, 1])
+
+        n_models = len(model_names)
+        result = minimize(
+            objective,
+            x0=np.full(n_models, 1.0 / n_models),
+            method='SLSQP',
+            bounds=[(0.0, 1.0)] * n_models,
+            constraints=[{'type': 'eq', 'fun': lambda w: np.sum(w) - 1.0}]
+        )
+
+        weights = np.clip(result.x, 0.0, 1.0)
+        weights /= weights.sum()
+
+        return {name: float(weight) for name, weight in zip(model_names, weights)}
+
+    def evaluate(self, weights, threshold=0.5):
+        """
+        Evaluate a set of weights on the out-of-fold probabilities
+
+        Args:
+            weights: Dictionary of model weights
+            threshold: Decision threshold for the ensemble probability
+
+        Returns:
+            Dictionary with log loss, accuracy and F1 score
+        """
+        ensemble_prob = sum(
+            weight * self.oof_probabilities[name] for name, weight in weights.items()
+        )
+        y_pred = (ensemble_prob > threshold).astype(int)
+
+        return {
+            'log_loss': log_loss(self.y, np.clip(ensemble_prob, 1e-15, 1 - 1e-15), labels=[0, 1]),
+            'accuracy': accuracy_score(self.y, y_pred),
+            'f1': f1_score(self.y, y_pred, zero_division=0)
+        }
+
+    def model_contributions(self):
+        """
+        Measure the marginal contribution of each model
+
+        Each model is dropped in turn, the weights of the remaining models are
+        refitted, and the resulting loss in quality is reported. A model whose
+        removal costs nothing only adds latency.
+
+        Returns:
+            Dictionary mapping model name to its marginal contribution
+        """
+        full_metrics = self.evaluate(self.fit())
+
+        contributions = {}
+        for name in self.model_names:
+            remaining = [other for other in self.model_names if other != name]
+            if not remaining:
+                continue
+            metrics = self.evaluate(self.fit(remaining))
+            contributions[name] = {
+                'log_loss_increase': metrics['log_loss'] - full_metrics['log_loss'],
+                'f1_drop': full_metrics['f1'] - metrics['f1'],
+                'accuracy_drop': full_metrics['accuracy'] - metrics['accuracy']
+            }
+
+        return contributions
+
+    def save(self, path='models/oof_probabilities.pkl'):
+        """Save the cached out-of-fold probabilities to disk"""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as f:
+            pickle.dump({'probabilities': self.oof_probabilities, 'y': self.y}, f)
+
+    @classmethod
+    def load(cls, path='models/oof_probabilities.pkl'):
+        """Load cached out-of-fold probabilities from disk"""
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Out-of-fold probabilities not found: {path}")
+
+        with open(path, 'rb') as f:
+            cached = pickle.load(f)
+
+        return cls(cached['probabilities'], cached['y'])
+
+def print_weight_report(optimizer, weights):
+    """Print fitted weights, ensemble quality and per-model contributions"""
+    metrics = optimizer.evaluate(weights)
+    print("\nOptimized ensemble weights:")
+    for name, weight in weights.items():
+        print(f"{name}: {weight:.4f}")
+    print(f"Out-of-fold log loss: {metrics['log_loss']:.4f}")
+    print(f"Out-of-fold F1 Score: {metrics['f1']:.4f}")
+
+    print("\nMarginal model contributions (change when the model is dropped):")
+    for name, contribution in optimizer.model_contributions().items():
+        print(f"{name}: log loss {contribution['log_loss_increase']:+.4f}, "
+              f"F1 {-contribution['f1_drop']:+.4f}")
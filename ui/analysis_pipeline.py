@@ -0,0 +1,537 @@
+"""
+Non-blocking analysis pipeline: scraping on an event loop, inference in a process pool
+"""
+
+import os
+import time
+import queue
+import atexit
+import asyncio
+import logging
+import itertools
+import threading
+import functools
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from utils.job_scraper import JobScraper, normalize_job_url
+from utils.single_flight import SingleFlight
+from utils.micro_batcher import MicroBatcher
+
+logger = logging.getLogger(__name__)
+
+# Ensemble loaded in an inference worker process, and its version
+_worker_model = None
+_worker_version = None
+
+# Queue the worker publishes progressive results on, as (stream id, event, data)
+_worker_stage_events = None
+
+# Seconds between two sends of a worker's drift sketches to the server
+DRIFT_PUBLISH_SECONDS = 2.0
+
+# Seconds a new model version may take to load in every inference worker
+WORKER_WARM_TIMEOUT = 300.0
+
+# Seconds a replaced inference pool keeps serving requests that snapshotted its
+# model version before the swap (longer than any request waits on a result)
+RETIRED_POOL_GRACE_SECONDS = 120.0
+
+# Smallest micro-batch worth the fixed cost of the DataFrame pipeline; smaller
+# batches are predicted one posting at a time (spread over the inference
+# workers, so a few postings do not queue behind each other in one worker)
+MIN_VECTORIZED_BATCH = 8
+
+def _load_worker_model(artifact_path, version):
+    """Load (or reload) the ensemble held by this worker process"""
+    global _worker_model, _worker_version
+
+    from models.ensemble_model import EnsembleModel
+
+    model = EnsembleModel()
+    model.load_models(artifact_path)
+    model.load_preprocessor(os.path.join(artifact_path, 'preprocessor.pkl'))
+    _worker_model, _worker_version = model, version
+
+def _init_worker(artifact_path, version, stage_events=None, loaded=None):
+    """Process pool initializer: preload the models so the first request is warm"""
+    global _worker_stage_events
+
+    _worker_stage_events = stage_events
+    if version is not None:
+        _load_worker_model(artifact_path, version)
+    if loaded is not None:
+        loaded.release()
+    if stage_events is not None:
+        threading.Thread(target=_publish_worker_drift, name='drift-publisher', daemon=True).start()
+
+def _worker_ready():
+    """No-op task used to start the worker processes ahead of traffic"""
+    return os.getpid()
+
+def _predict_jobs(model, jobs):
+    """Predict a list of postings: one at a time for a few postings, else as a batch"""
+    if len(jobs) < MIN_VECTORIZED_BATCH:
+        return [model.predict(job_data) for job_data in jobs]
+
+    import pandas as pd
+
+    return model.predict_batch(pd.DataFrame(jobs), records=jobs)
+
+def _publish_worker_drift():
+    """
+    Send the worker's drift sketches to the server every DRIFT_PUBLISH_SECONDS
+
+    Runs on a thread of the worker process. Each send carries the postings
+    scored since the previous one (stream id None on the stage event queue);
+    the server merges them across workers.
+    """
+    while True:
+        time.sleep(DRIFT_PUBLISH_SECONDS)
+        model, version = _worker_model, _worker_version
+        if model is None or model.drift is None or not model.drift.postings:
+            continue
+        try:
+            _worker_stage_events.put((None, 'drift', (version, model.drift.take())))
+        except (OSError, ValueError):
+            # The queue was closed at shutdown
+            return
+
+def _worker_predict_batch(jobs, artifact_path, version):
+    """Run the ensemble on a micro-batch of postings in a worker"""
+    if version != _worker_version:
+        _load_worker_model(artifact_path, version)
+    return _predict_jobs(_worker_model, jobs)
+
+def _worker_predict(job_data, artifact_path, version, stream_id=None):
+    """
+    Run the ensemble in a worker, reloading first if the served version changed
+
+    For a streamed analysis, the stages and the final result are published on
+    the stage event queue (one ordered channel per worker) instead of returned.
+    """
+    if version != _worker_version:
+        _load_worker_model(artifact_path, version)
+    if stream_id is None:
+        return _worker_model.predict(job_data)
+
+    def publish(event, data):
+        _worker_stage_events.put((stream_id, event, data))
+
+    publish('result', _worker_model.predict(job_data, on_stage=publish))
+    return None
+
+class AnalysisPipeline:
+    """
+    Run scraping and inference without blocking on each other
+
+    Scraping is I/O bound: it is scheduled on an asyncio event loop running in
+    a background thread, which hands the blocking HTTP calls to a thread pool,
+    so a slow job board only occupies one I/O slot. Inference is CPU bound: it
+    runs in a pool of worker processes that each keep the ensemble loaded, so
+    predictions run in parallel across cores instead of contending for the
+    GIL. Before the registry serves a new version, a new pool is started with
+    that version preloaded in every worker and replaces the old one. The old
+    pool is retired rather than stopped: requests that snapshotted the old
+    version keep going to it for a grace period, so no worker ever reloads a
+    model while serving.
+
+    Flask views call the blocking facades (scrape and predict), which wait on
+    the loop; the request thread itself does no I/O or model work.
+
+    Identical requests in flight at the same time are coalesced: scrapes of
+    the same normalized URL, and predictions for the same content and model
+    version, wait on one execution and share its result.
+
+    Predictions are micro-batched: requests arriving together (or while every
+    inference worker is busy) are run as one batch through
+    EnsembleModel.predict_batch, which pays each model's per-call overhead
+    once per batch instead of once per request.
+
+    Streamed analyses (stream) report each stage as soon as it completes.
+    Workers publish the stages of a prediction on a shared queue, which a
+    reader thread routes to the waiting request by stream id.
+
+    Each worker's model keeps drift sketches of the postings it scores; a
+    thread in the worker sends them over the same queue every few seconds
+    and they are merged here for the served model version (drift_report).
+    """
+
+    def __init__(self, model_registry, inference_workers=None, scrape_concurrency=32,
+                 max_batch_size=32, max_batch_wait=0.005):
+        """
+        Args:
+            model_registry: ModelRegistry with the served model
+            inference_workers: Number of inference processes (default: one per
+                CPU; 0 runs inference in-process on the registry's model)
+            scrape_concurrency: Maximum number of concurrent scrapes
+            max_batch_size: Maximum predictions per micro-batch (1 disables batching)
+            max_batch_wait: Maximum seconds a prediction waits for others to join its batch
+        """
+        self.model_registry = model_registry
+        self.inference_workers = os.cpu_count() if inference_workers is None else inference_workers
+        self.job_scraper = JobScraper()
+        self.scrape_flights = SingleFlight()
+        self.predict_flights = SingleFlight()
+        self.batcher = None
+        if max_batch_size > 1:
+            self.batcher = MicroBatcher(self._predict_batch, max_batch_size=max_batch_size,
+                                        max_wait=max_batch_wait, concurrency=max(1, self.inference_workers))
+
+        self._io_executor = ThreadPoolExecutor(max_workers=scrape_concurrency, thread_name_prefix='scrape')
+
+        # Event queues of the streamed analyses in progress, by stream id
+        self._streams = {}
+        self._stream_ids = itertools.count()
+
+        self._inference_executor = None
+        # Pool replaced by the last swap, as (model version, executor), until its grace period ends
+        self._retired_executor = None
+        self._stage_events = None
+        self._executor_lock = threading.Lock()
+
+        # Drift sketches merged from the inference workers, as (model version, DriftMonitor)
+        self._drift = None
+        self._drift_lock = threading.Lock()
+        if self.inference_workers > 0:
+            self._stage_events = multiprocessing.get_context('spawn').Queue()
+            self._stage_thread = threading.Thread(target=self._route_stage_events, name='analysis-stages',
+                                                  daemon=True)
+            self._stage_thread.start()
+            self._inference_executor = self._start_inference_executor()
+            model_registry.add_activation_hook(self._warm_inference_executor)
+
+        self._loop = asyncio.new_event_loop()
+        self._loop_thread = threading.Thread(target=self._loop.run_forever, name='analysis-loop', daemon=True)
+        self._loop_thread.start()
+
+        atexit.register(self.shutdown)
+
+    def scrape(self, url, timeout=None):
+        """
+        Scrape a job posting without tying up inference capacity
+
+        Args:
+            url: URL of the job posting
+            timeout: Seconds to wait for the result (None waits indefinitely)
+
+        Returns:
+            Dictionary with scraped job data, or None if scraping failed
+        """
+        coroutine = self.scrape_flights.do(normalize_job_url(url), lambda: self._scrape(url))
+        return self._run(coroutine, timeout)
+
+    def predict(self, job_data, model_version, key=None, timeout=None, ensemble_model=None):
+        """
+        Run the ensemble on a job posting in the inference pool
+
+        Args:
+            job_data: Dictionary with job posting details
+            model_version: Model version to predict with (from the registry snapshot)
+            key: Hash of the posting content and model version; concurrent
+                predictions with the same key share one execution
+            timeout: Seconds to wait for the result (None waits indefinitely)
+            ensemble_model: Model of the same registry snapshot, used for
+                in-process inference (default: the registry's current model)
+
+        Returns:
+            Dictionary with prediction results
+        """
+        if ensemble_model is None:
+            ensemble_model, _ = self.model_registry.current()
+        if key is None:
+            return self._run(self._predict(job_data, model_version, ensemble_model), timeout)
+        coroutine = self.predict_flights.do(key, lambda: self._predict(job_data, model_version, ensemble_model))
+        return self._run(coroutine, timeout)
+
+    def stream(self, model_version, job_data=None, url=None, timeout=None, ensemble_model=None):
+        """
+        Analyze a job posting, yielding each stage as it completes
+
+        Events, in order: 'scraped' (URL analyses only, with the job data),
+        'fast' (provisional score of the fast models), 'ensemble' (score of
+        every model) and 'result' (the full prediction, as predict returns
+        it). Postings answered without running the models skip straight to
+        'result'. A failure ends the stream with an 'error' event instead.
+
+        Args:
+            model_version: Model version to predict with (from the registry snapshot)
+            job_data: Dictionary with job posting details (if no URL is given)
+            url: URL of a job posting to scrape first
+            timeout: Seconds to wait for each event (None waits indefinitely)
+            ensemble_model: Model of the same registry snapshot, used for
+                in-process inference (default: the registry's current model)
+
+        Yields:
+            Tuples of (event name, data dictionary)
+        """
+        if ensemble_model is None:
+            ensemble_model, _ = self.model_registry.current()
+        stream_id = next(self._stream_ids)
+        events = queue.Queue()
+        self._streams[stream_id] = events
+        future = asyncio.run_coroutine_threadsafe(
+            self._stream(stream_id, model_version, ensemble_model, job_data, url), self._loop
+        )
+        try:
+            while True:
+                try:
+                    event, data = events.get(timeout=timeout)
+                except queue.Empty:
+                    yield 'error', {'error': 'The analysis timed out.'}
+                    return
+                yield event, data
+                if event in ('result', 'error'):
+                    return
+        finally:
+            # The client may have disconnected; later events are dropped
+            self._streams.pop(stream_id, None)
+            future.cancel()
+
+    def metrics(self):
+        """
+        Coalescing counters of the scrape and predict stages
+
+        Returns:
+            Dictionary of SingleFlight statistics per stage, the circuit
+            breaker statistics of the scraped hosts and the micro-batching
+            statistics
+        """
+        metrics = {
+            'scrape': self.scrape_flights.stats(),
+            'predict': self.predict_flights.stats(),
+            'hosts': self.job_scraper.host_health.stats()
+        }
+        if self.batcher is not None:
+            metrics['batching'] = self.batcher.stats()
+        return metrics
+
+    def drift_report(self):
+        """
+        Drift summary of the postings scored by the served model version
+
+        Returns:
+            DriftMonitor report, with the model version
+        """
+        ensemble_model, version = self.model_registry.current()
+        monitor = None
+        if self._inference_executor is not None:
+            with self._drift_lock:
+                if self._drift is not None and self._drift[0] == version:
+                    monitor = self._drift[1]
+        if monitor is None:
+            # In-process inference, or nothing received from the workers yet
+            monitor = ensemble_model.drift_monitor()
+        return dict(monitor.report(), model_version=version)
+
+    def _merge_drift(self, version, monitor):
+        """Merge the drift sketches sent by a worker, dropping those of other model versions"""
+        if version != self.model_registry.current()[1]:
+            return
+        with self._drift_lock:
+            if self._drift is None or self._drift[0] != version:
+                self._drift = (version, monitor)
+            else:
+                self._drift[1].merge(monitor)
+
+    def _start_inference_executor(self, artifact_path=None, version=None, warm_timeout=None):
+        """
+        Start the inference processes with a model version preloaded
+
+        Args:
+            artifact_path: Artifact directory of the version (default: the served version's)
+            version: Version to preload (default: the served version)
+            warm_timeout: If given, seconds to wait until every worker has loaded it
+
+        Returns:
+            ProcessPoolExecutor
+        """
+        if version is None:
+            _, version = self.model_registry.current()
+            artifact_path = self.model_registry.artifact_path(version)
+        context = multiprocessing.get_context('spawn')
+        loaded = context.Semaphore(0)
+        executor = ProcessPoolExecutor(
+            max_workers=self.inference_workers,
+            # Spawned workers do not inherit the server's threads
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(artifact_path, version, self._stage_events, loaded)
+        )
+        # Each task submitted to an idle pool starts one more worker
+        for _ in range(self.inference_workers):
+            executor.submit(_worker_ready)
+        if warm_timeout is not None:
+            deadline = time.monotonic() + warm_timeout
+            for _ in range(self.inference_workers):
+                if not loaded.acquire(timeout=max(0.0, deadline - time.monotonic())):
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    raise TimeoutError(f"Inference workers did not load model version {version} "
+                                       f"within {warm_timeout:.0f}s")
+        return executor
+
+    def _warm_inference_executor(self, artifact_path, version):
+        """
+        Registry activation hook: replace the inference pool with one that has the new version loaded
+
+        Runs before the registry swaps, so the served version is still the
+        old pool's. The old pool is retired: requests on its version keep
+        going to it for RETIRED_POOL_GRACE_SECONDS, then it exits once the
+        tasks it took are done. A pool retired by an earlier swap is stopped.
+        """
+        executor = self._start_inference_executor(artifact_path, version, warm_timeout=WORKER_WARM_TIMEOUT)
+        _, previous_version = self.model_registry.current()
+        with self._executor_lock:
+            stale = self._retired_executor
+            retired_executor = self._inference_executor
+            self._retired_executor = (previous_version, retired_executor)
+            self._inference_executor = executor
+        if stale is not None:
+            stale[1].shutdown(wait=False)
+
+        timer = threading.Timer(RETIRED_POOL_GRACE_SECONDS, self._stop_retired_executor, args=(retired_executor,))
+        timer.daemon = True
+        timer.start()
+        logger.info(f"Inference workers warmed with model version {version}")
+
+    def _stop_retired_executor(self, executor):
+        """End the grace period of a retired pool (unless a later swap already stopped it)"""
+        with self._executor_lock:
+            if self._retired_executor is None or self._retired_executor[1] is not executor:
+                return
+            self._retired_executor = None
+        executor.shutdown(wait=False)
+
+    def _restart_inference_executor(self, broken_executor):
+        """Replace a pool whose worker died (e.g. killed for memory), once per failure"""
+        with self._executor_lock:
+            if self._inference_executor is broken_executor:
+                logger.error("Inference worker died; restarting the inference pool")
+                broken_executor.shutdown(wait=False, cancel_futures=True)
+                self._inference_executor = self._start_inference_executor()
+
+    async def _scrape(self, url):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._io_executor, self.job_scraper.scrape_job_posting, url)
+
+    async def _predict(self, job_data, model_version, ensemble_model, stream_id=None):
+        if stream_id is None and self.batcher is not None:
+            return await self.batcher.submit((job_data, model_version, ensemble_model))
+
+        if self._inference_executor is None:
+            loop = asyncio.get_running_loop()
+            if stream_id is None:
+                return await loop.run_in_executor(None, ensemble_model.predict, job_data)
+            publish = functools.partial(self._publish, stream_id)
+            predict = functools.partial(ensemble_model.predict, job_data, on_stage=publish)
+            publish('result', await loop.run_in_executor(None, predict))
+            return None
+
+        artifact_path = self.model_registry.artifact_path(model_version)
+        return await self._submit_inference(_worker_predict, job_data, artifact_path, model_version, stream_id)
+
+    async def _predict_batch(self, items):
+        """Predict a micro-batch of (job data, model version, model) items, by model version"""
+        results = [None] * len(items)
+        versions = {}
+        for i, (_, model_version, _) in enumerate(items):
+            versions.setdefault(model_version, []).append(i)
+
+        async def run(model_version, indices):
+            jobs = [items[i][0] for i in indices]
+            if self._inference_executor is None:
+                ensemble_model = items[indices[0]][2]
+                loop = asyncio.get_running_loop()
+                predictions = await loop.run_in_executor(None, _predict_jobs, ensemble_model, jobs)
+            elif len(jobs) < MIN_VECTORIZED_BATCH:
+                artifact_path = self.model_registry.artifact_path(model_version)
+                predictions = await asyncio.gather(*(
+                    self._submit_inference(_worker_predict, job_data, artifact_path, model_version)
+                    for job_data in jobs
+                ))
+            else:
+                artifact_path = self.model_registry.artifact_path(model_version)
+                predictions = await self._submit_inference(_worker_predict_batch, jobs, artifact_path,
+                                                           model_version)
+            for i, prediction in zip(indices, predictions):
+                results[i] = prediction
+
+        await asyncio.gather(*(run(version, indices) for version, indices in versions.items()))
+        return results
+
+    async def _submit_inference(self, fn, payload, artifact_path, model_version, *args):
+        """
+        Run a task in the pool that has its model version loaded
+
+        Requests on the version of the retired pool go there while it lasts;
+        everything else goes to the current pool, which is restarted once if
+        a worker died.
+        """
+        args = (payload, artifact_path, model_version) + args
+        retired = self._retired_executor
+        executor = retired[1] if retired is not None and retired[0] == model_version else self._inference_executor
+        try:
+            return await asyncio.wrap_future(executor.submit(fn, *args))
+        except BrokenProcessPool:
+            if executor is self._inference_executor:
+                self._restart_inference_executor(executor)
+        except RuntimeError:
+            # The pool was retired or stopped after it was picked
+            if executor is self._inference_executor:
+                raise
+        return await asyncio.wrap_future(self._inference_executor.submit(fn, *args))
+
+    async def _stream(self, stream_id, model_version, ensemble_model, job_data, url):
+        """Scrape (if needed) and predict, publishing the stages of a streamed analysis"""
+        try:
+            if url is not None:
+                job_data = await self.scrape_flights.do(normalize_job_url(url), lambda: self._scrape(url))
+                if not job_data:
+                    self._publish(stream_id, 'error',
+                                  {'error': 'Could not scrape job posting from the provided URL.'})
+                    return
+                self._publish(stream_id, 'scraped', {'job_data': job_data})
+            await self._predict(job_data, model_version, ensemble_model, stream_id=stream_id)
+        except Exception as e:
+            logger.error(f"Error in streamed analysis: {str(e)}")
+            self._publish(stream_id, 'error', {'error': 'An error occurred during analysis.'})
+
+    def _publish(self, stream_id, event, data):
+        """Hand an event to the request waiting on a stream, if it is still connected"""
+        events = self._streams.get(stream_id)
+        if events is not None:
+            events.put((event, data))
+
+    def _route_stage_events(self):
+        """Forward the events published by inference workers until shutdown"""
+        while True:
+            try:
+                item = self._stage_events.get()
+            except (EOFError, OSError, ValueError):
+                # The queue was closed at shutdown
+                return
+            if item is None:
+                return
+            if item[0] is None:
+                self._merge_drift(*item[2])
+                continue
+            self._publish(*item)
+
+    def _run(self, coroutine, timeout):
+        """Schedule a coroutine on the pipeline loop and wait for its result"""
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result(timeout)
+
+    def shutdown(self):
+        """Stop the event loop and the executors"""
+        self.model_registry.remove_activation_hook(self._warm_inference_executor)
+        if self._loop.is_running():
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._loop_thread.join(timeout=5)
+        self._io_executor.shutdown(wait=False, cancel_futures=True)
+        if self._inference_executor is not None:
+            self._inference_executor.shutdown(wait=False, cancel_futures=True)
+        if self._retired_executor is not None:
+            self._retired_executor[1].shutdown(wait=False, cancel_futures=True)
+        if self._stage_events is not None:
+            self._stage_events.put(None)
@@ -3,78 +3,208 @@ Web application for The-ROBIN fake job detection system
 """
 
 import json
+import hashlib
 from flask import Flask, render_template, request, jsonify, url_for, redirect
 import logging
 
-from models.ensemble_model import EnsembleModel
-from utils.job_scraper import JobScraper
+from models.model_registry import ModelRegistry
+from ui.analysis_pipeline import AnalysisPipeline
 
 logger = logging.getLogger(__name__)
 
-def create_app():
-    """Create and configure the Flask application"""
+# Text fields accepted in JSON analysis requests
+JOB_TEXT_FIELDS = ['title', 'company', 'description', 'requirements', 'benefits',
+                   'company_profile', 'location']
+
+# Seconds a streamed analysis waits for its next stage before giving up
+STREAM_STAGE_TIMEOUT = 60
+
+def contact_values(values, field):
+    """
+    Normalize the emails or phones of a JSON request to a list of strings
+
+    A single value is accepted as a one-item list; numbers are converted to
+    strings and other entries (objects, lists, null) are dropped.
+
+    Raises:
+        ValueError: If the field is neither a list nor a single value
+    """
+    if values is None:
+        return []
+    if isinstance(values, (str, int, float)):
+        values = [values]
+    if not isinstance(values, list):
+        raise ValueError(f'contact_info.{field} must be a list.')
+    return [str(value) for value in values
+            if isinstance(value, (str, int, float)) and not isinstance(value, bool)]
+
+def job_data_from_json(payload):
+    """
+    Build job data from a JSON analysis request (as sent by the browser extension)
+    
+    Args:
+        payload: Parsed JSON body with job posting fields
+        
+    Returns:
+        Dictionary with job posting details
+        
+    Raises:
+        ValueError: If contact_info is not an object
+    """
+    job_data = {field: str(payload.get(field) or '') for field in JOB_TEXT_FIELDS}
+    contact_info = payload.get('contact_info') or {}
+    if not isinstance(contact_info, dict):
+        raise ValueError('contact_info must be an object with emails and phones.')
+    job_data['contact_info'] = {
+        'emails': contact_values(contact_info.get('emails'), 'emails'),
+        'phones': contact_values(contact_info.get('phones'), 'phones')
+    }
+    return job_data
+
+def read_job_request():
+    """
+    Read the posting to analyze from the current request (JSON body or form)
+    
+    Returns:
+        Tuple of (job URL, job data); exactly one of them is set
+        
+    Raises:
+        ValueError: If the request has neither a URL nor job details, or a
+            malformed JSON body
+    """
+    payload = request.get_json(silent=True) if request.is_json else None
+    
+    if payload is not None:
+        if not isinstance(payload, dict):
+            raise ValueError('The JSON body must be an object.')
+        if payload.get('job_url'):
+            if not isinstance(payload['job_url'], str):
+                raise ValueError('job_url must be a string.')
+            return payload['job_url'], None
+        if payload.get('title') and payload.get('description'):
+            return None, job_data_from_json(payload)
+    
+    elif 'job_url' in request.form and request.form['job_url']:
+        return request.form['job_url'], None
+    
+    elif 'job_title' in request.form and 'job_description' in request.form:
+        return None, {
+            'title': request.form['job_title'],
+            'company': request.form.get('company_name', ''),
+            'description': request.form['job_description'],
+            'requirements': request.form.get('job_requirements', ''),
+            'benefits': request.form.get('job_benefits', ''),
+            'company_profile': request.form.get('company_profile', ''),
+            'location': request.form.get('job_location', ''),
+            'contact_info': {
+                'emails': request.form.get('contact_email', '').split(','),
+                'phones': request.form.get('contact_phone', '').split(',')
+            }
+        }
+    
+    raise ValueError('No job data provided. Please enter a URL or job details.')
+
+def sse_event(event, data):
+    """Format one Server-Sent Event with a JSON payload"""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+def job_etag(job_data, model_version):
+    """
+    Entity tag of an analysis: hash of the posting content and the model version
+    
+    The same posting analyzed by the same model always gets the same verdict,
+    so clients can revalidate a cached verdict with If-None-Match.
+    """
+    content = json.dumps(job_data, sort_keys=True, default=str)
+    digest = hashlib.sha256(content.encode('utf-8')).hexdigest()[:32]
+    return f"{model_version}-{digest}"
+
+def create_app(model_dir='models', watch_models=True, poll_interval=5.0, inference_workers=None,
+               shadow_model_dir=None, shadow_sample_rate=0.05, shadow_cpu_share=0.1,
+               shadow_log='logs/shadow.jsonl', max_batch_size=32, max_batch_wait=0.005):
+    """
+    Create and configure the Flask application
+    
+    Args:
+        model_dir: Directory (or versioned bundle root) with the model artifacts
+        watch_models: Whether to hot-reload retrained models from model_dir
+        poll_interval: Seconds between checks for new model artifacts
+        inference_workers: Number of inference processes (default: one per
+            CPU; 0 runs inference in the web server process)
+        shadow_model_dir: Directory with candidate models to shadow-evaluate (optional)
+        shadow_sample_rate: Fraction of analyses also scored by the shadow models
+        shadow_cpu_share: Maximum fraction of one core used for shadow scoring
+        shadow_log: JSON lines file the shadow evaluations are written to
+        max_batch_size: Maximum concurrent predictions run as one batch (1 disables batching)
+        max_batch_wait: Maximum seconds a prediction waits for others to join its batch
+    """
     app = Flask(__name__)
     
-    # Initialize models
-    ensemble_model = EnsembleModel()
+    # Initialize models; retrained artifacts are swapped in without a restart
+    model_registry = ModelRegistry(model_dir, poll_interval=poll_interval)
     try:
-        ensemble_model.load_models()
-        ensemble_model.load_preprocessor()
-        model_loaded = True
+        model_registry.load()
     except Exception as e:
         logger.error(f"Error loading models: {str(e)}")
-        model_loaded = False
+    app.config['MODEL_REGISTRY'] = model_registry
     
-    # Initialize job scraper
-    job_scraper = JobScraper()
+    # Scraping runs on an event loop and inference in a warm process pool,
+    # so slow job boards do not hold up predictions
+    pipeline = AnalysisPipeline(model_registry, inference_workers=inference_workers,
+                                max_batch_size=max_batch_size, max_batch_wait=max_batch_wait)
+    app.config['ANALYSIS_PIPELINE'] = pipeline
+    # Watched once the pipeline can warm its workers on new versions
+    if watch_models:
+        model_registry.start_watching()
+    
+    # Candidate models score a sample of traffic after responses are sent
+    shadow = None
+    if shadow_model_dir:
+        from models.shadow_evaluator import ShadowEvaluator
+        shadow = ShadowEvaluator(shadow_model_dir, log_path=shadow_log, sample_rate=shadow_sample_rate,
+                                 cpu_share=shadow_cpu_share)
+        shadow.start()
+    app.config['SHADOW_EVALUATOR'] = shadow
     
     @app.route('/')
     def index():
         """Render the home page"""
-        return render_template('index.html', model_loaded=model_loaded)
+        return render_template('index.html', model_loaded=model_registry.is_loaded())
     
     @app.route('/analyze', methods=['POST'])
     def analyze():
         """Analyze a job posting"""
-        if not model_loaded:
+        # Snapshot the active model so a concurrent swap cannot affect this request
+        ensemble_model, model_version = model_registry.current()
+        if ensemble_model is None:
             return jsonify({
                 'error': 'Models not loaded. Please train the models first.'
             }), 400
         
         try:
-            # Check if URL or text data was provided
-            if 'job_url' in request.form and request.form['job_url']:
+            job_url, job_data = read_job_request()
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        try:
+            if job_url:
                 # Scrape job posting from URL
-                job_url = request.form['job_url']
-                job_data = job_scraper.scrape_job_posting(job_url)
-                
+                job_data = pipeline.scrape(job_url)
                 if not job_data:
                     return jsonify({
                         'error': 'Could not scrape job posting from the provided URL.'
                     }), 400
             
-            elif 'job_title' in request.form and 'job_description' in request.form:
-                # Use provided text data
-                job_data = {
-                    'title': request.form['job_title'],
-                    'company': request.form.get('company_name', ''),
-                    'description': request.form['job_description'],
-                    'requirements': request.form.get('job_requirements', ''),
-                    'benefits': request.form.get('job_benefits', ''),
-                    'company_profile': request.form.get('company_profile', ''),
-                    'location': request.form.get('job_location', ''),
-                    'contact_info': {
-                        'emails': request.form.get('contact_email', '').split(','),
-                        'phones': request.form.get('contact_phone', '').split(',')
-                    }
-                }
-            else:
-                return jsonify({
-                    'error': 'No job data provided. Please enter a URL or job details.'
-                }), 400
+            # A client holding the verdict for this content and model version
+            # gets a 304 without running the models again
+            etag = job_etag(job_data, model_version)
+            if request.if_none_match.contains(etag):
+                response = app.response_class(status=304)
+                response.set_etag(etag)
+                return response
             
             # Analyze the job posting
-            result = ensemble_model.predict(job_data)
+            result = pipeline.predict(job_data, model_version, key=etag, ensemble_model=ensemble_model)
             
             # Ensure all values are JSON serializable
             result['is_fake'] = bool(result['is_fake'])
@@ -84,11 +214,17 @@ def create_app():
                 for key in result['model_probabilities']:
                     result['model_probabilities'][key] = float(result['model_probabilities'][key])
             
-            # Add job data to result
+            # Add job data and model version to result
             result['job_data'] = job_data
+            result['model_version'] = model_version
             
-            # Return the result
-            return jsonify(result)
+            # Return the result; clients must revalidate before reusing it
+            response = jsonify(result)
+            response.set_etag(etag)
+            response.headers['Cache-Control'] = 'private, no-cache'
+            if shadow is not None:
+                response.call_on_close(lambda: shadow.submit(job_data, result, model_version))
+            return response
             
         except Exception as e:
             logger.error(f"Error analyzing job posting: {str(e)}")
@@ -96,6 +232,63 @@ def create_app():
                 'error': 'An error occurred during analysis.'
             }), 500
     
+    @app.route('/analyze/stream', methods=['POST'])
+    def analyze_stream():
+        """
+        Analyze a job posting, streaming each stage as a Server-Sent Event
+        
+        Events: 'scraped' (URL requests), 'fast' (provisional score),
+        'ensemble' (final score), then 'result' (the same body /analyze
+        returns) or 'error'.
+        """
+        ensemble_model, model_version = model_registry.current()
+        if ensemble_model is None:
+            return jsonify({
+                'error': 'Models not loaded. Please train the models first.'
+            }), 400
+        
+        try:
+            job_url, job_data = read_job_request()
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        # Posted content can be revalidated as with /analyze (not URLs, whose
+        # content is only known after scraping)
+        etag = job_etag(job_data, model_version) if job_data is not None else None
+        if etag is not None and request.if_none_match.contains(etag):
+            response = app.response_class(status=304)
+            response.set_etag(etag)
+            return response
+        
+        served = {}
+        
+        def events():
+            analyzed = job_data
+            stages = pipeline.stream(model_version, job_data=job_data, url=job_url,
+                                     timeout=STREAM_STAGE_TIMEOUT, ensemble_model=ensemble_model)
+            for event, data in stages:
+                if event == 'scraped':
+                    analyzed = data['job_data']
+                elif event == 'result':
+                    data['job_data'] = analyzed
+                    data['model_version'] = model_version
+                    served['result'] = data
+                yield sse_event(event, data)
+        
+        response = app.response_class(events(), mimetype='text/event-stream')
+        if shadow is not None:
+            # Submitted once the stream is closed, like /analyze
+            def submit_to_shadow():
+                if 'result' in served:
+                    shadow.submit(served['result']['job_data'], served['result'], model_version)
+            response.call_on_close(submit_to_shadow)
+        if etag is not None:
+            response.set_etag(etag)
+        response.headers['Cache-Control'] = 'private, no-cache'
+        # Proxies must pass the events through as they are written
+        response.headers['X-Accel-Buffering'] = 'no'
+        return response
+    
     @app.route('/results')
     def results():
         """Render the results page"""
@@ -131,12 +324,27 @@ def create_app():
         logger.error(f"Server error: {str(e)}")
         return render_template('500.html'), 500
     
+    @app.route('/metrics')
+    def metrics():
+        """Request coalescing, scraped host health and micro-batching metrics"""
+        return jsonify(pipeline.metrics())
+    
+    @app.route('/drift')
+    def drift():
+        """Streaming drift summary of the postings scored by the served model"""
+        if not model_registry.is_loaded():
+            return jsonify({
+                'error': 'Models not loaded. Please train the models first.'
+            }), 400
+        return jsonify(pipeline.drift_report())
+    
     @app.route('/health')
     def health():
         """Health check endpoint"""
         return jsonify({
             'status': 'ok',
-            'message': 'The-ROBIN API is running'
+            'message': 'The-ROBIN API is running',
+            'model_version': model_registry.current()[1]
     })
     
     return app
\ No newline at end of file
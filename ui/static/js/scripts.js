@@ -39,6 +39,7 @@ document.addEventListener('DOMContentLoaded', function() {
         // Show loading spinner
         const loadingEl = document.getElementById('loading');
         loadingEl.classList.remove('hidden');
+        resetPartialResult();
         
         // Disable submit button
         const submitBtn = form.querySelector('button[type="submit"]');
@@ -47,8 +48,8 @@ document.addEventListener('DOMContentLoaded', function() {
         // Create form data
         const formData = new FormData(form);
         
-        // Send AJAX request
-        fetch('/analyze', {
+        // Stream the analysis so each stage is shown as soon as it completes
+        fetch('/analyze/stream', {
             method: 'POST',
             body: formData
         })
@@ -58,7 +59,7 @@ document.addEventListener('DOMContentLoaded', function() {
                     throw new Error(data.error || 'An error occurred during analysis');
                 });
             }
-            return response.json();
+            return readAnalysisStream(response.body, handleStage);
         })
         .then(result => {
             // Hide loading spinner
@@ -82,4 +83,93 @@ document.addEventListener('DOMContentLoaded', function() {
             alert('Error: ' + error.message);
         });
     }
+    
+    // Read Server-Sent Events from a response body until the final result
+    function readAnalysisStream(body, onStage) {
+        const reader = body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        
+        function read() {
+            return reader.read().then(({ done, value }) => {
+                if (done) {
+                    throw new Error('The analysis ended before a result was received');
+                }
+                buffer += decoder.decode(value, { stream: true });
+                
+                // Events are separated by a blank line
+                let boundary;
+                while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+                    const block = buffer.slice(0, boundary);
+                    buffer = buffer.slice(boundary + 2);
+                    
+                    let event = 'message';
+                    let data = '';
+                    block.split('\n').forEach(line => {
+                        if (line.startsWith('event: ')) {
+                            event = line.slice(7);
+                        } else if (line.startsWith('data: ')) {
+                            data += line.slice(6);
+                        }
+                    });
+                    
+                    const payload = data ? JSON.parse(data) : {};
+                    if (event === 'error') {
+                        reader.cancel();
+                        throw new Error(payload.error || 'An error occurred during analysis');
+                    }
+                    if (event === 'result') {
+                        reader.cancel();
+                        return payload;
+                    }
+                    onStage(event, payload);
+                }
+                return read();
+            });
+        }
+        
+        return read();
+    }
+    
+    // Show the partial result of a completed stage
+    function handleStage(event, payload) {
+        const stageEl = document.getElementById('loading-stage');
+        document.getElementById('partial-result').classList.remove('hidden');
+        
+        if (event === 'scraped') {
+            document.getElementById('partial-title').textContent = payload.job_data.title || '';
+            stageEl.textContent = 'Job posting found. Running the models...';
+        } else if (event === 'fast') {
+            showPartialScore(payload.confidence_score, 'Early estimate from the fastest models');
+            stageEl.textContent = 'Running the remaining models...';
+        } else if (event === 'ensemble') {
+            showPartialScore(payload.confidence_score, 'Final score from all models');
+            stageEl.textContent = 'Explaining the result...';
+        }
+    }
+    
+    // Update the partial fraud score meter
+    function showPartialScore(score, description) {
+        document.getElementById('partial-score').classList.remove('hidden');
+        document.getElementById('partial-percentage').textContent = score.toFixed(1) + '%';
+        document.getElementById('partial-description').textContent = description;
+        
+        const meter = document.getElementById('partial-meter');
+        meter.style.width = score + '%';
+        if (score < 30) {
+            meter.style.backgroundColor = '#2ecc71';
+        } else if (score < 70) {
+            meter.style.backgroundColor = '#f39c12';
+        } else {
+            meter.style.backgroundColor = '#e74c3c';
+        }
+    }
+    
+    // Clear the partial result of a previous analysis
+    function resetPartialResult() {
+        document.getElementById('loading-stage').textContent = 'Analyzing job posting...';
+        document.getElementById('partial-result').classList.add('hidden');
+        document.getElementById('partial-score').classList.add('hidden');
+        document.getElementById('partial-title').textContent = '';
+    }
 });
\ No newline at end of file
@@ -0,0 +1,28 @@
+"""
+WSGI entry point for production servers, e.g. `gunicorn ui.wsgi:app`
+
+Configured through environment variables:
+    ROBIN_MODEL_DIR: Model directory or versioned bundle root (default: models)
+    ROBIN_INFERENCE_WORKERS: Inference processes per server worker (default: 1, since
+        every server worker starts its own pool and each process holds a full ensemble;
+        raise it only when running fewer server workers than CPUs)
+    ROBIN_SHADOW_MODEL_DIR: Candidate models to shadow-evaluate (default: none)
+    ROBIN_SHADOW_SAMPLE_RATE: Fraction of analyses scored by the shadow models (default: 0.05)
+    ROBIN_SHADOW_CPU_SHARE: Maximum fraction of one core for shadow scoring (default: 0.1)
+    ROBIN_MAX_BATCH_SIZE: Maximum predictions per micro-batch, 1 to disable (default: 32)
+    ROBIN_MAX_BATCH_WAIT_MS: Maximum milliseconds a prediction waits for a batch (default: 5)
+"""
+
+import os
+
+from ui.app import create_app
+
+app = create_app(
+    model_dir=os.environ.get('ROBIN_MODEL_DIR', 'models'),
+    inference_workers=int(os.environ.get('ROBIN_INFERENCE_WORKERS', 1)),
+    shadow_model_dir=os.environ.get('ROBIN_SHADOW_MODEL_DIR'),
+    shadow_sample_rate=float(os.environ.get('ROBIN_SHADOW_SAMPLE_RATE', 0.05)),
+    shadow_cpu_share=float(os.environ.get('ROBIN_SHADOW_CPU_SHARE', 0.1)),
+    max_batch_size=int(os.environ.get('ROBIN_MAX_BATCH_SIZE', 32)),
+    max_batch_wait=float(os.environ.get('ROBIN_MAX_BATCH_WAIT_MS', 5)) / 1000
+)
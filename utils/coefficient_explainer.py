@@ -0,0 +1,75 @@
+"""
+Coefficient-driven explanations of the text model
+"""
+
+import numpy as np
+
+class CoefficientExplainer:
+    """
+    Explain a posting by the n-grams that pushed the logistic regression toward fraud
+
+    The logistic regression is linear in the TF-IDF features, whose values
+    already include the IDF weights, so the contribution of an n-gram to the
+    log-odds of a posting is simply coefficient * TF-IDF value. The
+    coefficients of the TF-IDF columns are extracted once at training time;
+    explaining a posting is then a product over the non-zeros of its sparse
+    TF-IDF row, with no perturbation or sampling.
+    """
+
+    def __init__(self, coefficients, phrases, min_contribution=0.05):
+        """
+        Args:
+            coefficients: Logistic regression coefficients of the TF-IDF columns
+            phrases: TF-IDF feature names (n-grams), in column order
+            min_contribution: Minimum log-odds contribution for a phrase to be reported
+        """
+        self.coefficients = np.asarray(coefficients, dtype=np.float64)
+        self.phrases = np.asarray(phrases, dtype=object)
+        self.min_contribution = min_contribution
+
+    @classmethod
+    def from_model(cls, model, phrases, offset=0):
+        """
+        Build the explainer from a trained logistic regression
+
+        Args:
+            model: Trained LogisticRegressionModel
+            phrases: TF-IDF feature names
+            offset: Column where the TF-IDF block starts in the model's input
+
+        Returns:
+            CoefficientExplainer
+        """
+        coefficients = model.model.coef_[0][offset:offset + len(phrases)]
+        return cls(coefficients, phrases)
+
+    def explain(self, X_tfidf, row=0, top_k=5):
+        """
+        Find the phrases that contributed most to a fraud verdict
+
+        Args:
+            X_tfidf: Sparse CSR matrix of TF-IDF features
+            row: Row of the matrix to explain
+            top_k: Maximum number of phrases to return
+
+        Returns:
+            List of (phrase, contribution) tuples, largest contribution first
+        """
+        start, end = X_tfidf.indptr[row], X_tfidf.indptr[row + 1]
+        if start == end:
+            return []
+
+        columns = X_tfidf.indices[start:end]
+        contributions = self.coefficients[columns] * X_tfidf.data[start:end]
+
+        if len(contributions) > top_k:
+            top = np.argpartition(contributions, -top_k)[-top_k:]
+        else:
+            top = np.arange(len(contributions))
+        top = top[np.argsort(contributions[top])[::-1]]
+
+        return [
+            (self.phrases[columns[i]], float(contributions[i]))
+            for i in top
+            if contributions[i] >= self.min_contribution
+        ]
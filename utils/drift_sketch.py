@@ -0,0 +1,381 @@
+"""
+Constant-memory, mergeable streaming sketches of served postings and scores
+"""
+
+import copy
+import hashlib
+import threading
+import functools
+from collections import Counter
+import numpy as np
+
+@functools.lru_cache(maxsize=8192)
+def _token_counters(token, width, depth):
+    """Flat table position of a token's counter in each row (double hashing of one digest)"""
+    digest = hashlib.blake2b(token.encode('utf-8'), digest_size=16).digest()
+    h1 = int.from_bytes(digest[:8], 'little')
+    h2 = int.from_bytes(digest[8:], 'little') | 1
+    return tuple(row * width + (h1 + row * h2) % width for row in range(depth))
+
+class CountMinSketch:
+    """
+    Approximate counts of a stream of tokens in a fixed-size table
+
+    Each token increments one counter in each of depth rows; its estimate is
+    the smallest of those counters, which overestimates by at most
+    e / width of the stream total with probability 1 - exp(-depth). Hashes
+    are keyed digests rather than Python's salted hash(), so sketches built
+    in different processes can be merged by adding their tables.
+
+    The top_k tokens with the highest estimates are kept as candidates, so
+    the most frequent tokens can be listed.
+    """
+
+    def __init__(self, width=2048, depth=4, top_k=20):
+        """
+        Args:
+            width: Counters per row
+            depth: Number of rows (independent hashes)
+            top_k: Number of most frequent tokens tracked
+        """
+        self.width = width
+        self.depth = depth
+        self.top_k = top_k
+        self.table = np.zeros((depth, width), dtype=np.int64)
+        self.total = 0
+        self.heavy_hitters = {}
+
+    def update(self, tokens):
+        """
+        Count a list of tokens
+
+        Args:
+            tokens: Tokens (repeats count repeatedly)
+        """
+        if not tokens:
+            return
+        counts = Counter(tokens)
+        positions = np.array([_token_counters(token, self.width, self.depth) for token in counts])
+        flat = self.table.reshape(-1)
+        np.add.at(flat, positions.ravel(), np.repeat(np.fromiter(counts.values(), np.int64, len(counts)),
+                                                     self.depth))
+        self.total += len(tokens)
+
+        # Estimates only grow, so tokens at or below the smallest candidate cannot enter
+        floor = min(self.heavy_hitters.values()) if len(self.heavy_hitters) >= self.top_k else -1
+        for token, estimate in zip(counts, flat[positions].min(axis=1).tolist()):
+            if estimate > floor or token in self.heavy_hitters:
+                self._track(token, estimate)
+
+    def estimate(self, token):
+        """Estimated count of a token (never below the true count)"""
+        return int(self.table.reshape(-1)[list(_token_counters(token, self.width, self.depth))].min())
+
+    def _track(self, token, estimate):
+        """Keep the token among the candidates if it is one of the top_k estimates"""
+        if token in self.heavy_hitters or len(self.heavy_hitters) < self.top_k:
+            self.heavy_hitters[token] = estimate
+            return
+        smallest = min(self.heavy_hitters, key=self.heavy_hitters.get)
+        if estimate > self.heavy_hitters[smallest]:
+            del self.heavy_hitters[smallest]
+            self.heavy_hitters[token] = estimate
+
+    def merge(self, other):
+        """Add another sketch of the same shape into this one"""
+        if (other.width, other.depth) != (self.width, self.depth):
+            raise ValueError("Count-min sketches of different shapes cannot be merged.")
+        self.table += other.table
+        self.total += other.total
+        for token in set(self.heavy_hitters) | set(other.heavy_hitters):
+            self.heavy_hitters.pop(token, None)
+            self._track(token, self.estimate(token))
+
+    def top(self):
+        """
+        Most frequent tokens
+
+        Returns:
+            List of (token, estimated count) pairs, most frequent first
+        """
+        return sorted(self.heavy_hitters.items(), key=lambda item: -item[1])
+
+class QuantileHistogram:
+    """
+    Quantiles of a bounded value from a fixed-bin histogram
+
+    Quantiles are exact to within one bin width ((high - low) / bins), the
+    memory is constant and histograms are merged by adding their counts.
+    """
+
+    def __init__(self, low=0.0, high=1.0, bins=1000):
+        """
+        Args:
+            low: Smallest value (smaller values go in the first bin)
+            high: Largest value (larger values go in the last bin)
+            bins: Number of bins
+        """
+        self.low = low
+        self.high = high
+        self.bins = bins
+        self.counts = np.zeros(bins, dtype=np.int64)
+        self.total = 0
+        self.sum = 0.0
+
+    def update(self, value):
+        """Add one value"""
+        position = int((value - self.low) / (self.high - self.low) * self.bins)
+        self.counts[min(max(position, 0), self.bins - 1)] += 1
+        self.total += 1
+        self.sum += value
+
+    def quantile(self, q):
+        """Value below which a fraction q of the values fall (bin midpoint), or None if empty"""
+        if not self.total:
+            return None
+        position = int(np.searchsorted(np.cumsum(self.counts), q * self.total))
+        return self.low + (min(position, self.bins - 1) + 0.5) * (self.high - self.low) / self.bins
+
+    def fraction_above(self, value):
+        """Fraction of the values at or above a threshold (to within one bin)"""
+        if not self.total:
+            return None
+        position = int((value - self.low) / (self.high - self.low) * self.bins)
+        return float(self.counts[max(position, 0):].sum() / self.total)
+
+    def merge(self, other):
+        """Add another histogram with the same bins into this one"""
+        if (other.low, other.high, other.bins) != (self.low, self.high, self.bins):
+            raise ValueError("Histograms with different bins cannot be merged.")
+        self.counts += other.counts
+        self.total += other.total
+        self.sum += other.sum
+
+    def summary(self, quantiles=(0.05, 0.25, 0.5, 0.75, 0.95)):
+        """
+        Count, mean and quantiles
+
+        Returns:
+            Dictionary with the count, the mean and a 'p<percent>' entry per quantile
+        """
+        summary = {'count': self.total, 'mean': self.sum / self.total if self.total else None}
+        for q in quantiles:
+            summary[f"p{int(q * 100)}"] = self.quantile(q)
+        return summary
+
+class CategoryFrequencies:
+    """
+    Frequency of each known value of a categorical field
+
+    Counters exist only for the values seen in training; any other value is
+    counted in a single 'other' bucket, so memory stays bounded.
+    """
+
+    def __init__(self, categories):
+        """
+        Args:
+            categories: Known values of the field
+        """
+        self.categories = list(categories)
+        self.index = {value: i for i, value in enumerate(self.categories)}
+        self.counts = np.zeros(len(self.categories) + 1, dtype=np.int64)
+
+    def update(self, value):
+        """Count one value"""
+        self.counts[self.index.get(value, len(self.categories))] += 1
+
+    def merge(self, other):
+        """Add the counts of another counter over the same categories"""
+        if other.categories != self.categories:
+            raise ValueError("Category counters over different values cannot be merged.")
+        self.counts += other.counts
+
+    def frequencies(self):
+        """
+        Observed share of each value
+
+        Returns:
+            Tuple of (array of the shares of the known values, share of other values)
+        """
+        total = self.counts.sum()
+        if not total:
+            return np.zeros(len(self.categories)), 0.0
+        return self.counts[:-1] / total, float(self.counts[-1] / total)
+
+def population_stability_index(observed, expected, epsilon=1e-4):
+    """
+    Population stability index between two distributions over the same bins
+
+    Below 0.1 is usually read as stable, above 0.25 as a significant shift.
+
+    Args:
+        observed: Observed shares
+        expected: Reference shares
+        epsilon: Floor of each share, so empty bins stay finite
+
+    Returns:
+        PSI value
+    """
+    observed = np.maximum(np.asarray(observed, dtype=np.float64), epsilon)
+    expected = np.maximum(np.asarray(expected, dtype=np.float64), epsilon)
+    return float(np.sum((observed - expected) * np.log(observed / expected)))
+
+class DriftMonitor:
+    """
+    Streaming summary of the postings and scores served by one model
+
+    Tracks, in memory independent of traffic:
+
+    - the share of single-word terms outside the TF-IDF vocabulary (overall
+      and per posting) and the most frequent of those terms (count-min);
+    - quantiles of each model's fraud probability and of the ensemble
+      confidence score (fixed-bin histograms);
+    - the frequency of each categorical field's values, compared with their
+      training frequencies by the population stability index.
+
+    Postings answered as near-duplicates of known scams are included (they
+    have no model probabilities) and also counted separately.
+
+    No raw text is kept: only single terms outside the vocabulary, and only
+    the most frequent ones. Monitors built for the same model are merged by
+    adding their sketches, so inference workers can each keep one and send
+    it to the server, which merges them. Thread-safe.
+    """
+
+    def __init__(self, model_names, categories, reference=None, top_k=20):
+        """
+        Args:
+            model_names: Names of the ensemble's models
+            categories: Dictionary of categorical field -> known values
+            reference: Training statistics: 'oov_rate' and 'categories'
+                (field -> {value: share}); drift scores are omitted without it
+            top_k: Number of most frequent out-of-vocabulary terms listed
+        """
+        self.model_names = list(model_names)
+        self.reference = reference or {}
+        self.top_k = top_k
+        self._lock = threading.Lock()
+
+        self.postings = 0
+        self.known_scams = 0
+        self.words = 0
+        self.oov_terms = CountMinSketch(top_k=top_k)
+        self.oov_rates = QuantileHistogram(0.0, 1.0, bins=100)
+        self.probabilities = {name: QuantileHistogram() for name in self.model_names}
+        self.confidence = QuantileHistogram(0.0, 100.0)
+        self.categories = {field: CategoryFrequencies(values) for field, values in categories.items()}
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def update(self, term_stats, categorical, model_probabilities, confidence_score, known_scam=False):
+        """
+        Add one scored posting
+
+        Args:
+            term_stats: Single-word term counts from RecordEncoder ('words', 'oov')
+            categorical: Dictionary of categorical field -> value
+            model_probabilities: Dictionary of model name -> fraud probability
+            confidence_score: Ensemble confidence score (0-100)
+            known_scam: Whether the posting matched a known scam instead of being scored
+        """
+        with self._lock:
+            self.postings += 1
+            self.known_scams += int(known_scam)
+            self.words += term_stats['words']
+            self.oov_terms.update(term_stats['oov'])
+            if term_stats['words']:
+                self.oov_rates.update(len(term_stats['oov']) / term_stats['words'])
+            for name, probability in model_probabilities.items():
+                if name in self.probabilities:
+                    self.probabilities[name].update(float(probability))
+            self.confidence.update(float(confidence_score))
+            for field, counter in self.categories.items():
+                counter.update(categorical.get(field, 'Unknown'))
+
+    def merge(self, other):
+        """Add the sketches of another monitor of the same model into this one"""
+        with self._lock:
+            self.postings += other.postings
+            self.known_scams += other.known_scams
+            self.words += other.words
+            self.oov_terms.merge(other.oov_terms)
+            self.oov_rates.merge(other.oov_rates)
+            for name, histogram in self.probabilities.items():
+                histogram.merge(other.probabilities[name])
+            self.confidence.merge(other.confidence)
+            for field, counter in self.categories.items():
+                counter.merge(other.categories[field])
+
+    def take(self):
+        """
+        Copy the sketches and reset them (to send the changes since the last call)
+
+        Returns:
+            DriftMonitor with the postings added since the previous take
+        """
+        with self._lock:
+            snapshot = copy.copy(self)
+            empty = DriftMonitor(self.model_names, {field: counter.categories
+                                                     for field, counter in self.categories.items()},
+                                 self.reference, self.top_k)
+            for name in ('postings', 'known_scams', 'words', 'oov_terms', 'oov_rates', 'probabilities', 'confidence',
+                         'categories'):
+                setattr(self, name, getattr(empty, name))
+        return snapshot
+
+    def report(self, top_categories=5):
+        """
+        Drift summary for the drift endpoint
+
+        Args:
+            top_categories: Number of most frequent values listed per field
+
+        Returns:
+            Dictionary with the number of postings (and of known scam matches
+            among them), the out-of-vocabulary rates and top terms, the score
+            quantiles per model and for the ensemble, and the value shares and
+            population stability index of each categorical field
+        """
+        with self._lock:
+            oov_total = self.oov_terms.total
+            report = {
+                'postings': self.postings,
+                'known_scams': self.known_scams,
+                'oov': {
+                    'rate': oov_total / self.words if self.words else None,
+                    'training_rate': self.reference.get('oov_rate'),
+                    'per_posting': self.oov_rates.summary(),
+                    'top_terms': [
+                        {'term': term, 'count': count, 'rate': count / self.words}
+                        for term, count in self.oov_terms.top()
+                    ]
+                },
+                'probabilities': {name: dict(histogram.summary(), above_half=histogram.fraction_above(0.5))
+                                  for name, histogram in self.probabilities.items()},
+                'confidence_score': self.confidence.summary(),
+                'categories': {}
+            }
+
+            reference_categories = self.reference.get('categories', {})
+            for field, counter in self.categories.items():
+                shares, other_share = counter.frequencies()
+                top = np.argsort(-shares, kind='stable')[:top_categories]
+                field_report = {
+                    'top': [{'value': counter.categories[i], 'share': float(shares[i])}
+                            for i in top if shares[i] > 0],
+                    'unseen_share': other_share,
+                    'psi': None
+                }
+                if field in reference_categories and counter.counts.sum():
+                    expected = [reference_categories[field].get(value, 0.0) for value in counter.categories]
+                    field_report['psi'] = population_stability_index(list(shares) + [other_share],
+                                                                     expected + [0.0])
+                report['categories'][field] = field_report
+        return report
@@ -4,6 +4,49 @@ Feature extraction utilities for fake job detection
 
 import re
 
+from utils.reputation import PERSONAL_EMAIL_DOMAINS
+
+SALARY_KEYWORDS = ['salary', 'compensation', 'pay', 'wage', 'stipend', 'remuneration']
+
+PERSONAL_INFO_KEYWORDS = [
+    'ssn', 'social security', 'bank account', 'credit card',
+    'passport', 'driver license', 'driver\'s license', 'identity card',
+    'birth certificate', 'date of birth', 'mother\'s maiden name',
+    'tax id', 'personal documents'
+]
+
+# Each pattern starts with a single character class so the regex engine can
+# skip ahead to candidate positions; the lookbehinds restore the alternatives:
+# $50,000 / 50k / 50,000 per year / 40,000 - 50,000
+SPECIFIC_SALARY_RE = re.compile(
+    r'[$\d](?:(?<=\$)\s*\d+[\d,.]*'
+    r'|(?<=\d)\d*\s*k'
+    r'|(?<=\d)[\d,.]*\s*per\s*(?:hour|year|month|week|annum)'
+    r'|(?<=\d)[\d,.]*\s*-\s*\d+[\d,.]*)'
+)
+# (123) 456-7890 / 123-456-7890 or 1234567890 / +1 123-456-7890
+PHONE_RE = re.compile(
+    r'[(\d+](?:(?<=\()\d{3}\)\s*\d{3}[-.]?\d{4}'
+    r'|(?<=\d)\d{2}[-.]?\d{3}[-.]?\d{4}'
+    r'|(?<=\+)\d{1,3}\s*\d{3}[-.]?\d{3}[-.]?\d{4})'
+)
+EMAIL_RE = re.compile(r'[\w.-]+@[\w.-]+\.\w+')
+
+def personal_email_pattern(domains):
+    """
+    Regex matching an email address at one of the given domains
+
+    The domain must end the address, so '@gmail.com' does not match inside
+    '@gmail.com.evil.net' or '@gmail.company'.
+
+    Args:
+        domains: Personal email domains
+
+    Returns:
+        Compiled regex
+    """
+    return re.compile('@(?:' + '|'.join(re.escape(domain) for domain in domains) + r')\b(?!\.\w)')
+
 class FeatureExtractor:
     """Extract additional features from job postings"""
     
@@ -30,10 +73,8 @@ class FeatureExtractor:
         ]
         
         # Common personal email domains
-        self.personal_email_domains = [
-            'gmail.com', 'yahoo.com', 'hotmail.com',
-            'outlook.com', 'aol.com', 'mail.com'
-        ]
+        self.personal_email_domains = list(PERSONAL_EMAIL_DOMAINS)
+        self.personal_email_re = personal_email_pattern(self.personal_email_domains)
     
     def extract_features(self, job_data):
         """
@@ -115,38 +156,22 @@ class FeatureExtractor:
     
     def _has_personal_email(self, text):
         """Check if the text contains personal email domains"""
-        for domain in self.personal_email_domains:
-            if f'@{domain}' in text:
-                return 1
-        return 0
+        return int(bool(self.personal_email_re.search(text)))
     
     def _count_emails(self, text):
         """Count email addresses in the text"""
-        emails = re.findall(r'[\w.-]+@[\w.-]+\.\w+', text)
-        return len(emails)
+        return len(EMAIL_RE.findall(text))
     
     def _has_salary_information(self, text):
         """Check if the text mentions salary"""
-        salary_keywords = ['salary', 'compensation', 'pay', 'wage', 'stipend', 'remuneration']
-        for keyword in salary_keywords:
+        for keyword in SALARY_KEYWORDS:
             if keyword in text:
                 return 1
         return 0
     
     def _has_specific_salary(self, text):
         """Check if the text contains specific salary amounts"""
-        # Look for currency symbols followed by numbers
-        currency_patterns = [
-            r'\$\s*\d+[\d,.]*',  # $50,000 or $50000 or $ 50,000
-            r'\d+\s*k',          # 50k
-            r'\d+[\d,.]*\s*per\s*(hour|year|month|week|annum)',  # 50,000 per year
-            r'\d+[\d,.]*\s*-\s*\d+[\d,.]*',  # 40,000 - 50,000
-        ]
-        
-        for pattern in currency_patterns:
-            if re.search(pattern, text):
-                return 1
-        return 0
+        return int(bool(SPECIFIC_SALARY_RE.search(text)))
     
     def _has_company_website(self, text):
         """Check if the text contains a company website"""
@@ -163,16 +188,7 @@ class FeatureExtractor:
     
     def _has_phone_number(self, text):
         """Check if the text contains a phone number"""
-        phone_patterns = [
-            r'\(\d{3}\)\s*\d{3}[-.]?\d{4}',  # (123) 456-7890
-            r'\d{3}[-.]?\d{3}[-.]?\d{4}',    # 123-456-7890 or 1234567890
-            r'\+\d{1,3}\s*\d{3}[-.]?\d{3}[-.]?\d{4}'  # +1 123-456-7890
-        ]
-        
-        for pattern in phone_patterns:
-            if re.search(pattern, text):
-                return 1
-        return 0
+        return int(bool(PHONE_RE.search(text)))
     
     def _has_address(self, text):
         """Check if the text contains an address"""
@@ -196,14 +212,7 @@ class FeatureExtractor:
     
     def _requests_personal_info(self, text):
         """Check if the text requests personal information"""
-        personal_info_keywords = [
-            'ssn', 'social security', 'bank account', 'credit card',
-            'passport', 'driver license', 'driver\'s license', 'identity card',
-            'birth certificate', 'date of birth', 'mother\'s maiden name',
-            'tax id', 'personal documents'
-        ]
-        
-        for keyword in personal_info_keywords:
+        for keyword in PERSONAL_INFO_KEYWORDS:
             if keyword in text:
                 return 1
         return 0
\ No newline at end of file
@@ -0,0 +1,115 @@
+"""
+Per-host failure tracking with a circuit breaker
+"""
+
+import time
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+class HostUnavailableError(Exception):
+    """Raised instead of contacting a host whose circuit is open"""
+
+class HostCircuitBreaker:
+    """
+    Fail fast for hosts that keep failing, and probe them periodically
+
+    A host's circuit opens after failure_threshold consecutive failures.
+    While open, calls are refused without touching the network. Once
+    reset_timeout seconds have passed, a single call is let through as a
+    probe (half-open); its success closes the circuit and its failure opens
+    it again for another reset_timeout. Other calls are refused while the
+    probe is in flight.
+
+    Only hosts with recent failures are tracked (a success forgets the host),
+    so memory is bounded by the number of failing hosts. Thread-safe.
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        """
+        Args:
+            failure_threshold: Consecutive failures that open a host's circuit
+            reset_timeout: Seconds an open circuit refuses calls before a probe
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+
+        self._lock = threading.Lock()
+        # Host -> {'failures', 'opened_at', 'probing', 'rejected'}
+        self._hosts = {}
+
+        self.rejected = 0
+        self.opened = 0
+
+    def allow(self, host):
+        """
+        Check whether a call to a host may go ahead
+
+        Args:
+            host: Host name
+
+        Returns:
+            True if the circuit is closed, or if this call is the half-open probe
+        """
+        with self._lock:
+            entry = self._hosts.get(host)
+            if entry is None or entry['opened_at'] is None:
+                return True
+            if not entry['probing'] and time.monotonic() - entry['opened_at'] >= self.reset_timeout:
+                entry['probing'] = True
+                return True
+            entry['rejected'] += 1
+            self.rejected += 1
+            return False
+
+    def record_success(self, host):
+        """Close the host's circuit and forget its failures"""
+        with self._lock:
+            entry = self._hosts.pop(host, None)
+        if entry is not None and entry['opened_at'] is not None:
+            logger.info(f"Circuit for {host} closed")
+
+    def record_failure(self, host):
+        """Count a failure, opening the host's circuit at the threshold or after a failed probe"""
+        with self._lock:
+            entry = self._hosts.setdefault(host, {'failures': 0, 'opened_at': None, 'probing': False, 'rejected': 0})
+            entry['failures'] += 1
+            if entry['probing'] or (entry['opened_at'] is None and entry['failures'] >= self.failure_threshold):
+                if entry['opened_at'] is None:
+                    self.opened += 1
+                    logger.warning(f"Circuit for {host} opened after {entry['failures']} consecutive failures")
+                entry['opened_at'] = time.monotonic()
+                entry['probing'] = False
+
+    def state(self, host):
+        """
+        Current state of a host's circuit
+
+        Returns:
+            'closed', 'open' or 'half_open'
+        """
+        with self._lock:
+            entry = self._hosts.get(host)
+            if entry is None or entry['opened_at'] is None:
+                return 'closed'
+            return 'half_open' if entry['probing'] else 'open'
+
+    def stats(self):
+        """
+        Counters for the metrics endpoint
+
+        Returns:
+            Dictionary with the number of circuits opened and calls refused, and
+            the state, consecutive failures and refused calls of each failing host
+        """
+        with self._lock:
+            hosts = {
+                host: {
+                    'state': 'closed' if entry['opened_at'] is None else ('half_open' if entry['probing'] else 'open'),
+                    'failures': entry['failures'],
+                    'rejected': entry['rejected']
+                }
+                for host, entry in self._hosts.items()
+            }
+        return {'opened': self.opened, 'rejected': self.rejected, 'hosts': hosts}
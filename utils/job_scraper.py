@@ -3,16 +3,179 @@ Job scraper utilities for fake job detection
 """
 
 import re
+import time
+import random
+import codecs
+import urllib3
 import requests
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
 from bs4 import BeautifulSoup
 import logging
 
+from utils.host_health import HostCircuitBreaker, HostUnavailableError
+
 logger = logging.getLogger(__name__)
 
+# Query parameters that only track where a link was shared
+TRACKING_PARAMETER_PREFIXES = ('utm_', 'mc_')
+TRACKING_PARAMETERS = {'fbclid', 'gclid', 'ref', 'refid', 'trk', 'trackingid'}
+
+def normalize_job_url(url):
+    """
+    Canonical form of a posting URL, so shared links to the same page compare equal
+    
+    Lowercases the scheme and host, drops default ports, fragments, trailing
+    slashes and tracking parameters, and sorts the remaining query parameters.
+    
+    Args:
+        url: URL of the job posting
+        
+    Returns:
+        Normalized URL
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    if parts.port and (scheme, parts.port) not in (('http', 80), ('https', 443)):
+        host = f"{host}:{parts.port}"
+    
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_PARAMETERS and not key.lower().startswith(TRACKING_PARAMETER_PREFIXES)
+    )
+    return urlunsplit((scheme, host, parts.path.rstrip('/') or '/', urlencode(query), ''))
+
+# Browser-like request headers; some boards refuse unknown clients
+REQUEST_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+}
+
+class MarkupFilter:
+    """
+    Drop script, style and comment blocks from HTML as it streams in
+    
+    None of them contribute to the extracted text, but inline scripts are
+    often most of a page's bytes. Text is fed chunk by chunk; a tag split
+    across chunks is held back until the next chunk completes it.
+    """
+    
+    OPEN = re.compile(r'<(?:(script|style)(?=[\s/>])|(!--))', re.IGNORECASE)
+    CLOSE = {
+        'script': re.compile(r'</script\s*>', re.IGNORECASE),
+        'style': re.compile(r'</style\s*>', re.IGNORECASE),
+        '!--': re.compile(r'-->')
+    }
+    # Longest closing tag we expect to see split across two chunks
+    HOLD_BACK = 32
+    
+    def __init__(self):
+        self._pending = ''
+        self._skipping = None
+    
+    def feed(self, text):
+        """
+        Filter the next chunk of HTML
+        
+        Args:
+            text: Decoded chunk
+            
+        Returns:
+            The part of the HTML that can be passed on so far
+        """
+        text = self._pending + text
+        self._pending = ''
+        kept = []
+        pos = 0
+        
+        while True:
+            if self._skipping is not None:
+                match = self.CLOSE[self._skipping].search(text, pos)
+                if match is None:
+                    self._pending = text[max(pos, len(text) - self.HOLD_BACK):]
+                    return ''.join(kept)
+                self._skipping = None
+                pos = match.end()
+                continue
+            
+            match = self.OPEN.search(text, pos)
+            if match is None:
+                # Hold back a trailing '<' that may start a block
+                cut = text.rfind('<', max(pos, len(text) - self.HOLD_BACK))
+                if cut == -1:
+                    kept.append(text[pos:])
+                else:
+                    kept.append(text[pos:cut])
+                    self._pending = text[cut:]
+                return ''.join(kept)
+            
+            kept.append(text[pos:match.start()])
+            if match.group(2):
+                self._skipping = '!--'
+                pos = match.end()
+                continue
+            
+            # A self-closing <script ... /> has no body to skip
+            tag_end = text.find('>', match.end())
+            if tag_end == -1:
+                self._pending = text[match.start():]
+                return ''.join(kept)
+            if text[tag_end - 1] != '/':
+                self._skipping = match.group(1).lower()
+            pos = tag_end + 1
+    
+    def close(self):
+        """Return any held-back text once the document has ended"""
+        text, self._pending = ('' if self._skipping else self._pending), ''
+        return text
+
+def _is_host_failure(error):
+    """Whether a request error says the host is unhealthy (rather than the page missing)"""
+    if isinstance(error, requests.HTTPError) and error.response is not None:
+        status = error.response.status_code
+        return status == 429 or status >= 500
+    return True
+
 class JobScraper:
     """Scrape job postings from various job boards"""
     
-    def __init__(self):
+    def __init__(self, max_page_bytes=4 * 1024 * 1024, max_download_bytes=32 * 1024 * 1024,
+                 timeout=10, max_seconds=30, chunk_size=64 * 1024, retries=2, backoff=0.5,
+                 max_backoff=4.0, retry_budget=15.0, failure_threshold=5, reset_timeout=30.0,
+                 parser='html.parser', page_corpus=None):
+        """
+        Args:
+            max_page_bytes: Maximum characters of markup kept for parsing (after
+                scripts and styles are dropped); longer pages are truncated
+            max_download_bytes: Maximum (decompressed) bytes downloaded per page
+            timeout: Seconds to wait for the connection and for each read
+            max_seconds: Maximum seconds spent downloading a page
+            chunk_size: Maximum bytes read at a time
+            retries: Maximum retries of a page after a host failure (connection
+                error, timeout, 429 or 5xx response)
+            backoff: Base seconds of the jittered exponential backoff between retries
+            max_backoff: Maximum seconds of a single backoff
+            retry_budget: Seconds after the first attempt when no new retry is started
+            failure_threshold: Consecutive failures of a host that open its circuit
+            reset_timeout: Seconds a host's open circuit fails fast before a probe
+            parser: BeautifulSoup parser backend ('html.parser', 'lxml', 'html5lib')
+            page_corpus: Optional PageCorpus every successfully scraped page is
+                recorded into, for offline replay
+        """
+        self.max_page_bytes = max_page_bytes
+        self.max_download_bytes = max_download_bytes
+        self.timeout = timeout
+        self.max_seconds = max_seconds
+        self.chunk_size = chunk_size
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.retry_budget = retry_budget
+        self.host_health = HostCircuitBreaker(failure_threshold, reset_timeout)
+        self.parser = parser
+        self.page_corpus = page_corpus
+        
         self.job_board_selectors = {
             # Indeed
             'indeed.com': {
@@ -118,39 +281,153 @@ class JobScraper:
             Dictionary with scraped job data
         """
         try:
-            # Send a GET request to the URL
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-            }
-            response = requests.get(url, headers=headers, timeout=10)
-            response.raise_for_status()
-            
-            # Parse HTML
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            # Determine which selectors to use based on domain
-            selectors = self._get_selectors_for_url(url)
-            
-            # Extract job data
-            job_data = {
-                'title': self._extract_text(soup, selectors['title']),
-                'company': self._extract_text(soup, selectors['company']),
-                'location': self._extract_text(soup, selectors['location']),
-                'description': self._extract_text(soup, selectors['description']),
-                'requirements': self._extract_text(soup, selectors.get('requirements', [])),
-                'benefits': self._extract_text(soup, selectors.get('benefits', [])),
-                'company_profile': self._extract_text(soup, selectors.get('company_profile', [])),
-                'job_type': self._extract_text(soup, selectors.get('job_type', [])),
-                'url': url,
-                'contact_info': self._extract_contact_info(soup)
-            }
-            
+            html = self._fetch_with_retries(url)
+            job_data = self.parse_job_posting(html, url)
+            if self.page_corpus is not None:
+                self.page_corpus.record(url, html, job_data)
             return job_data
             
         except Exception as e:
             logger.error(f"Error scraping job posting from {url}: {str(e)}")
             return None
     
+    def parse_job_posting(self, html, url):
+        """
+        Extract job data from the HTML of a posting
+        
+        Args:
+            html: Page HTML
+            url: URL of the page (selects the job board's selectors)
+            
+        Returns:
+            Dictionary with scraped job data
+        """
+        # Parse HTML
+        soup = BeautifulSoup(html, self.parser)
+        
+        # Determine which selectors to use based on domain
+        selectors = self._get_selectors_for_url(url)
+        
+        # Extract job data
+        job_data = {
+            'title': self._extract_text(soup, selectors['title']),
+            'company': self._extract_text(soup, selectors['company']),
+            'location': self._extract_text(soup, selectors['location']),
+            'description': self._extract_text(soup, selectors['description']),
+            'requirements': self._extract_text(soup, selectors.get('requirements', [])),
+            'benefits': self._extract_text(soup, selectors.get('benefits', [])),
+            'company_profile': self._extract_text(soup, selectors.get('company_profile', [])),
+            'job_type': self._extract_text(soup, selectors.get('job_type', [])),
+            'url': url,
+            'contact_info': self._extract_contact_info(soup)
+        }
+        
+        return job_data
+    
+    def _fetch_with_retries(self, url):
+        """
+        Download a page, retrying host failures with jittered exponential backoff
+        
+        Connection errors, timeouts, 429 and 5xx responses are host failures:
+        they are retried up to self.retries times, sleeping a random time up
+        to backoff * 2^attempt (capped at max_backoff) so that callers of a
+        degraded host do not retry in lockstep. No retry starts past
+        retry_budget seconds. Failures feed the host's circuit breaker, and
+        a host whose circuit is open is not contacted at all. Other errors
+        (e.g. 404) mean the host is up and are not retried.
+        
+        Args:
+            url: URL of the page
+            
+        Returns:
+            Filtered page HTML
+            
+        Raises:
+            HostUnavailableError: If the host's circuit is open
+            requests.RequestException: If the last attempt failed (or
+                urllib3.exceptions.HTTPError while reading the body)
+        """
+        host = (urlsplit(url).hostname or '').lower()
+        if not self.host_health.allow(host):
+            raise HostUnavailableError(f"{host} is failing, not contacting it for now")
+        
+        started = time.monotonic()
+        for attempt in range(self.retries + 1):
+            try:
+                html = self._fetch(url)
+            # Reads of the body raise urllib3's errors (e.g. ReadTimeoutError) unwrapped
+            except (requests.RequestException, urllib3.exceptions.HTTPError) as e:
+                if not _is_host_failure(e):
+                    self.host_health.record_success(host)
+                    raise
+                self.host_health.record_failure(host)
+                
+                delay = random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+                if (attempt == self.retries or time.monotonic() + delay - started > self.retry_budget
+                        or not self.host_health.allow(host)):
+                    raise
+                logger.warning(f"Retrying {url} in {delay:.2f}s after: {str(e)}")
+                time.sleep(delay)
+            except Exception:
+                # The host answered; the page itself could not be handled
+                self.host_health.record_success(host)
+                raise
+            else:
+                self.host_health.record_success(host)
+                return html
+    
+    def _fetch(self, url):
+        """
+        Download a page as a stream, decoding and filtering it chunk by chunk
+        
+        Script, style and comment blocks are dropped as they arrive, so only
+        the markup that will be parsed is kept in memory, up to max_page_bytes.
+        At most max_download_bytes are read (counted after decompression, so
+        a compressed bomb is capped too) and the download stops after
+        max_seconds; each read returns as soon as some data has arrived, so a
+        server trickling bytes cannot hold it for long.
+        
+        Args:
+            url: URL of the page
+            
+        Returns:
+            Filtered page HTML
+        """
+        deadline = time.monotonic() + self.max_seconds
+        
+        with requests.get(url, headers=REQUEST_HEADERS, timeout=self.timeout, stream=True) as response:
+            response.raise_for_status()
+            
+            # Without an explicit charset, pages are overwhelmingly UTF-8
+            encoding = response.encoding if 'charset' in response.headers.get('Content-Type', '').lower() else 'utf-8'
+            try:
+                decoder = codecs.getincrementaldecoder(encoding)(errors='replace')
+            except LookupError:
+                decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+            markup_filter = MarkupFilter()
+            
+            read = getattr(response.raw, 'read1', response.raw.read)
+            parts = []
+            received = kept = 0
+            while True:
+                if received >= self.max_download_bytes or kept >= self.max_page_bytes:
+                    logger.warning(f"Truncated {url} after {received} bytes")
+                    break
+                if time.monotonic() > deadline:
+                    logger.warning(f"Stopped downloading {url} after {self.max_seconds}s")
+                    break
+                chunk = read(min(self.chunk_size, self.max_download_bytes - received), decode_content=True)
+                if not chunk:
+                    break
+                received += len(chunk)
+                parts.append(markup_filter.feed(decoder.decode(chunk)))
+                kept += len(parts[-1])
+            
+            parts.append(markup_filter.feed(decoder.decode(b'', final=True)))
+            parts.append(markup_filter.close())
+        
+        return ''.join(parts)[:self.max_page_bytes]
+    
     def _get_selectors_for_url(self, url):
         """Get the appropriate selectors for a given URL"""
         for domain, selectors in self.job_board_selectors.items():
@@ -182,13 +459,15 @@ class JobScraper:
             """Extract contact information from the page"""
             page_text = soup.get_text()
             
-            # Extract email addresses
-            email_regex = r'[\w.-]+@[\w.-]+\.\w+'
+            # Extract email addresses; matches only start at the beginning of a
+            # run of address characters, so a long run without an '@' is
+            # scanned once instead of once per character
+            email_regex = r'(?<![\w.-])[\w.-]+@[\w.-]+\.\w+'
             emails = re.findall(email_regex, page_text)
             
-            # Extract phone numbers
-            phone_regex = r'(\+\d{1,3})?[\s.-]?\(?\d{3}\)?[\s.-]?\d{3}[\s.-]?\d{4}'
-            phones = re.findall(phone_regex, page_text)
+            # Extract phone numbers (whole matches, not just the country code group)
+            phone_regex = r'(?:\+\d{1,3})?[\s.-]?\(?\d{3}\)?[\s.-]?\d{3}[\s.-]?\d{4}'
+            phones = [phone.strip() for phone in re.findall(phone_regex, page_text)]
             
             # Combine contact information
             contact_info = {
@@ -0,0 +1,112 @@
+"""
+Frozen token normalization table for serving without WordNet
+"""
+
+import re
+
+# Noun inflections undone by WordNet's morphy (suffix -> base), i.e. what
+# WordNetLemmatizer.lemmatize does with its default part of speech
+NOUN_SUBSTITUTIONS = (
+    ('s', ''), ('ses', 's'), ('ves', 'f'), ('xes', 'x'), ('zes', 'z'),
+    ('ches', 'ch'), ('shes', 'sh'), ('men', 'man'), ('ies', 'y')
+)
+
+# Words the Treebank tokenizer splits even without punctuation (its
+# apostrophe-free contractions); cleaned text contains no other split points
+CONTRACTED_WORDS = ('cannot', 'gimme', 'gonna', 'gotta', 'lemme', 'wanna')
+
+_WORD = re.compile(r'^[a-z0-9]+$')
+
+class LemmaTable:
+    """
+    Map cleaned surface tokens to their lemmas with dictionary lookups
+
+    Text cleaning lemmatizes every token with WordNetLemmatizer, which loads
+    the whole WordNet corpus. Only tokens that can reach the TF-IDF features
+    matter, though, and the lemmatizer is a fixed function of the token, so
+    training freezes it into a table:
+
+    - every surface form whose lemma is a vocabulary word (inverting the
+      morphy suffix rules and exception list, then checking each candidate
+      with the real lemmatizer);
+    - vocabulary words, TF-IDF stop words and single characters that do not
+      lemmatize to themselves, since dropping or keeping them changes which
+      tokens end up adjacent in bigrams.
+
+    Any other token lemmatizes either to itself or to a word that is neither in
+    the vocabulary nor removed by the vectorizer, so the identity fallback
+    produces the same TF-IDF vector.
+    """
+
+    def __init__(self, lemmas, stop_words, splits):
+        """
+        Args:
+            lemmas: Dictionary of surface token -> lemma (only tokens that change)
+            stop_words: Stopwords removed before lemmatization
+            splits: Dictionary of word -> tokens for words the tokenizer splits
+        """
+        self.lemmas = lemmas
+        self.stop_words = frozenset(stop_words)
+        self.splits = splits
+
+    @classmethod
+    def build(cls, vocabulary, lemmatize, stop_words, tokenize, removed_words=(), exceptions=()):
+        """
+        Freeze the lemmatizer for the tokens that can affect the TF-IDF features
+
+        Args:
+            vocabulary: TF-IDF feature names (n-grams)
+            lemmatize: Lemmatizer function (token -> lemma)
+            stop_words: Stopwords removed before lemmatization
+            tokenize: Tokenizer function used for training (text -> tokens)
+            removed_words: Words the vectorizer drops (its stop word list)
+            exceptions: Irregular plural surface forms from WordNet's noun exception list
+
+        Returns:
+            LemmaTable
+        """
+        targets = {token for phrase in vocabulary for token in phrase.split()}
+        targets.update(removed_words)
+        targets.update('abcdefghijklmnopqrstuvwxyz0123456789')
+
+        candidates = set(targets)
+        for lemma in targets:
+            for suffix, base in NOUN_SUBSTITUTIONS:
+                if lemma.endswith(base):
+                    candidates.add(lemma[:len(lemma) - len(base)] + suffix)
+        candidates.update(exceptions)
+
+        lemmas = {}
+        for token in candidates:
+            if token in stop_words or not _WORD.match(token):
+                continue
+            lemma = lemmatize(token)
+            if lemma != token and (lemma in targets or token in targets):
+                lemmas[token] = lemma
+
+        splits = {}
+        for word in CONTRACTED_WORDS:
+            tokens = tokenize(word + ' ' + word)
+            tokens = tokens[:len(tokens) // 2]
+            if tokens != [word]:
+                splits[word] = tuple(tokens)
+
+        return cls(lemmas, stop_words, splits)
+
+    def normalize(self, text):
+        """
+        Tokenize, remove stopwords and lemmatize cleaned text
+
+        Args:
+            text: Lowercased alphanumeric text with single spaces
+
+        Returns:
+            Normalized text
+        """
+        lemmas, stop_words, splits = self.lemmas, self.stop_words, self.splits
+        normalized = []
+        for word in text.split():
+            for token in splits.get(word, (word,)):
+                if token not in stop_words:
+                    normalized.append(lemmas.get(token, token))
+        return ' '.join(normalized)
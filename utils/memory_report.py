@@ -0,0 +1,344 @@
+"""
+Memory footprint of the serving stack, per import, per artifact and per request
+"""
+
+import gc
+import os
+import sys
+import json
+import time
+import pickle
+import importlib
+import tracemalloc
+
+# Modules imported by a serving worker, heaviest dependencies first
+SERVING_IMPORTS = [
+    'numpy', 'scipy.sparse', 'pandas', 'sklearn', 'sklearn.feature_extraction.text',
+    'sklearn.linear_model', 'sklearn.svm', 'sklearn.ensemble', 'sklearn.neural_network',
+    'nltk', 'flask', 'models.ensemble_model', 'ui.app'
+]
+
+# Preprocessor attributes attributed separately
+PREPROCESSOR_COMPONENTS = ['tfidf_vectorizer', 'onehot_encoder', 'ordinal_encoder',
+                           'signal_extractor', 'lemma_table', 'record_encoder', 'drift_reference']
+
+# Job posting fields passed to the models when replaying a CSV workload
+WORKLOAD_FIELDS = ['title', 'company_profile', 'description', 'requirements', 'benefits',
+                   'employment_type', 'required_experience', 'industry', 'function', 'location']
+
+def current_rss():
+    """
+    Resident set size of this process in bytes
+
+    Reads /proc on Linux; elsewhere falls back to the peak RSS, which still
+    bounds the growth of a single measurement from above.
+    """
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux reports kilobytes, macOS bytes
+        return peak if sys.platform == 'darwin' else peak * 1024
+
+class MemoryProfiler:
+    """
+    Attribute the memory of a serving worker to imports, artifacts and requests
+
+    Allocations are measured twice: tracemalloc counts the bytes allocated
+    through Python's allocators (including numpy and scipy arrays), and the
+    RSS delta shows what the process actually took from the OS, which also
+    includes native libraries and allocator overhead.
+
+    The profile runs in four steps:
+
+    1. Import the serving modules one at a time (each delta is incremental
+       over the modules imported before it).
+    2. Load the ensemble and preprocessor exactly as a worker does.
+    3. Attribute the loaded stack to its artifacts by deserializing a copy
+       of each one (models, preprocessor components, explainer, indexes)
+       and measuring what the copy allocates.
+    4. Replay a workload of postings to measure per-request allocations and
+       whether retained memory keeps growing after warm-up.
+
+    Run it in a fresh process (python main.py --mode profile) so that the
+    import measurements are meaningful.
+    """
+
+    def __init__(self, model_dir='models', top_sites=10):
+        """
+        Args:
+            model_dir: Directory with the trained model artifacts
+            top_sites: Number of allocation sites listed for memory growth
+        """
+        self.model_dir = model_dir
+        self.top_sites = top_sites
+        self.ensemble = None
+
+    def run(self, workload, warmup=20):
+        """
+        Profile the serving stack
+
+        Args:
+            workload: List of job posting dictionaries to replay
+            warmup: Number of leading requests excluded from growth estimates
+
+        Returns:
+            Dictionary with the memory report
+        """
+        tracemalloc.start()
+        rss_start = current_rss()
+
+        imports = self.profile_imports()
+        stack = self.profile_stack()
+        artifacts = self.profile_artifacts()
+        workload_report = self.replay_workload(workload, warmup=warmup)
+
+        traced, traced_peak = tracemalloc.get_traced_memory()
+        # tracemalloc's own bookkeeping is part of the RSS measurements
+        overhead = tracemalloc.get_tracemalloc_memory()
+        tracemalloc.stop()
+
+        return {
+            'model_dir': os.path.abspath(self.model_dir),
+            'python': sys.version.split()[0],
+            'imports': imports,
+            'stack': stack,
+            'artifacts': artifacts,
+            'workload': workload_report,
+            'totals': {
+                'rss_start_bytes': rss_start,
+                'rss_end_bytes': current_rss(),
+                'traced_bytes': traced,
+                'traced_peak_bytes': traced_peak,
+                'tracemalloc_overhead_bytes': overhead
+            }
+        }
+
+    def profile_imports(self):
+        """Measure each serving import, in order"""
+        results = []
+        for module in SERVING_IMPORTS:
+            already_loaded = module in sys.modules
+            usage = self._measure(lambda: importlib.import_module(module))
+            results.append({'module': module, 'already_loaded': already_loaded, **usage})
+        return results
+
+    def profile_stack(self):
+        """Load the ensemble and preprocessor as a serving worker does"""
+        from models.ensemble_model import EnsembleModel
+
+        self.ensemble = EnsembleModel()
+        models = self._measure(lambda: self.ensemble.load_models(self.model_dir))
+        preprocessor = self._measure(lambda: self.ensemble.load_preprocessor(
+            os.path.join(self.model_dir, 'preprocessor.pkl')))
+
+        return {
+            'load_models': models,
+            'load_preprocessor': preprocessor,
+            'wordnet_loaded': self._wordnet_loaded()
+        }
+
+    def profile_artifacts(self):
+        """Attribute the loaded stack to its artifacts"""
+        ensemble = self.ensemble
+        artifacts = []
+
+        for name, model in ensemble.models.items():
+            path = os.path.join(self.model_dir, f"{name}_model.pkl")
+            artifacts.append(self._artifact(f"{name}_model", model.model, path))
+
+        for name in PREPROCESSOR_COMPONENTS:
+            component = getattr(ensemble.preprocessor, name, None)
+            if component is not None:
+                artifacts.append(self._artifact(f"preprocessor.{name}", component))
+
+        for name, component, filename in [
+            ('coefficient_explainer', ensemble.explainer, 'coefficient_explainer.pkl'),
+            ('near_duplicate_index', ensemble.duplicate_index, 'near_duplicate_index.pkl'),
+            ('reputation_index', ensemble.reputation, None)
+        ]:
+            if component is not None:
+                path = os.path.join(self.model_dir, filename) if filename else None
+                artifacts.append(self._artifact(name, component, path))
+
+        return sorted(artifacts, key=lambda artifact: artifact['traced_bytes'], reverse=True)
+
+    def replay_workload(self, workload, warmup=20):
+        """
+        Predict each posting and record what it allocates and retains
+
+        Args:
+            workload: List of job posting dictionaries
+            warmup: Number of leading requests excluded from growth estimates
+
+        Returns:
+            Dictionary with per-request statistics, growth after warm-up and
+            the allocation sites that grew the most
+        """
+        import numpy as np
+
+        warmup = min(warmup, max(len(workload) - 1, 0))
+        retained, peaks, latencies, traced_after = [], [], [], []
+        rss_after_warmup = current_rss()
+        snapshot_after_warmup = None
+
+        for i, job_data in enumerate(workload):
+            if i == warmup:
+                gc.collect()
+                snapshot_after_warmup = tracemalloc.take_snapshot()
+                rss_after_warmup = current_rss()
+
+            tracemalloc.reset_peak()
+            before, _ = tracemalloc.get_traced_memory()
+            start = time.perf_counter()
+            self.ensemble.predict(job_data)
+            latencies.append(time.perf_counter() - start)
+            after, peak = tracemalloc.get_traced_memory()
+
+            retained.append(after - before)
+            peaks.append(peak - before)
+            traced_after.append(after)
+
+        gc.collect()
+        report = {
+            'requests': len(workload),
+            'warmup_requests': warmup,
+            'peak_bytes_per_request': self._distribution(peaks),
+            'retained_bytes_per_request': self._distribution(retained),
+            'latency_ms': self._distribution([seconds * 1000 for seconds in latencies]),
+            'rss_growth_after_warmup_bytes': current_rss() - rss_after_warmup,
+            'wordnet_loaded': self._wordnet_loaded()
+        }
+
+        # Slope of retained memory over steady-state requests: ~0 unless something leaks
+        steady = np.array(traced_after[warmup:], dtype=float)
+        if len(steady) > 1:
+            report['traced_growth_bytes_per_request'] = float(np.polyfit(np.arange(len(steady)), steady, 1)[0])
+
+        if snapshot_after_warmup is not None:
+            growth = tracemalloc.take_snapshot().compare_to(snapshot_after_warmup, 'lineno')
+            report['top_growth_sites'] = [
+                {'site': str(stat.traceback), 'size_diff_bytes': stat.size_diff, 'count_diff': stat.count_diff}
+                for stat in growth[:self.top_sites] if stat.size_diff > 0
+            ]
+
+        return report
+
+    def _artifact(self, name, component, path=None):
+        """Measure a deserialized copy of an artifact"""
+        payload = pickle.dumps(component, protocol=pickle.HIGHEST_PROTOCOL)
+        gc.collect()
+
+        copies = []
+        usage = self._measure(lambda: copies.append(pickle.loads(payload)))
+        del copies
+        gc.collect()
+
+        artifact = {'artifact': name, 'pickled_bytes': len(payload), **usage}
+        if path is not None and os.path.exists(path):
+            artifact['file_bytes'] = os.path.getsize(path)
+        return artifact
+
+    def _measure(self, load):
+        """Run a load step and return the memory it added"""
+        gc.collect()
+        rss_before = current_rss()
+        traced_before, _ = tracemalloc.get_traced_memory()
+        start = time.perf_counter()
+        load()
+        seconds = time.perf_counter() - start
+        traced_after, _ = tracemalloc.get_traced_memory()
+        return {
+            'traced_bytes': traced_after - traced_before,
+            'rss_bytes': current_rss() - rss_before,
+            'seconds': seconds
+        }
+
+    def _distribution(self, values):
+        """Median, 95th percentile and maximum of a measurement"""
+        import numpy as np
+
+        if not values:
+            return {}
+        values = np.asarray(values, dtype=float)
+        return {
+            'median': float(np.median(values)),
+            'p95': float(np.percentile(values, 95)),
+            'max': float(values.max())
+        }
+
+    def _wordnet_loaded(self):
+        """Whether the WordNet corpus has been read into memory"""
+        corpus = sys.modules.get('nltk.corpus')
+        return corpus is not None and type(corpus.wordnet).__name__ != 'LazyCorpusLoader'
+
+def load_workload(data_path=None, requests=200, seed=42):
+    """
+    Build a replay workload of job postings
+
+    Args:
+        data_path: CSV file of postings (same columns as the dataset); the
+            registry's smoke test posting is repeated if not given
+        requests: Number of postings to replay
+        seed: Random seed for sampling rows
+
+    Returns:
+        List of job posting dictionaries
+    """
+    if data_path is None or not os.path.exists(data_path):
+        from models.model_registry import SMOKE_TEST_JOB
+        return [dict(SMOKE_TEST_JOB, title=f"{SMOKE_TEST_JOB['title']} {i}") for i in range(requests)]
+
+    import pandas as pd
+
+    df = pd.read_csv(data_path, dtype=str, keep_default_na=False)
+    df = df.sample(n=requests, replace=len(df) < requests, random_state=seed)
+    fields = [field for field in WORKLOAD_FIELDS if field in df.columns]
+    return [
+        {**{field: row[field] for field in fields}, 'contact_info': {'emails': [], 'phones': []}}
+        for _, row in df.iterrows()
+    ]
+
+def print_report(report):
+    """Print the memory report as tables"""
+    mb = 1024 * 1024
+
+    print(f"{'import':<34} {'traced MB':>10} {'RSS MB':>10} {'seconds':>8}")
+    for entry in report['imports']:
+        print(f"{entry['module']:<34} {entry['traced_bytes'] / mb:>10.1f} "
+              f"{entry['rss_bytes'] / mb:>10.1f} {entry['seconds']:>8.3f}")
+
+    print(f"\n{'load step':<34} {'traced MB':>10} {'RSS MB':>10} {'seconds':>8}")
+    for step in ('load_models', 'load_preprocessor'):
+        entry = report['stack'][step]
+        print(f"{step:<34} {entry['traced_bytes'] / mb:>10.1f} "
+              f"{entry['rss_bytes'] / mb:>10.1f} {entry['seconds']:>8.3f}")
+
+    print(f"\n{'artifact':<34} {'traced MB':>10} {'RSS MB':>10} {'pickle MB':>10}")
+    for entry in report['artifacts']:
+        print(f"{entry['artifact']:<34} {entry['traced_bytes'] / mb:>10.2f} "
+              f"{entry['rss_bytes'] / mb:>10.2f} {entry['pickled_bytes'] / mb:>10.2f}")
+
+    workload = report['workload']
+    print(f"\nReplayed {workload['requests']} requests ({workload['warmup_requests']} warm-up)")
+    print(f"  peak allocation per request: {workload['peak_bytes_per_request'].get('median', 0) / 1024:.0f} KB median, "
+          f"{workload['peak_bytes_per_request'].get('p95', 0) / 1024:.0f} KB p95")
+    print(f"  retained growth after warm-up: {workload.get('traced_growth_bytes_per_request', 0):.0f} bytes/request, "
+          f"RSS {workload['rss_growth_after_warmup_bytes'] / mb:+.1f} MB")
+    print(f"  WordNet loaded: {workload['wordnet_loaded']}")
+    totals = report['totals']
+    print(f"\nRSS: {totals['rss_start_bytes'] / mb:.1f} MB -> {totals['rss_end_bytes'] / mb:.1f} MB "
+          f"(including {totals['tracemalloc_overhead_bytes'] / mb:.1f} MB of tracemalloc bookkeeping)")
+
+def profile_memory(model_dir='models', data_path=None, requests=200, output_path='memory_profile.json'):
+    """Profile the serving stack and write the JSON report"""
+    profiler = MemoryProfiler(model_dir)
+    report = profiler.run(load_workload(data_path, requests))
+    print_report(report)
+
+    with open(output_path, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Report written to {output_path}")
+    return report
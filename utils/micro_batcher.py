@@ -0,0 +1,148 @@
+"""
+Adaptive micro-batching of concurrent asynchronous calls
+"""
+
+import time
+import asyncio
+
+class MicroBatcher:
+    """
+    Collect concurrent single-item calls into batches
+
+    Items wait while every batch slot is busy, so under load batches grow to
+    whatever arrived during the previous batch, up to max_batch_size. When a
+    slot is free, the batch is sent after a short window that adapts to the
+    arrival rate: the time the batch would take to fill at the current rate,
+    capped at max_wait. When requests are sparse (less than one expected
+    within max_wait) the window is zero, so a lone request pays no added
+    latency.
+
+    The pending batch and its flush timer (scheduled with call_later) belong
+    to the event loop submit() is awaited on; items from another loop or
+    thread would race the flush.
+    """
+
+    def __init__(self, run_batch, max_batch_size=32, max_wait=0.005, concurrency=1, smoothing=0.2):
+        """
+        Args:
+            run_batch: Function taking a list of items and returning a
+                coroutine that computes the list of their results, in order
+            max_batch_size: Maximum number of items per batch
+            max_wait: Maximum seconds an item waits for others to join its batch
+            concurrency: Number of batches run at the same time (e.g. the
+                number of inference workers)
+            smoothing: Weight of the newest inter-arrival gap in its moving average
+        """
+        self.run_batch = run_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.concurrency = concurrency
+        self.smoothing = smoothing
+
+        self._pending = []
+        self._in_flight = 0
+        self._flush_handle = None
+        self._last_arrival = None
+        self._arrival_gap = None
+
+        self.items = 0
+        self.batches = 0
+        self.largest_batch = 0
+
+    async def submit(self, item):
+        """
+        Add an item to the next batch and wait for its result
+
+        Args:
+            item: Input passed to run_batch
+
+        Returns:
+            The result of the item
+        """
+        self._record_arrival()
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((item, future))
+
+        if self._in_flight < self.concurrency:
+            window = self.window()
+            if len(self._pending) >= self.max_batch_size or window <= 0:
+                self._flush()
+            elif self._flush_handle is None:
+                self._flush_handle = asyncio.get_running_loop().call_later(window, self._flush)
+
+        return await future
+
+    def window(self):
+        """
+        Seconds to hold a batch open for more items at the current arrival rate
+
+        Returns:
+            Time for the batch to fill, capped at max_wait; 0 when sparse
+        """
+        if self._arrival_gap is None or self._arrival_gap >= self.max_wait:
+            return 0.0
+        missing = self.max_batch_size - len(self._pending)
+        return min(self.max_wait, self._arrival_gap * missing)
+
+    def stats(self):
+        """
+        Counters for the metrics endpoint
+
+        Returns:
+            Dictionary with the number of items and batches, the mean and
+            largest batch size, and the current batching window in milliseconds
+        """
+        return {
+            'items': self.items,
+            'batches': self.batches,
+            'mean_batch_size': self.items / self.batches if self.batches else 0.0,
+            'largest_batch': self.largest_batch,
+            'window_ms': self.window() * 1000
+        }
+
+    def _record_arrival(self):
+        """Update the moving average of the gap between arrivals"""
+        now = time.perf_counter()
+        if self._last_arrival is not None:
+            gap = now - self._last_arrival
+            if self._arrival_gap is None:
+                self._arrival_gap = gap
+            else:
+                self._arrival_gap += self.smoothing * (gap - self._arrival_gap)
+        self._last_arrival = now
+
+    def _flush(self):
+        """Start a batch with the pending items, if a slot is free"""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        # Callers that gave up (e.g. timed out) are dropped
+        self._pending = [entry for entry in self._pending if not entry[1].done()]
+        if not self._pending or self._in_flight >= self.concurrency:
+            return
+
+        batch = self._pending[:self.max_batch_size]
+        self._pending = self._pending[self.max_batch_size:]
+        self._in_flight += 1
+        self.items += len(batch)
+        self.batches += 1
+        self.largest_batch = max(self.largest_batch, len(batch))
+        asyncio.ensure_future(self._run(batch))
+
+    async def _run(self, batch):
+        """Run one batch and hand each caller its result"""
+        try:
+            results = await self.run_batch([item for item, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+        else:
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+        finally:
+            self._in_flight -= 1
+            # Items that queued behind this batch have already waited for it
+            while self._pending and self._in_flight < self.concurrency:
+                self._flush()
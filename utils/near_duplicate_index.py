@@ -0,0 +1,185 @@
+"""
+MinHash / locality-sensitive hashing index of known scam postings
+"""
+
+import os
+import zlib
+import pickle
+import numpy as np
+
+# Mersenne prime used for the universal hash family
+MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+
+class NearDuplicateIndex:
+    """
+    Find near-duplicates of confirmed fraudulent postings
+
+    Postings are reduced to word shingles of their cleaned text, summarized by
+    a MinHash signature, and bucketed by bands of the signature (LSH). A lookup
+    only compares against postings that share at least one band, so its cost
+    does not grow with the size of the index. Every indexed posting belongs to
+    a cluster: a new posting that matches an existing one joins its cluster,
+    so reposted campaign templates share a cluster id.
+    """
+
+    def __init__(self, num_perm=128, bands=32, shingle_size=3, threshold=0.8, seed=42):
+        """
+        Args:
+            num_perm: Number of hash permutations in a signature
+            bands: Number of LSH bands (num_perm must be divisible by bands)
+            shingle_size: Number of words per shingle
+            threshold: Minimum estimated Jaccard similarity for a match
+            seed: Seed for the hash permutations
+        """
+        if num_perm % bands != 0:
+            raise ValueError("num_perm must be divisible by bands.")
+
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        self.threshold = threshold
+
+        # Coefficients of the hash permutations (a * x + b) mod p; a and b are
+        # below 2**31 and x below 2**32, so the products fit in uint64
+        rng = np.random.RandomState(seed)
+        self.perm_a = rng.randint(1, 2 ** 31, size=num_perm).astype(np.uint64)
+        self.perm_b = rng.randint(0, 2 ** 31, size=num_perm).astype(np.uint64)
+
+        # One dictionary per band: band hash -> list of doc ids
+        self.buckets = [{} for _ in range(bands)]
+        self.signatures = {}
+        self.clusters = {}
+        self.next_cluster_id = 0
+
+    def __len__(self):
+        return len(self.signatures)
+
+    def signature(self, text):
+        """
+        Compute the MinHash signature of a cleaned text
+
+        Args:
+            text: Cleaned posting text (as produced by Preprocessor)
+
+        Returns:
+            Array of num_perm uint64 values, or None for empty text
+        """
+        words = text.split()
+        if not words:
+            return None
+
+        size = min(self.shingle_size, len(words))
+        shingles = {' '.join(words[i:i + size]) for i in range(len(words) - size + 1)}
+        hashes = np.fromiter(
+            (zlib.crc32(shingle.encode('utf-8')) for shingle in shingles),
+            dtype=np.uint64,
+            count=len(shingles)
+        )
+
+        permuted = (np.outer(self.perm_a, hashes) + self.perm_b[:, None]) % MERSENNE_PRIME
+        return permuted.min(axis=1)
+
+    def add(self, doc_id, text, cluster_id=None):
+        """
+        Add a confirmed fraudulent posting to the index
+
+        Args:
+            doc_id: Identifier of the posting
+            text: Cleaned posting text
+            cluster_id: Cluster to assign; by default the cluster of the best
+                existing match, or a new cluster
+
+        Returns:
+            Cluster id of the posting, or None if the text was empty
+        """
+        signature = self.signature(text)
+        if signature is None:
+            return None
+
+        if cluster_id is None:
+            match = self._best_match(signature)
+            if match is not None:
+                cluster_id = match['cluster_id']
+            else:
+                cluster_id = self.next_cluster_id
+                self.next_cluster_id += 1
+
+        if doc_id in self.signatures:
+            self._remove_from_buckets(doc_id)
+
+        self.signatures[doc_id] = signature
+        self.clusters[doc_id] = cluster_id
+        for band, key in enumerate(self._band_keys(signature)):
+            self.buckets[band].setdefault(key, []).append(doc_id)
+
+        return cluster_id
+
+    def query(self, text):
+        """
+        Look up the closest known scam posting
+
+        Args:
+            text: Cleaned posting text
+
+        Returns:
+            Dictionary with 'doc_id', 'cluster_id' and 'similarity' of the best
+            match at or above the threshold, or None
+        """
+        if not self.signatures:
+            return None
+
+        signature = self.signature(text)
+        if signature is None:
+            return None
+
+        return self._best_match(signature)
+
+    def _best_match(self, signature):
+        """Best indexed posting sharing a band with the signature"""
+        candidates = set()
+        for band, key in enumerate(self._band_keys(signature)):
+            candidates.update(self.buckets[band].get(key, ()))
+
+        best = None
+        for doc_id in candidates:
+            similarity = float(np.mean(self.signatures[doc_id] == signature))
+            if similarity >= self.threshold and (best is None or similarity > best['similarity']):
+                best = {
+                    'doc_id': doc_id,
+                    'cluster_id': self.clusters[doc_id],
+                    'similarity': similarity
+                }
+
+        return best
+
+    def _band_keys(self, signature):
+        """Hashable key of each band of a signature"""
+        return [
+            signature[band * self.rows:(band + 1) * self.rows].tobytes()
+            for band in range(self.bands)
+        ]
+
+    def _remove_from_buckets(self, doc_id):
+        """Remove a posting from the band buckets before re-adding it"""
+        for band, key in enumerate(self._band_keys(self.signatures[doc_id])):
+            bucket = self.buckets[band].get(key, [])
+            if doc_id in bucket:
+                bucket.remove(doc_id)
+
+    def save(self, path='models/near_duplicate_index.pkl'):
+        """Save the index to disk, replacing any previous file atomically"""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(self, f)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def load(path='models/near_duplicate_index.pkl'):
+        """Load an index from disk"""
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Near-duplicate index not found: {path}")
+
+        with open(path, 'rb') as f:
+            return pickle.load(f)
@@ -0,0 +1,73 @@
+"""
+NLTK resource resolution without network access
+"""
+
+import os
+import nltk
+from nltk.tokenize import punkt
+
+# Bundled resource directory (populated by `python main.py --mode setup`);
+# ROBIN_NLTK_DATA overrides it
+NLTK_DATA_DIR = os.environ.get(
+    'ROBIN_NLTK_DATA',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'nltk_data')
+)
+
+# Resources used for text cleaning: download name -> nltk.data path.
+# NLTK 3.8.2+ tokenizes with the pickle-free punkt_tab tables.
+NLTK_RESOURCES = {
+    'stopwords': 'corpora/stopwords',
+    'wordnet': 'corpora/wordnet',
+}
+if hasattr(punkt, 'PunktTokenizer'):
+    NLTK_RESOURCES['punkt_tab'] = 'tokenizers/punkt_tab/english/'
+else:
+    NLTK_RESOURCES['punkt'] = 'tokenizers/punkt'
+
+def configure_nltk_path():
+    """Search the bundled directory before NLTK's default locations"""
+    if NLTK_DATA_DIR not in nltk.data.path:
+        nltk.data.path.insert(0, NLTK_DATA_DIR)
+
+def missing_nltk_resources():
+    """
+    List the required resources that cannot be found locally
+
+    Returns:
+        List of download names of missing resources
+    """
+    configure_nltk_path()
+    missing = []
+    for name, path in NLTK_RESOURCES.items():
+        try:
+            nltk.data.find(path)
+        except LookupError:
+            missing.append(name)
+    return missing
+
+def require_nltk_resources():
+    """Raise a LookupError naming the setup command if any resource is missing"""
+    missing = missing_nltk_resources()
+    if missing:
+        raise LookupError(
+            f"Missing NLTK resources: {', '.join(missing)}. "
+            f"Run `python main.py --mode setup` to install them into {NLTK_DATA_DIR}."
+        )
+
+def download_nltk_resources(download_dir=NLTK_DATA_DIR):
+    """
+    Download the required resources into the bundled directory (setup only)
+
+    Args:
+        download_dir: Directory to download into
+
+    Returns:
+        List of resources that failed to download
+    """
+    os.makedirs(download_dir, exist_ok=True)
+    return [
+        name for name in NLTK_RESOURCES
+        if not nltk.download(name, download_dir=download_dir, quiet=True)
+    ]
+
+configure_nltk_path()
@@ -0,0 +1,183 @@
+"""
+Record/replay corpus of fetched job pages, for offline scraper regression checks and benchmarks
+"""
+
+import os
+import gzip
+import json
+import time
+import threading
+import numpy as np
+from datetime import datetime, timezone
+from urllib.parse import urlsplit
+
+# Fields extracted by JobScraper.parse_job_posting that are compared on replay
+EXTRACTED_FIELDS = ['title', 'company', 'location', 'description', 'requirements', 'benefits',
+                    'company_profile', 'job_type', 'contact_info']
+
+def page_domain(url):
+    """Host of a page URL without a leading 'www.'"""
+    host = (urlsplit(url).hostname or '').lower()
+    return host[4:] if host.startswith('www.') else host
+
+def is_filled(value):
+    """Whether an extracted field holds anything (contact info: any email or phone)"""
+    if isinstance(value, dict):
+        return any(value.values())
+    return bool(value)
+
+class PageCorpus:
+    """
+    Gzip-compressed JSON lines file of fetched pages
+
+    Each line holds the URL, the fetch time, the page markup as it is passed
+    to the parser, and the job data extracted when the page was recorded
+    (the baseline replays are compared against). Appends from several
+    threads are serialized; each append adds a gzip member, which gzip
+    readers concatenate transparently.
+    """
+
+    def __init__(self, path):
+        """
+        Args:
+            path: Corpus file (e.g. pages.jsonl.gz)
+        """
+        self.path = path
+        self._lock = threading.Lock()
+
+    def record(self, url, html, job_data):
+        """
+        Append a fetched page
+
+        Args:
+            url: URL of the page
+            html: Markup passed to the parser
+            job_data: Job data extracted from it
+        """
+        line = json.dumps({
+            'url': url,
+            'fetched_at': datetime.now(timezone.utc).isoformat(),
+            'html': html,
+            'job_data': {field: job_data.get(field) for field in EXTRACTED_FIELDS}
+        }) + '\n'
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._lock:
+            with gzip.open(self.path, 'at', encoding='utf-8') as f:
+                f.write(line)
+
+    def pages(self):
+        """
+        Read the recorded pages
+
+        Returns:
+            List of page dictionaries (url, fetched_at, html, job_data)
+        """
+        if not os.path.exists(self.path):
+            raise FileNotFoundError(f"Page corpus not found: {self.path}")
+        with gzip.open(self.path, 'rt', encoding='utf-8') as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+def record_pages(urls_path, corpus_path, scraper=None):
+    """
+    Fetch a list of job posting URLs and record the pages into a corpus
+
+    Args:
+        urls_path: Text file with one URL per line ('#' starts a comment)
+        corpus_path: Corpus file the pages are appended to
+        scraper: JobScraper used to fetch and parse (a default one if not given)
+
+    Returns:
+        Number of pages recorded
+    """
+    from utils.job_scraper import JobScraper
+
+    with open(urls_path, encoding='utf-8') as f:
+        urls = [line.strip() for line in f if line.strip() and not line.startswith('#')]
+
+    scraper = scraper or JobScraper()
+    scraper.page_corpus = PageCorpus(corpus_path)
+    recorded = 0
+    for i, url in enumerate(urls, 1):
+        if scraper.scrape_job_posting(url) is not None:
+            recorded += 1
+        print(f"[{i}/{len(urls)}] {url}")
+
+    print(f"Recorded {recorded} of {len(urls)} pages into {corpus_path}")
+    return recorded
+
+def replay_pages(corpus_path, scraper=None, output_path=None):
+    """
+    Replay a corpus through the scraper's parser without the network
+
+    Every page is parsed again with the current selectors and compared with
+    the job data recorded with it. A field that was filled and is now empty
+    or different is a regression; an empty field that is now filled is an
+    improvement.
+
+    Args:
+        corpus_path: Corpus file written by PageCorpus
+        scraper: JobScraper whose parser and selectors are replayed (a
+            default one if not given)
+        output_path: Optional JSON file the report is written to
+
+    Returns:
+        Dictionary with the extraction latency and the fill rate of each field
+        per domain, and the list of field differences per page
+    """
+    from utils.job_scraper import JobScraper
+
+    scraper = scraper or JobScraper()
+    pages = PageCorpus(corpus_path).pages()
+    if not pages:
+        print(f"No pages in {corpus_path}")
+        return {'pages': 0}
+
+    by_domain = {}
+    diffs = []
+    for page in pages:
+        start = time.perf_counter()
+        job_data = scraper.parse_job_posting(page['html'], page['url'])
+        latency = (time.perf_counter() - start) * 1000
+
+        domain = by_domain.setdefault(page_domain(page['url']), {'latency_ms': [], 'filled': []})
+        domain['latency_ms'].append(latency)
+        domain['filled'].append([is_filled(job_data.get(field)) for field in EXTRACTED_FIELDS])
+
+        changes = {}
+        for field in EXTRACTED_FIELDS:
+            before, after = page['job_data'].get(field), job_data.get(field)
+            if before == after or (not is_filled(before) and not is_filled(after)):
+                continue
+            changes[field] = 'improved' if not is_filled(before) else ('lost' if not is_filled(after) else 'changed')
+        if changes:
+            diffs.append({'url': page['url'], 'fields': changes})
+
+    report = {'pages': len(pages), 'domains': {}, 'diffs': diffs,
+              'regressions': sum(any(change != 'improved' for change in diff['fields'].values()) for diff in diffs)}
+    for name, domain in sorted(by_domain.items()):
+        latencies = np.array(domain['latency_ms'])
+        fill_rates = np.mean(domain['filled'], axis=0)
+        report['domains'][name] = {
+            'pages': len(latencies),
+            'p50_ms': float(np.percentile(latencies, 50)),
+            'p95_ms': float(np.percentile(latencies, 95)),
+            'fill_rate': {field: float(rate) for field, rate in zip(EXTRACTED_FIELDS, fill_rates)}
+        }
+
+    print(f"Replayed {report['pages']} pages from {corpus_path}")
+    for name, domain in report['domains'].items():
+        filled = sum(domain['fill_rate'].values())
+        print(f"  {name}: {domain['pages']} pages, p50 {domain['p50_ms']:.1f} ms, "
+              f"p95 {domain['p95_ms']:.1f} ms, {filled:.1f}/{len(EXTRACTED_FIELDS)} fields filled on average")
+    print(f"Pages with regressions: {report['regressions']}")
+    for diff in diffs:
+        print(f"  {diff['url']}: " + ', '.join(f"{field} {change}" for field, change in diff['fields'].items()))
+
+    if output_path:
+        with open(output_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {output_path}")
+
+    return report
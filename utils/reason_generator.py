@@ -4,6 +4,8 @@ Reason generator for fake job detection
 
 import logging
 
+from utils.reputation import PERSONAL_EMAIL_DOMAINS
+
 logger = logging.getLogger(__name__)
 
 class ReasonGenerator:
@@ -77,12 +79,10 @@ class ReasonGenerator:
         }
         
         # Personal email domains
-        self.personal_email_domains = [
-            'gmail.com', 'yahoo.com', 'hotmail.com', 
-            'outlook.com', 'aol.com', 'mail.com'
-        ]
+        self.personal_email_domains = frozenset(PERSONAL_EMAIL_DOMAINS)
     
-    def generate_reasons(self, job_data, confidence_score, model_probabilities=None):
+    def generate_reasons(self, job_data, confidence_score, model_probabilities=None, reputation_hits=None,
+                         top_phrases=None):
         """
         Generate human-readable reasons for why a job posting may be fake
         
@@ -90,6 +90,10 @@ class ReasonGenerator:
             job_data: Dictionary with job posting details
             confidence_score: Confidence score from the ensemble model (0-100)
             model_probabilities: Dictionary with individual model probabilities
+            reputation_hits: Contacts found on reputation lists (from
+                ReputationIndex.check_contacts), if an index is available
+            top_phrases: (phrase, contribution) pairs that pushed the text
+                model toward fraud (from CoefficientExplainer), if available
             
         Returns:
             List of reasons why the job posting may be fake
@@ -97,11 +101,21 @@ class ReasonGenerator:
         reasons = []
         
         try:
+            # Contacts on the blocklist are reported regardless of the score
+            if reputation_hits:
+                for contact in reputation_hits.get('block', []):
+                    reasons.append(f'Contact "{contact}" is on a blocklist of known scam contacts.')
+            
             # Only generate detailed reasons if confidence score is significant
             if confidence_score < 25:
                 reasons.append('No significant warning signs detected.')
                 return reasons
             
+            # Phrases the text model actually weighed toward fraud
+            if top_phrases:
+                phrases = ', '.join(f'"{phrase}"' for phrase, _ in top_phrases)
+                reasons.append(f'Wording that most raised the fraud score: {phrases}.')
+            
             # Check title for suspicious patterns
             title = job_data.get('title', '').lower()
             for pattern, explanation in self.suspicious_patterns['title_patterns'].items():
@@ -126,11 +140,11 @@ class ReasonGenerator:
             emails = contact_info.get('emails', [])
             
             # Check for personal email domains
-            for email in emails:
-                for domain in self.personal_email_domains:
-                    if email.lower().endswith('@' + domain):
-                        reasons.append('Uses personal email domain instead of company email.')
-                        break
+            if reputation_hits is not None:
+                if reputation_hits.get('personal'):
+                    reasons.append('Uses personal email domain instead of company email.')
+            elif any(email.lower().rsplit('@', 1)[-1] in self.personal_email_domains for email in emails):
+                reasons.append('Uses personal email domain instead of company email.')
             
             # Check if multiple email addresses
             if len(emails) > 1:
@@ -142,7 +156,7 @@ class ReasonGenerator:
             
             # Add reasons based on model-specific signals
             if model_probabilities:
-                self._add_model_specific_reasons(model_probabilities, reasons)
+                self._add_model_specific_reasons(model_probabilities, reasons, explained_text=bool(top_phrases))
             
             # If we still have no reasons but high confidence, add a generic reason
             if not reasons and confidence_score > 50:
@@ -161,15 +175,20 @@ class ReasonGenerator:
             else:
                 return ['No specific warning signs identified.']
     
-    def _add_model_specific_reasons(self, model_probabilities, reasons):
+    def _add_model_specific_reasons(self, model_probabilities, reasons, explained_text=False):
         """Add reasons based on which models contributed most to the prediction"""
         
-        # If Logistic Regression has high confidence (text-based model)
-        if model_probabilities.get('logistic_regression', 0) > 0.8:
+        # If Logistic Regression has high confidence (text-based model) and its
+        # contributing phrases were not already listed
+        if not explained_text and model_probabilities.get('logistic_regression', 0) > 0.8:
             reasons.append('Text analysis shows language patterns common in fraudulent listings.')
         
-        # If Random Forest has high confidence (categorical features)
-        if model_probabilities.get('random_forest', 0) > 0.8:
+        # If the categorical model (Random Forest or gradient boosting) has high confidence
+        categorical_prob = max(
+            model_probabilities.get('random_forest', 0),
+            model_probabilities.get('hist_gradient_boosting', 0)
+        )
+        if categorical_prob > 0.8:
             reasons.append('Job characteristics match known patterns of fake job postings.')
         
         # If most models agree with high confidence
@@ -0,0 +1,197 @@
+"""
+Lookup-table encoding of single job postings for serving
+"""
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+class RecordEncoder:
+    """
+    Encode one job posting into TF-IDF, one-hot and ordinal rows without pandas
+
+    The fitted vectorizer and encoders validate their input, build a one-row
+    DataFrame and dispatch through generic transform code on every request,
+    which costs far more than the encoding itself. This freezes what they
+    compute for a single record:
+
+    - TF-IDF: the vectorizer's own analyzer, term counts through its
+      vocabulary, idf weighting and L2 normalization in the same order of
+      floating point operations, then the selected columns;
+    - one-hot: category value -> output column, per categorical column;
+    - ordinal: category value -> code, taken from the fitted ordinal encoder
+      itself, so infrequent grouping is reproduced.
+
+    Unknown categories set no one-hot column and get the ordinal encoder's
+    unknown value, as with handle_unknown. The rows are bit-identical to the
+    ones the fitted transformers produce.
+    """
+
+    def __init__(self, tfidf_vectorizer, onehot_encoder, ordinal_encoder, categorical_columns,
+                 feature_selector=None):
+        """
+        Args:
+            tfidf_vectorizer: Fitted TfidfVectorizer
+            onehot_encoder: Fitted OneHotEncoder (no dropped or infrequent categories)
+            ordinal_encoder: Fitted OrdinalEncoder
+            categorical_columns: Categorical columns in encoder order
+            feature_selector: Fitted selector of TF-IDF columns, if any
+        """
+        if tfidf_vectorizer.norm not in ('l2', None):
+            raise ValueError(f"Unsupported TF-IDF norm: {tfidf_vectorizer.norm}")
+        if onehot_encoder.drop is not None or getattr(onehot_encoder, 'infrequent_categories_', None):
+            raise ValueError("One-hot encoders with dropped or infrequent categories are not supported.")
+
+        self.tfidf_vectorizer = tfidf_vectorizer
+        self.vocabulary = tfidf_vectorizer.vocabulary_
+        self.idf = tfidf_vectorizer.idf_ if tfidf_vectorizer.use_idf else None
+        self.n_tfidf = len(self.vocabulary)
+        self._analyzer = None
+
+        # Vocabulary column -> selected column (-1 when dropped)
+        if feature_selector is not None:
+            support = feature_selector.get_support()
+            self.selected_columns = np.full(self.n_tfidf, -1, dtype=np.intp)
+            self.selected_columns[support] = np.arange(support.sum())
+            self.n_selected = int(support.sum())
+        else:
+            self.selected_columns = None
+            self.n_selected = self.n_tfidf
+
+        self.categorical_columns = list(categorical_columns or [])
+        onehot_categories = onehot_encoder.categories_ if self.categorical_columns else []
+        self.n_onehot = sum(len(categories) for categories in onehot_categories)
+        self.onehot_columns = []
+        offset = 0
+        for categories in onehot_categories:
+            self.onehot_columns.append({value: offset + i for i, value in enumerate(categories)})
+            offset += len(categories)
+
+        self.unknown_code = float(ordinal_encoder.unknown_value)
+        self.ordinal_codes = self._ordinal_tables(ordinal_encoder)
+
+    def _ordinal_tables(self, ordinal_encoder):
+        """Transform every known category once to read off its code"""
+        if not self.categorical_columns:
+            return []
+        categories = ordinal_encoder.categories_
+
+        longest = max(len(values) for values in categories)
+        grid = pd.DataFrame({
+            column: [values[min(i, len(values) - 1)] for i in range(longest)]
+            for column, values in zip(self.categorical_columns, categories)
+        })
+        codes = ordinal_encoder.transform(grid)
+        return [
+            {value: float(codes[i, j]) for i, value in enumerate(values)}
+            for j, values in enumerate(categories)
+        ]
+
+    def __getstate__(self):
+        # The analyzer is rebuilt from the vectorizer after unpickling
+        state = self.__dict__.copy()
+        state['_analyzer'] = None
+        return state
+
+    def tfidf_row(self, text, term_stats=None):
+        """
+        TF-IDF row of one cleaned text
+
+        Args:
+            text: Cleaned combined text
+            term_stats: Optional dictionary filled with the number of single-word
+                terms ('words') and the ones outside the vocabulary ('oov')
+
+        Returns:
+            Sparse matrix of shape (1, n_selected)
+        """
+        if self._analyzer is None:
+            self._analyzer = self.tfidf_vectorizer.build_analyzer()
+
+        counts = {}
+        oov = []
+        words = 0
+        for term in self._analyzer(text):
+            column = self.vocabulary.get(term)
+            if column is not None:
+                counts[column] = counts.get(column, 0) + 1
+            if term_stats is not None and ' ' not in term:
+                words += 1
+                if column is None:
+                    oov.append(term)
+        if term_stats is not None:
+            term_stats['words'] = words
+            term_stats['oov'] = oov
+
+        indices = np.fromiter(counts, dtype=np.int32, count=len(counts))
+        data = np.fromiter(counts.values(), dtype=np.float64, count=len(counts))
+        order = np.argsort(indices, kind='stable')
+        indices, data = indices[order], data[order]
+
+        if self.tfidf_vectorizer.binary:
+            data[:] = 1.0
+        if self.tfidf_vectorizer.sublinear_tf:
+            data = np.log(data) + 1.0
+        if self.idf is not None:
+            data *= self.idf[indices]
+        if self.tfidf_vectorizer.norm == 'l2' and len(data):
+            # Sequential sum of squares, as sklearn's sparse row normalization
+            norm = np.cumsum(data * data)[-1]
+            if norm != 0.0:
+                data /= np.sqrt(norm)
+
+        n_columns = self.n_tfidf
+        if self.selected_columns is not None:
+            columns = self.selected_columns[indices]
+            kept = columns >= 0
+            indices, data = columns[kept].astype(np.int32), data[kept]
+            n_columns = self.n_selected
+
+        return sp.csr_matrix((data, indices, np.array([0, len(data)], dtype=np.int32)),
+                             shape=(1, n_columns))
+
+    def term_stats(self, text):
+        """
+        Count the single-word terms of a cleaned text that are outside the vocabulary
+
+        N-grams are left out: most word pairs are outside any vocabulary.
+
+        Args:
+            text: Cleaned combined text
+
+        Returns:
+            Dictionary with the number of single-word terms ('words') and the
+            list of those outside the vocabulary ('oov')
+        """
+        if self._analyzer is None:
+            self._analyzer = self.tfidf_vectorizer.build_analyzer()
+
+        words = [term for term in self._analyzer(text) if ' ' not in term]
+        return {'words': len(words), 'oov': [term for term in words if term not in self.vocabulary]}
+
+    def categorical_rows(self, values):
+        """
+        One-hot and ordinal rows of one record's categorical values
+
+        Args:
+            values: Dictionary of categorical column -> value
+
+        Returns:
+            Tuple of (sparse one-hot row of shape (1, n_onehot), ordinal row
+            of shape (1, n_columns))
+        """
+        onehot = []
+        ordinal = np.empty((1, len(self.categorical_columns)), dtype=np.float64)
+        for j, column in enumerate(self.categorical_columns):
+            value = values.get(column, 'Unknown')
+            position = self.onehot_columns[j].get(value)
+            if position is not None:
+                onehot.append(position)
+            ordinal[0, j] = self.ordinal_codes[j].get(value, self.unknown_code)
+
+        indices = np.array(onehot, dtype=np.int32)
+        onehot_row = sp.csr_matrix(
+            (np.ones(len(indices)), indices, np.array([0, len(indices)], dtype=np.int32)),
+            shape=(1, self.n_onehot)
+        )
+        return onehot_row, ordinal
@@ -0,0 +1,310 @@
+"""
+Contact reputation index: Bloom filter in front of an on-disk exact index
+"""
+
+import os
+import re
+import math
+import pickle
+import sqlite3
+import hashlib
+import threading
+import numpy as np
+
+# Lists an entry can belong to
+REPUTATION_LISTS = ('block', 'allow', 'personal')
+
+# Free email providers; seeded into the 'personal' list of a new index
+PERSONAL_EMAIL_DOMAINS = (
+    'gmail.com', 'yahoo.com', 'hotmail.com',
+    'outlook.com', 'aol.com', 'mail.com'
+)
+
+# A blocklisted contact puts the fraud probability at least this high
+BLOCK_PROBABILITY_FLOOR = 0.9
+
+# An allowlisted employer domain (with no blocklist hit) scales the probability down
+ALLOW_PROBABILITY_FACTOR = 0.5
+
+NON_DIGIT_RE = re.compile(r'\D')
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter over strings
+
+    Uses double hashing of a single 128-bit digest, so a lookup costs one hash
+    and num_hashes bit reads regardless of the number of entries.
+    """
+
+    def __init__(self, capacity, error_rate=0.01):
+        """
+        Args:
+            capacity: Expected number of entries
+            error_rate: Target false positive rate at capacity
+        """
+        capacity = max(int(capacity), 1)
+        self.num_bits = max(int(-capacity * math.log(error_rate) / math.log(2) ** 2), 8)
+        self.num_hashes = max(int(round(self.num_bits / capacity * math.log(2))), 1)
+        self.bits = np.zeros((self.num_bits + 7) // 8, dtype=np.uint8)
+
+    def _positions(self, key):
+        """Bit positions of a key"""
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+
+    def add(self, key):
+        """Add a key to the filter"""
+        for position in self._positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+class ReputationIndex:
+    """
+    Block/allow/personal lists of emails, domains and phone numbers
+
+    Entries are stored in an SQLite table keyed by "kind:value" (the exact
+    index) and mirrored in a Bloom filter held in memory. Most lookups are
+    misses and are answered by the filter alone; the few filter hits are
+    confirmed with a primary-key read, so false positives never reach scoring.
+    """
+
+    def __init__(self, path='models/reputation'):
+        """
+        Args:
+            path: Directory holding index.sqlite3 and bloom.pkl
+        """
+        self.path = path
+        self.db_path = os.path.join(path, 'index.sqlite3')
+        self.bloom_path = os.path.join(path, 'bloom.pkl')
+
+        self.bloom = None
+        if os.path.exists(self.bloom_path):
+            with open(self.bloom_path, 'rb') as f:
+                self.bloom = pickle.load(f)
+
+        # SQLite connections cannot be shared between threads
+        self._local = threading.local()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_local']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._local = threading.local()
+
+    def build(self, list_files, error_rate=0.01, batch_size=100000):
+        """
+        Build the index from text files with one entry per line
+
+        The kind of each entry is inferred: values containing '@' are emails,
+        values made of digits and phone punctuation are phone numbers, and
+        anything else is a domain. The personal list is seeded with
+        PERSONAL_EMAIL_DOMAINS.
+
+        Args:
+            list_files: Dictionary mapping list name to a list of file paths
+            error_rate: Target false positive rate of the Bloom filter
+            batch_size: Number of rows inserted per transaction
+
+        Returns:
+            Number of entries in the index
+        """
+        for name in list_files:
+            if name not in REPUTATION_LISTS:
+                raise ValueError(f"Unknown reputation list: {name}")
+
+        os.makedirs(self.path, exist_ok=True)
+        tmp_db_path = self.db_path + '.tmp'
+        if os.path.exists(tmp_db_path):
+            os.remove(tmp_db_path)
+
+        conn = sqlite3.connect(tmp_db_path)
+        conn.execute('PRAGMA journal_mode = OFF')
+        conn.execute('PRAGMA synchronous = OFF')
+        conn.execute(
+            'CREATE TABLE entries (key TEXT NOT NULL, list TEXT NOT NULL, '
+            'PRIMARY KEY (key, list)) WITHOUT ROWID'
+        )
+
+        def rows():
+            for domain in PERSONAL_EMAIL_DOMAINS:
+                yield self.entry_key('domain', domain), 'personal'
+            for name, paths in list_files.items():
+                for path in paths:
+                    with open(path, encoding='utf-8') as f:
+                        for line in f:
+                            key = self.classify(line)
+                            if key is not None:
+                                yield key, name
+
+        batch = []
+        for row in rows():
+            batch.append(row)
+            if len(batch) >= batch_size:
+                conn.executemany('INSERT OR IGNORE INTO entries VALUES (?, ?)', batch)
+                batch = []
+        conn.executemany('INSERT OR IGNORE INTO entries VALUES (?, ?)', batch)
+        conn.commit()
+
+        count = conn.execute('SELECT COUNT(DISTINCT key) FROM entries').fetchone()[0]
+        bloom = BloomFilter(count, error_rate)
+        for (key,) in conn.execute('SELECT DISTINCT key FROM entries'):
+            bloom.add(key)
+        conn.close()
+
+        # Swap both files in only once they are complete
+        os.replace(tmp_db_path, self.db_path)
+        with open(self.bloom_path + '.tmp', 'wb') as f:
+            pickle.dump(bloom, f)
+        os.replace(self.bloom_path + '.tmp', self.bloom_path)
+
+        self.bloom = bloom
+        self._local = threading.local()
+        return count
+
+    def lookup(self, kind, value):
+        """
+        Find the lists a contact belongs to
+
+        Args:
+            kind: 'email', 'domain' or 'phone'
+            value: Raw contact value
+
+        Returns:
+            Set of list names (empty if unknown)
+        """
+        if self.bloom is None:
+            return set()
+
+        key = self.entry_key(kind, value)
+        if key is None or key not in self.bloom:
+            return set()
+
+        rows = self._connection().execute('SELECT list FROM entries WHERE key = ?', (key,))
+        return {name for (name,) in rows}
+
+    def check_contacts(self, contact_info):
+        """
+        Check the emails, email domains and phone numbers of a posting
+
+        Args:
+            contact_info: Dictionary with 'emails' and 'phones' lists (as
+                produced by JobScraper._extract_contact_info)
+
+        Returns:
+            Dictionary mapping each list name to the matching contacts
+        """
+        hits = {name: [] for name in REPUTATION_LISTS}
+        if not contact_info:
+            return hits
+
+        candidates = []
+        for email in self._contact_strings(contact_info.get('emails')):
+            email = email.strip().lower()
+            if '@' not in email:
+                continue
+            candidates.append(('email', email))
+            candidates.extend(('domain', domain) for domain in self._parent_domains(email.rsplit('@', 1)[1]))
+        for phone in self._contact_strings(contact_info.get('phones')):
+            candidates.append(('phone', phone))
+
+        for kind, value in dict.fromkeys(candidates):
+            for name in self.lookup(kind, value):
+                hits[name].append(value)
+
+        return hits
+
+    def _connection(self):
+        """Read-only SQLite connection of the current thread"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True)
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _contact_strings(values):
+        """Contacts as strings: numbers are converted, other non-string entries skipped"""
+        if values is None:
+            return []
+        if isinstance(values, (str, int, float)):
+            values = [values]
+        if not isinstance(values, (list, tuple)):
+            return []
+        return [str(value) for value in values
+                if isinstance(value, (str, int, float)) and not isinstance(value, bool)]
+
+    @staticmethod
+    def _parent_domains(domain):
+        """A domain and its parents down to two labels (mail.example.com -> example.com)"""
+        labels = domain.split('.')
+        return ['.'.join(labels[i:]) for i in range(max(len(labels) - 1, 1))]
+
+    @classmethod
+    def classify(cls, value):
+        """Infer the kind of a list entry and return its key (None if empty)"""
+        value = value.strip()
+        if not value or value.startswith('#'):
+            return None
+        if '@' in value:
+            return cls.entry_key('email', value)
+        if not re.search(r'[a-zA-Z]', value):
+            return cls.entry_key('phone', value)
+        return cls.entry_key('domain', value)
+
+    @staticmethod
+    def entry_key(kind, value):
+        """
+        Normalize a contact into its index key
+
+        Args:
+            kind: 'email', 'domain' or 'phone'
+            value: Raw contact value
+
+        Returns:
+            Key string such as 'domain:example.com', or None if the value is empty
+        """
+        value = value.strip().lower()
+        if kind == 'domain':
+            value = value.rstrip('.')
+            if value.startswith('www.'):
+                value = value[4:]
+        elif kind == 'phone':
+            # Compare on the last 10 digits so country code formatting does not matter
+            value = NON_DIGIT_RE.sub('', value)[-10:]
+        elif kind != 'email':
+            raise ValueError(f"Unknown contact kind: {kind}")
+
+        return f"{kind}:{value}" if value else None
+
+def adjust_probability(probability, reputation_hits):
+    """
+    Apply reputation hits to an ensemble fraud probability
+
+    Args:
+        probability: Ensemble fraud probability
+        reputation_hits: Result of ReputationIndex.check_contacts, or None
+
+    Returns:
+        Adjusted probability
+    """
+    if not reputation_hits:
+        return probability
+    if reputation_hits['block']:
+        return max(probability, BLOCK_PROBABILITY_FLOOR)
+    if reputation_hits['allow']:
+        return probability * ALLOW_PROBABILITY_FACTOR
+    return probability
+
+def load_reputation_index(path='models/reputation'):
+    """Load the reputation index if it has been built, else return None"""
+    index = ReputationIndex(path)
+    if index.bloom is None or not os.path.exists(index.db_path):
+        return None
+    return index
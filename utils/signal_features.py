@@ -0,0 +1,223 @@
+"""
+Vectorized hand-crafted signal features for fake job detection
+"""
+
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import MaxAbsScaler
+
+from utils.feature_extraction import (FeatureExtractor, SALARY_KEYWORDS, PERSONAL_INFO_KEYWORDS,
+                                      SPECIFIC_SALARY_RE, PHONE_RE, EMAIL_RE)
+from utils.text_analysis import (URGENCY_PHRASES, UNREALISTIC_PROMISES, VAGUE_JOB_INDICATORS,
+                                 EXCESSIVE_PUNCTUATION_RE)
+
+# Text fields the signals are computed over
+TEXT_FIELDS = ['title', 'company_profile', 'description', 'requirements', 'benefits']
+
+class SignalFeatureExtractor:
+    """
+    Compute FeatureExtractor/TextAnalyzer style signals column-wise
+
+    Each signal is a (source, operation, argument) spec. For a DataFrame the
+    operations run as pandas string methods over whole columns; for a single
+    posting the same operations run on plain strings, so both paths produce
+    identical values. The output is a small dense block, log-scaled and
+    max-abs normalized so it can sit next to TF-IDF features.
+    """
+
+    def __init__(self):
+        feature_extractor = FeatureExtractor()
+
+        # name: (source field, operation, argument); 'text' is the lowercased
+        # combination of all text fields
+        self.signal_specs = {
+            'title_length': ('title', 'length', None),
+            'description_length': ('description', 'length', None),
+            'company_profile_length': ('company_profile', 'length', None),
+            'has_company_info': ('company_profile', 'longer_than', 100),
+            'suspicious_word_count': ('text', 'phrase_count', feature_extractor.suspicious_words),
+            'red_flag_phrase_count': ('text', 'phrase_count', feature_extractor.red_flag_phrases),
+            'has_personal_email': ('text', 'matches', feature_extractor.personal_email_re),
+            'email_count': ('text', 'regex_count', ('@', EMAIL_RE)),
+            'has_salary': ('text', 'phrase_any', SALARY_KEYWORDS),
+            'has_specific_salary': ('text', 'matches', SPECIFIC_SALARY_RE),
+            'has_phone_number': ('text', 'matches', PHONE_RE),
+            'exclamation_count': ('text', 'char_count', '!'),
+            'requests_personal_info': ('text', 'phrase_any', PERSONAL_INFO_KEYWORDS),
+            'mentions_interview': ('text', 'phrase_any', ['interview']),
+            'urgency_score': ('text', 'phrase_count', URGENCY_PHRASES),
+            'promise_score': ('text', 'phrase_count', UNREALISTIC_PROMISES),
+            'vagueness_score': ('text', 'phrase_count', VAGUE_JOB_INDICATORS),
+            'excessive_punctuation': ('text', 'matches', EXCESSIVE_PUNCTUATION_RE),
+            'word_count': ('words', 'count', None),
+            'lexical_diversity': ('words', 'diversity', None),
+            'avg_word_length': ('words', 'mean_length', None)
+        }
+        self.feature_names = list(self.signal_specs)
+
+        self.scaler = MaxAbsScaler()
+        self.is_fitted = False
+
+    def fit_transform(self, df):
+        """
+        Compute signals for a DataFrame and fit the scaler
+
+        Args:
+            df: pandas DataFrame with job posting text columns
+
+        Returns:
+            Dense array of shape (n_rows, n_signals)
+        """
+        scaled = self.scaler.fit_transform(np.log1p(self.compute(df)))
+        self.is_fitted = True
+        return scaled
+
+    def transform(self, df):
+        """
+        Compute scaled signals for a DataFrame
+
+        Args:
+            df: pandas DataFrame with job posting text columns
+
+        Returns:
+            Dense array of shape (n_rows, n_signals)
+        """
+        if not self.is_fitted:
+            raise ValueError("Signal feature extractor has not been fitted yet.")
+        return np.log1p(self.compute(df)) / self.scaler.scale_
+
+    def transform_record(self, job_data):
+        """
+        Compute scaled signals for a single job posting, without pandas
+
+        Args:
+            job_data: Dictionary with job posting details
+
+        Returns:
+            Dense array of shape (1, n_signals)
+        """
+        if not self.is_fitted:
+            raise ValueError("Signal feature extractor has not been fitted yet.")
+        return np.log1p(self.compute_record(job_data)) / self.scaler.scale_
+
+    def compute(self, df):
+        """
+        Compute the raw (unscaled) signals for a DataFrame, column-wise
+
+        Args:
+            df: pandas DataFrame with job posting text columns
+
+        Returns:
+            Dense float array of shape (n_rows, n_signals)
+        """
+        sources = {field: self._text_column(df, field) for field in TEXT_FIELDS}
+
+        # Combined text, joined column-wise
+        text = sources[TEXT_FIELDS[0]]
+        for field in TEXT_FIELDS[1:]:
+            text = text + ' ' + sources[field]
+        sources['text'] = text.str.lower()
+        sources['words'] = sources['text'].str.split()
+
+        columns = [
+            self._evaluate_column(operation, sources[source], argument)
+            for source, operation, argument in self.signal_specs.values()
+        ]
+        return np.column_stack(columns).astype(np.float64)
+
+    def compute_record(self, job_data):
+        """
+        Compute the raw (unscaled) signals for a single job posting
+
+        Args:
+            job_data: Dictionary with job posting details
+
+        Returns:
+            Dense float array of shape (1, n_signals)
+        """
+        sources = {field: self._text_value(job_data.get(field, '')) for field in TEXT_FIELDS}
+        sources['text'] = ' '.join(sources[field] for field in TEXT_FIELDS).lower()
+        sources['words'] = sources['text'].split()
+
+        values = [
+            self._evaluate_value(operation, sources[source], argument)
+            for source, operation, argument in self.signal_specs.values()
+        ]
+        return np.array([values], dtype=np.float64)
+
+    def _evaluate_column(self, operation, column, argument):
+        """Evaluate one signal over a whole column of strings (or word lists)"""
+        if operation == 'length':
+            return column.str.len().to_numpy()
+        if operation == 'longer_than':
+            return (column.str.len() > argument).to_numpy()
+        if operation == 'phrase_count':
+            return sum(column.str.contains(phrase, regex=False).to_numpy(dtype=np.int64) for phrase in argument)
+        if operation == 'phrase_any':
+            return self._evaluate_column('phrase_count', column, argument) > 0
+        if operation == 'matches':
+            return column.str.contains(argument).to_numpy()
+        if operation == 'char_count':
+            return (column.str.len() - column.str.replace(argument, '', regex=False).str.len()).to_numpy()
+        if operation == 'regex_count':
+            # Only run the pattern on rows containing the required character
+            required, pattern = argument
+            counts = np.zeros(len(column))
+            mask = column.str.contains(required, regex=False).to_numpy()
+            if mask.any():
+                counts[mask] = column[mask].str.count(pattern).to_numpy()
+            return counts
+        if operation == 'count':
+            return column.str.len().to_numpy()
+        if operation == 'diversity':
+            return column.map(self._diversity).to_numpy()
+        if operation == 'mean_length':
+            return column.map(self._mean_length).to_numpy()
+        raise ValueError(f"Unknown signal operation: {operation}")
+
+    def _evaluate_value(self, operation, value, argument):
+        """Evaluate one signal on a single string (or word list)"""
+        if operation == 'length':
+            return len(value)
+        if operation == 'longer_than':
+            return len(value) > argument
+        if operation == 'phrase_count':
+            return sum(phrase in value for phrase in argument)
+        if operation == 'phrase_any':
+            return any(phrase in value for phrase in argument)
+        if operation == 'matches':
+            return argument.search(value) is not None
+        if operation == 'char_count':
+            return value.count(argument)
+        if operation == 'regex_count':
+            required, pattern = argument
+            return len(pattern.findall(value)) if required in value else 0
+        if operation == 'count':
+            return len(value)
+        if operation == 'diversity':
+            return self._diversity(value)
+        if operation == 'mean_length':
+            return self._mean_length(value)
+        raise ValueError(f"Unknown signal operation: {operation}")
+
+    @staticmethod
+    def _diversity(words):
+        """Unique words over total words"""
+        return len(set(words)) / len(words) if words else 0.0
+
+    @staticmethod
+    def _mean_length(words):
+        """Average word length"""
+        return sum(map(len, words)) / len(words) if words else 0.0
+
+    def _text_column(self, df, field):
+        """Get a text column as strings, with missing columns and values as ''"""
+        if field not in df.columns:
+            return pd.Series([''] * len(df), index=df.index, dtype=object)
+        return df[field].fillna('').astype(str)
+
+    def _text_value(self, value):
+        """Get a single text value as a string, with missing values as ''"""
+        if value is None or (isinstance(value, float) and np.isnan(value)):
+            return ''
+        return str(value)
@@ -0,0 +1,64 @@
+"""
+In-flight deduplication of identical asynchronous calls
+"""
+
+import copy
+import asyncio
+
+class SingleFlight:
+    """
+    Share one execution between concurrent calls with the same key
+
+    The first call for a key starts the work; calls with the same key that
+    arrive before it finishes wait on that execution instead of starting their
+    own. Once it completes the key is forgotten, so later calls run fresh
+    (results are not cached). Every caller receives its own deep copy of the
+    result, since callers may modify it.
+
+    The in-flight table is a plain dict shared by awaiting tasks, so do() is
+    only safe to call from the event loop that runs those tasks.
+    """
+
+    def __init__(self):
+        self._in_flight = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    async def do(self, key, work):
+        """
+        Run work() for a key, or wait on the execution already in flight
+
+        Args:
+            key: Hashable identity of the call
+            work: Function returning a coroutine that computes the result
+
+        Returns:
+            Copy of the result of the shared execution
+        """
+        self.calls += 1
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(work())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        else:
+            self.coalesced += 1
+
+        # A caller that gives up must not cancel the execution others wait on
+        result = await asyncio.shield(task)
+        return copy.deepcopy(result)
+
+    def stats(self):
+        """
+        Counters for the metrics endpoint
+
+        Returns:
+            Dictionary with the number of calls, coalesced calls, the coalesce
+            rate and the executions currently in flight
+        """
+        return {
+            'calls': self.calls,
+            'coalesced': self.coalesced,
+            'coalesce_rate': self.coalesced / self.calls if self.calls else 0.0,
+            'in_flight': len(self._in_flight)
+        }
@@ -9,44 +9,45 @@ from nltk.tokenize import word_tokenize
 from nltk.stem import WordNetLemmatizer
 from collections import Counter
 
-# Download NLTK resources if needed
-try:
-    nltk.data.find('corpora/stopwords')
-    nltk.data.find('corpora/wordnet')
-except LookupError:
-    nltk.download('stopwords')
-    nltk.download('wordnet')
-    nltk.download('punkt')
+from utils.nltk_resources import require_nltk_resources
+
+# Suspicious patterns
+URGENCY_PHRASES = [
+    'apply now', 'urgent hiring', 'immediate start',
+    'limited positions', 'act fast', 'don\'t miss this',
+    'once in a lifetime', 'apply today', 'hurry',
+    'last chance', 'time is running out'
+]
+
+UNREALISTIC_PROMISES = [
+    'unlimited income', 'unlimited earning', 'financial freedom',
+    'be your own boss', 'work from home millionaire', 'get rich',
+    'earn thousands', 'easy money', 'quick money', 'fast cash',
+    'passive income', 'earn while you sleep', 'effortless income'
+]
+
+EXCESSIVE_PUNCTUATION_RE = re.compile(r'[!?.]{2,}')
+
+VAGUE_JOB_INDICATORS = [
+    'flexible position', 'various duties', 'multiple roles',
+    'different tasks', 'etc', 'and more', 'as needed',
+    'whatever is needed', 'and so on', 'general duties'
+]
 
 class TextAnalyzer:
     """Analyze text for suspicious patterns"""
     
     def __init__(self):
+        require_nltk_resources()
         self.stop_words = set(stopwords.words('english'))
         self.lemmatizer = WordNetLemmatizer()
         
         # Suspicious patterns
-        self.urgency_phrases = [
-            'apply now', 'urgent hiring', 'immediate start',
-            'limited positions', 'act fast', 'don\'t miss this',
-            'once in a lifetime', 'apply today', 'hurry',
-            'last chance', 'time is running out'
-        ]
-        
-        self.unrealistic_promises = [
-            'unlimited income', 'unlimited earning', 'financial freedom',
-            'be your own boss', 'work from home millionaire', 'get rich',
-            'earn thousands', 'easy money', 'quick money', 'fast cash',
-            'passive income', 'earn while you sleep', 'effortless income'
-        ]
-        
-        self.vague_job_indicators = [
-            'flexible position', 'various duties', 'multiple roles',
-            'different tasks', 'etc', 'and more', 'as needed',
-            'whatever is needed', 'and so on', 'general duties'
-        ]
+        self.urgency_phrases = list(URGENCY_PHRASES)
+        self.unrealistic_promises = list(UNREALISTIC_PROMISES)
+        self.vague_job_indicators = list(VAGUE_JOB_INDICATORS)
         
-        self.excessive_punctuation_re = re.compile(r'[!?.]{2,}')
+        self.excessive_punctuation_re = EXCESSIVE_PUNCTUATION_RE
     
     def analyze_text(self, text):
         """